@@ -1,20 +1,78 @@
 # -*- coding: utf-8 -*-
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel, Field
+from fastapi.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from itertools import islice
 from typing import List, Optional
+import asyncio
+import functools
 import uvicorn
 import os
-from main import train_germination_model, get_recommendations, predict_score, OPTIMAL_CONDITIONS
-from database import GerminationDatabase
+from main import get_recommendations_batch, OPTIMAL_CONDITIONS
+from database import decode_cursor
+from storage import create_storage
+from model_store import DEFAULT_ARTIFACT_PATH, load_serving_model
+from retraining import ArtifactWatcher, ModelRegistry, Retrainer
+from cache import PredictionCache
+from write_behind import WriteBehindQueue
+from bulk_ingest import DEFAULT_CHUNK_SIZE, ingest
+from archive import archiver_from_env
+from async_db import AsyncGerminationDatabase
+from snapshot import TrainingSnapshot
+from writer_process import SharedWriterStorage, WriterClient
+from batching import MicroBatcher
+from static_responses import StaticResponseMiddleware, StaticResponses
+from fast_json import FastJSONResponse, ndjson_lines
+from stream_ingest import StreamIngestor
+from events import EventBroker
+import recommendation_engine
+
+@asynccontextmanager
+async def lifespan(app):
+    """Démarre et arrête les tâches de fond avec l'application"""
+    retrainer.start()
+    artifact_watcher.start()
+    if archiver is not None:
+        archiver.start()
+    if write_behind is not None:
+        write_behind.start()
+    yield
+    if predict_batcher is not None:
+        # Répondre aux requêtes /predict en attente dans un lot
+        await predict_batcher.drain()
+    retrainer.stop()
+    artifact_watcher.stop()
+    if archiver is not None:
+        archiver.stop()
+    if write_behind is not None:
+        # Écrire les prédictions encore en file avant l'arrêt
+        write_behind.stop()
+    adb.close()
 
 # Initialisation
 app = FastAPI(
     title="API de Prédiction de Germination",
     description="API pour prédire les scores de germination et obtenir des recommandations pour 10 types de semences",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
+# Compression gzip des réponses d'au moins GZIP_MIN_SIZE octets (clients envoyant Accept-Encoding: gzip).
+# Placée sous le middleware du catalogue: les réponses pré-sérialisées (petites, avec ETag) ne sont pas compressées
+GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", 1024))
+if GZIP_MIN_SIZE > 0:
+    app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE, compresslevel=int(os.getenv("GZIP_LEVEL", 5)))
+
+# Catalogue (GET /, /conditions, /conditions/{seed_type}) servi depuis des réponses pré-sérialisées
+# avec ETag (304 sur requête conditionnelle); CATALOG_MAX_AGE: Cache-Control max-age en secondes
+catalog_responses = StaticResponses(max_age=int(os.getenv("CATALOG_MAX_AGE", 300)))
+app.add_middleware(StaticResponseMiddleware, responses=catalog_responses)
+
 # Configuration CORS pour permettre les appels depuis n'importe quel domaine
 app.add_middleware(
     CORSMiddleware,
@@ -24,10 +82,107 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-db = GerminationDatabase()
+# Stockage: STORAGE_BACKEND=sqlite (défaut), memory (sans persistance) ou columnar (journal en colonnes).
+# STORAGE_PATH: fichier SQLite ou répertoire du journal (GERMINATION_DB_PATH reste accepté pour sqlite)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "sqlite")
+db = create_storage(STORAGE_BACKEND, os.getenv("STORAGE_PATH") or (
+    os.getenv("GERMINATION_DB_PATH", "germination.db") if STORAGE_BACKEND == "sqlite" else None))
+# Mode multi-workers (gunicorn.conf.py): écritures envoyées au processus d'écriture unique
+WRITER_ADDRESS = os.getenv("GERMINATION_WRITER_ADDRESS")
+if WRITER_ADDRESS:
+    if STORAGE_BACKEND != "sqlite":
+        raise ValueError("Le mode multi-workers necessite STORAGE_BACKEND=sqlite")
+    db = SharedWriterStorage(db, WriterClient(WRITER_ADDRESS, bytes.fromhex(os.environ["GERMINATION_WRITER_AUTHKEY"])))
+# Accès pour les endpoints async: un thread d'écriture et DB_READER_THREADS lecteurs
+adb = AsyncGerminationDatabase(db, readers=int(os.getenv("DB_READER_THREADS", 4)))
+
+# Charger le modèle depuis l'artefact (entraînement depuis le CSV seulement s'il est absent).
+# SERVING_MODE=fast (défaut): ni pandas ni scikit-learn ne sont importés au démarrage.
+# SERVING_MODE=full: entraînement depuis le CSV à chaque démarrage (ancien comportement).
+MODEL_ARTIFACT_PATH = os.getenv("MODEL_ARTIFACT_PATH", DEFAULT_ARTIFACT_PATH)
+SERVING_MODE = os.getenv("SERVING_MODE", "fast")
+registry = ModelRegistry(*load_serving_model(MODEL_ARTIFACT_PATH, 'sensors_data.csv',
+                                             force_training=SERVING_MODE == "full"))
+
+# Réentraînement sur les lectures étiquetées de sensor_data (RETRAIN_INTERVAL_SECONDS=0: à la demande)
+# TRAINING_SNAPSHOT_DIR: données d'entraînement lues depuis un instantané binaire (snapshot.py)
+TRAINING_SNAPSHOT_DIR = os.getenv("TRAINING_SNAPSHOT_DIR")
+if TRAINING_SNAPSHOT_DIR and WRITER_ADDRESS:
+    raise ValueError("TRAINING_SNAPSHOT_DIR n'admet qu'un ecrivain: incompatible avec le mode multi-workers")
+# Synchronisation du modèle entre workers: le worker qui réentraîne publie l'artefact dans
+# MODEL_ARTIFACT_PATH, les autres le rechargent toutes les MODEL_RELOAD_INTERVAL_SECONDS
+# (défaut 2 en mode multi-workers, 0 = désactivé sinon)
+MODEL_RELOAD_INTERVAL_SECONDS = float(os.getenv("MODEL_RELOAD_INTERVAL_SECONDS", 2 if WRITER_ADDRESS else 0))
+retrainer = Retrainer(registry, db, 'sensors_data.csv',
+                      interval_seconds=float(os.getenv("RETRAIN_INTERVAL_SECONDS", 0)),
+                      snapshot=TrainingSnapshot(TRAINING_SNAPSHOT_DIR) if TRAINING_SNAPSHOT_DIR else None,
+                      artifact_path=MODEL_ARTIFACT_PATH if MODEL_RELOAD_INTERVAL_SECONDS > 0 else None)
+artifact_watcher = ArtifactWatcher(registry, MODEL_ARTIFACT_PATH, MODEL_RELOAD_INTERVAL_SECONDS)
+
+# Rétention: lignes de plus de RETENTION_DAYS jours déplacées vers des archives mensuelles (0: désactivée).
+# Les archives sont des fichiers SQLite: uniquement avec le backend sqlite. En mode multi-workers,
+# l'archivage tourne dans le processus d'écriture.
+archiver = archiver_from_env(db) if STORAGE_BACKEND == "sqlite" and not WRITER_ADDRESS else None
+
+# Cache LRU des résultats (PREDICTION_CACHE_SIZE=0 le désactive)
+CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", 4096))
+CACHE_QUANTUM = float(os.getenv("PREDICTION_CACHE_QUANTUM", 0))
+prediction_cache = PredictionCache(CACHE_SIZE, CACHE_QUANTUM)
+recommendation_cache = PredictionCache(CACHE_SIZE, CACHE_QUANTUM)
+
+# Écriture différée des prédictions (PREDICTION_WRITE_BEHIND=1)
+if os.getenv("PREDICTION_WRITE_BEHIND", "0") == "1":
+    write_behind = WriteBehindQueue(
+        db.add_predictions_batch,
+        max_size=int(os.getenv("WRITE_BEHIND_QUEUE_SIZE", 10000)),
+        batch_size=int(os.getenv("WRITE_BEHIND_BATCH_SIZE", 500)),
+        flush_interval=float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL", 0.05))
+    )
+else:
+    write_behind = None
+
+# Flux SSE des prédictions et alertes (GET /events): diffusion en mémoire, sans requête par abonné.
+# EVENTS_QUEUE_SIZE messages en attente par abonné, EVENTS_MAX_SUBSCRIBERS abonnés au plus
+event_broker = EventBroker(queue_size=int(os.getenv("EVENTS_QUEUE_SIZE", 256)),
+                           max_subscribers=int(os.getenv("EVENTS_MAX_SUBSCRIBERS", 1000)))
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", 15))
+PREDICTION_EVENT_FIELDS = ('seed_type', 'temperature', 'soil_humidity', 'air_humidity', 'light_level',
+                           'predicted_score', 'model_version', 'out_of_range')
 
-# Entraîner le modèle au démarrage
-model, model_columns = train_germination_model('sensors_data.csv')
+async def record_predictions(records, recommendations):
+    """
+    Enregistre des prédictions via le thread d'écriture ou la file d'écriture différée.
+    recommendations: messages déjà calculés par la requête, un élément par enregistrement (alertes)
+    """
+    if write_behind is not None:
+        # Ne bloque jamais la boucle: ce qui ne tient pas dans la file part au thread d'écriture
+        overflow = write_behind.offer_many(records)
+        if overflow:
+            await adb.add_predictions_batch(overflow)
+    else:
+        await adb.add_predictions_batch(records)
+    publish_predictions(records, recommendations)
+
+def publish_predictions(records, recommendations):
+    """Diffuse les prédictions enregistrées, et une alerte par lecture hors des conditions optimales"""
+    if not event_broker.subscribers:
+        return
+    predictions = []
+    for record in records:
+        prediction = dict(zip(PREDICTION_EVENT_FIELDS, record))
+        prediction['predicted_score'] = round(prediction['predicted_score'], 2)
+        prediction['out_of_range'] = bool(prediction['out_of_range'])
+        predictions.append(prediction)
+    event_broker.publish('predictions', predictions)
+    alerts = [dict(prediction, recommendations=messages)
+              for prediction, messages in zip(predictions, recommendations) if prediction['out_of_range']]
+    if alerts:
+        event_broker.publish('alerts', alerts)
+
+# Regroupement des requêtes /predict simultanées (PREDICT_BATCH_WINDOW_MS=0: désactivé)
+# PREDICT_BATCH_MAX_SIZE: taille maximale d'un lot (traité dès qu'il est plein)
+PREDICT_BATCH_WINDOW_MS = float(os.getenv("PREDICT_BATCH_WINDOW_MS", 0))
+PREDICT_BATCH_MAX_SIZE = int(os.getenv("PREDICT_BATCH_MAX_SIZE", 64))
 
 # --- Modèles Pydantic ---
 class SensorInput(BaseModel):
@@ -53,6 +208,15 @@ class PredictionResponse(BaseModel):
     recommendations: List[str]
     seed_type: str
     conditions: dict
+    model_version: Optional[str] = None
+
+class BatchSensorInput(BaseModel):
+    readings: List[SensorInput] = Field(..., min_length=1, max_length=5000,
+                                        description="Lectures de capteurs à évaluer (1 à 5000)")
+
+class BatchPredictionResponse(BaseModel):
+    count: int
+    results: List[PredictionResponse]
 
 class SensorDataInput(BaseModel):
     seed_type: str
@@ -73,17 +237,25 @@ def root():
         "types_semences": ["mais", "riz", "ble", "soja", "tomate", "haricot", "carotte", "laitue", "concombre", "poivron"],
         "endpoints": {
             "POST /predict": "Prédire le score de germination",
+            "POST /predict/batch": "Prédire les scores pour plusieurs lectures",
             "POST /recommendations": "Obtenir des recommandations",
             "GET /conditions/{seed_type}": "Obtenir les conditions optimales",
             "POST /sensor-data": "Ajouter des données de capteurs",
+            "POST /sensor-data/bulk": "Importer des lectures en masse (CSV ou NDJSON)",
+            "WS /ws/ingest": "Flux continu de lectures avec prédictions en retour (WebSocket)",
+            "GET /events": "Flux en direct des prédictions et alertes (Server-Sent Events)",
             "GET /sensor-data": "Récupérer les données de capteurs",
             "GET /predictions": "Récupérer l'historique des prédictions",
-            "GET /stats/{seed_type}": "Obtenir les statistiques"
+            "GET /history/{seed_type}": "Agrégats horaires ou journaliers sur une période",
+            "GET /stats/{seed_type}": "Obtenir les statistiques",
+            "GET /model": "Version et métriques du modèle en service",
+            "POST /model/retrain": "Réentraîner le modèle sur les données étiquetées",
+            "GET /metrics": "Compteurs de fonctionnement (cache, écriture différée)"
         }
     }
 
 @app.post("/predict", response_model=PredictionResponse)
-def predict(data: SensorInput):
+async def predict(data: SensorInput):
     """Prédit le score de germination et retourne des recommandations"""
     try:
         # Préparer les données
@@ -95,61 +267,171 @@ def predict(data: SensorInput):
             'light_level': data.light_level
         }
         
-        # Prédiction
-        score = predict_score(model, model_columns, input_data)
-        predicted_score = float(score[0])
+        if predict_batcher is not None:
+            return await predict_batcher.submit(input_data)
         
-        # Recommandations
-        recommendations = get_recommendations(**input_data)
+        # Prédiction et recommandations (un seul état du modèle pour toute la requête)
+        state = registry.current
+        key = prediction_cache.make_key(**input_data)
+        cached = prediction_cache.get(key, state.version)
+        if cached is None:
+            cached = (state.engine.predict_one(**input_data),
+                      recommendation_engine.default_table.assess(**input_data))
+            prediction_cache.put(key, cached, state.version)
+        predicted_score, assessment = cached
+        recommendations = render_recommendations(data.seed_type, assessment, data.light_level)
+        out_of_range = any(assessment[1])
         
         # Enregistrer dans la base de données
-        db.add_prediction(
+        await record_predictions([(
             data.seed_type, data.temperature, data.soil_humidity,
-            data.air_humidity, data.light_level, predicted_score
-        )
+            data.air_humidity, data.light_level, predicted_score, state.version, out_of_range
+        )], [recommendations])
         
         return {
             "predicted_score": round(predicted_score, 2),
             "recommendations": recommendations,
             "seed_type": data.seed_type,
-            "conditions": input_data
+            "conditions": input_data,
+            "model_version": state.version
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _evaluate_batch(state, rows):
+    """Prédictions et recommandations d'un lot (calcul numpy, exécuté hors de la boucle d'événements)"""
+    # Prédiction vectorisée sur tout le lot
+    scores = state.engine.predict_batch(rows)
+    
+    # Recommandations pour tout le lot
+    all_recommendations = get_recommendations_batch(rows)
+    
+    records = [
+        (row['seed_type'], row['temperature'], row['soil_humidity'],
+         row['air_humidity'], row['light_level'], float(score), state.version, bool(flag))
+        for row, score, flag in zip(rows, scores, all_recommendations.out_of_range)
+    ]
+    results = [
+        {
+            "predicted_score": round(float(score), 2),
+            "recommendations": recs,
+            "seed_type": row['seed_type'],
+            "conditions": row,
+            "model_version": state.version
+        }
+        for row, score, recs in zip(rows, scores, all_recommendations)
+    ]
+    return records, results
+
+def render_recommendations(seed_type, assessment, light_level):
+    """Messages d'une évaluation (éventuellement lue en cache), avec la valeur de lumière de la lecture"""
+    return recommendation_engine.default_table.render_assessment(seed_type, assessment, light_level)
+
+async def predict_coalesced(rows):
+    """Lot de requêtes /predict regroupées: un appel vectorisé au modèle et une seule écriture"""
+    state = registry.current
+    keys = [prediction_cache.make_key(**row) for row in rows]
+    cached = [prediction_cache.get(key, state.version) for key in keys]
+    misses = [i for i, entry in enumerate(cached) if entry is None]
+    if misses:
+        # Lot de taille bornée (PREDICT_BATCH_MAX_SIZE, WS_MAX_FRAME_READINGS): calculé dans la boucle d'événements
+        miss_rows = [rows[i] for i in misses]
+        scores = state.engine.predict_batch(miss_rows).tolist()
+        assessments = get_recommendations_batch(miss_rows).assessments()
+        for i, score, assessment in zip(misses, scores, assessments):
+            cached[i] = (score, assessment)
+            prediction_cache.put(keys[i], cached[i], state.version)
+    records, results = [], []
+    for row, (predicted_score, assessment) in zip(rows, cached):
+        records.append((row['seed_type'], row['temperature'], row['soil_humidity'], row['air_humidity'],
+                        row['light_level'], predicted_score, state.version, any(assessment[1])))
+        results.append({
+            "predicted_score": round(predicted_score, 2),
+            "recommendations": render_recommendations(row['seed_type'], assessment, row['light_level']),
+            "seed_type": row['seed_type'],
+            "conditions": row,
+            "model_version": state.version
+        })
+    await record_predictions(records, [result['recommendations'] for result in results])
+    return results
+
+predict_batcher = (MicroBatcher(predict_coalesced, PREDICT_BATCH_MAX_SIZE, PREDICT_BATCH_WINDOW_MS)
+                   if PREDICT_BATCH_WINDOW_MS > 0 else None)
+
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_batch(data: BatchSensorInput):
+    """Prédit les scores de germination d'un lot de lectures en un seul appel au modèle"""
+    try:
+        rows = [reading.model_dump() for reading in data.readings]
+        records, results = await run_in_threadpool(_evaluate_batch, registry.current, rows)
+        
+        # Enregistrer toutes les prédictions dans une seule transaction
+        await record_predictions(records, [result['recommendations'] for result in results])
+        return FastJSONResponse({"count": len(results), "results": results})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/recommendations")
-def recommendations(data: SensorInput):
+async def recommendations(data: SensorInput):
     """Retourne uniquement les recommandations sans prédiction"""
     try:
-        recs = get_recommendations(
+        key = recommendation_cache.make_key(
             data.seed_type, data.temperature, data.soil_humidity,
             data.air_humidity, data.light_level
         )
+        # Le cache garde l'évaluation; le message de lumière reprend la valeur de cette lecture
+        assessment = recommendation_cache.get(key)
+        if assessment is None:
+            assessment = recommendation_engine.default_table.assess(
+                data.seed_type, data.temperature, data.soil_humidity,
+                data.air_humidity, data.light_level
+            )
+            recommendation_cache.put(key, assessment)
+        recs = render_recommendations(data.seed_type, assessment, data.light_level)
         return {"recommendations": recs, "seed_type": data.seed_type}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/conditions/{seed_type}")
-def get_conditions(seed_type: str):
+async def get_conditions(seed_type: str):
     """Retourne les conditions optimales pour un type de graine"""
     if seed_type not in OPTIMAL_CONDITIONS:
         raise HTTPException(status_code=404, detail=f"Type de graine '{seed_type}' non trouvé")
     
+    return conditions_content(seed_type)
+
+@app.get("/conditions")
+async def get_all_conditions():
+    """Retourne toutes les conditions optimales"""
+    return {"conditions": OPTIMAL_CONDITIONS}
+
+def conditions_content(seed_type):
     return {
         "seed_type": seed_type,
         "optimal_conditions": OPTIMAL_CONDITIONS[seed_type]
     }
 
-@app.get("/conditions")
-def get_all_conditions():
-    """Retourne toutes les conditions optimales"""
-    return {"conditions": OPTIMAL_CONDITIONS}
+def refresh_catalog():
+    """
+    À appeler après toute modification de OPTIMAL_CONDITIONS: recompile la table des
+    recommandations, vide les caches de résultats et resérialise les réponses du catalogue,
+    pour que le catalogue et les recommandations servies restent cohérents.
+    """
+    recommendation_engine.rebuild_default_table()
+    prediction_cache.clear()
+    recommendation_cache.clear()
+    contents = {"/": root(), "/conditions": {"conditions": OPTIMAL_CONDITIONS}}
+    for seed_type in OPTIMAL_CONDITIONS:
+        contents[f"/conditions/{seed_type}"] = conditions_content(seed_type)
+    catalog_responses.build(contents)
+
+refresh_catalog()
 
 @app.post("/sensor-data")
-def add_sensor_data(data: SensorDataInput):
+async def add_sensor_data(data: SensorDataInput):
     """Ajoute des données de capteurs dans la base de données"""
     try:
-        data_id = db.add_sensor_data(
+        data_id = await adb.add_sensor_data(
             data.seed_type, data.temperature, data.soil_humidity,
             data.air_humidity, data.light_level, data.germination_score
         )
@@ -157,37 +439,225 @@ def add_sensor_data(data: SensorDataInput):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/sensor-data")
-def get_sensor_data(limit: int = 100):
-    """Récupère les données de capteurs"""
+# Types de contenu reconnus par l'import en masse
+BULK_CONTENT_TYPES = {
+    'text/csv': 'csv',
+    'application/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/ndjson': 'ndjson',
+    'application/jsonl': 'ndjson'
+}
+
+@app.post("/sensor-data/bulk")
+async def add_sensor_data_bulk(request: Request,
+                               format: Optional[str] = Query(None, pattern="^(csv|ndjson)$",
+                                                             description="Par défaut: déduit du Content-Type"),
+                               chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=50000,
+                                                       description="Lectures par transaction")):
+    """Importe des lectures de capteurs en CSV ou NDJSON, lues en streaming et écrites par paquets"""
+    if format is None:
+        content_type = request.headers.get('content-type', '').split(';')[0].strip().lower()
+        format = BULK_CONTENT_TYPES.get(content_type)
+        if format is None:
+            raise HTTPException(status_code=415,
+                                detail="Content-Type attendu: text/csv ou application/x-ndjson (ou ?format=)")
+
+    try:
+        # Une transaction par paquet de chunk_size lectures, sans fusion avec d'autres écritures
+        return await ingest(request.stream(), format,
+                            functools.partial(adb.add_sensor_data_batch, group=False), chunk_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Taille maximale d'une page JSON de l'historique (l'export NDJSON n'est pas limité)
+MAX_PAGE_SIZE = 10000
+
+def _to_db_timestamp(value: Optional[datetime]) -> Optional[str]:
+    """Convertit une date en texte comparable à la colonne timestamp (UTC, 'YYYY-MM-DD HH:MM:SS')"""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime('%Y-%m-%d %H:%M:%S')
+
+def _ndjson_chunks(rows, chunk_size=500):
+    """Sérialise les lignes en NDJSON par blocs, sans matérialiser tout l'export"""
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield ndjson_lines(chunk)
+
+async def history_response(table, key, limit, cursor, seed_type, start, end, format):
+    """Page JSON (pagination par curseur) ou export NDJSON en streaming d'une table d'historique"""
+    start, end = _to_db_timestamp(start), _to_db_timestamp(end)
     try:
-        data = db.get_sensor_data(limit)
-        return {"count": len(data), "data": data}
+        if cursor is not None:
+            decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if format == "ndjson":
+        rows = db.iter_history(table, seed_type, start, end, cursor, limit)
+        return StreamingResponse(_ndjson_chunks(rows), media_type="application/x-ndjson")
+
+    try:
+        page, next_cursor = await adb.get_history_page(table, min(limit or 100, MAX_PAGE_SIZE),
+                                                       cursor, seed_type, start, end)
+        # Lignes de la base (str, nombres, None): sérialisées sans jsonable_encoder
+        return FastJSONResponse({"count": len(page), key: page, "next_cursor": next_cursor})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+PREDICT_FIELDS = ('seed_type', 'temperature', 'soil_humidity', 'air_humidity', 'light_level')
+
+async def ingest_stream_readings(records):
+    """Lectures reçues par WebSocket: enregistrées dans sensor_data, puis évaluées comme /predict (lot regroupé)"""
+    await adb.add_sensor_data_batch(records)
+    return await predict_coalesced([dict(zip(PREDICT_FIELDS, record)) for record in records])
+
+# Ingestion WebSocket: WS_QUEUE_SIZE trames en attente par connexion, WS_MAX_FRAME_READINGS lectures par trame
+stream_ingestor = StreamIngestor(ingest_stream_readings,
+                                 queue_size=int(os.getenv("WS_QUEUE_SIZE", 64)),
+                                 max_frame_readings=int(os.getenv("WS_MAX_FRAME_READINGS", 500)))
+
+@app.websocket("/ws/ingest")
+async def ws_ingest(websocket: WebSocket):
+    """Flux continu de lectures (une lecture ou un lot par trame JSON): enregistrement et prédictions en retour"""
+    await stream_ingestor.handle(websocket)
+
+async def _event_stream(subscription):
+    try:
+        # Délai de reconnexion du client, puis commentaire pour ouvrir le flux
+        yield b'retry: 3000\n: connecte\n\n'
+        while True:
+            try:
+                # Rafale: les messages en attente partent en un seul envoi
+                yield await asyncio.wait_for(subscription.get_many(), EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                # Garde la connexion ouverte à travers les proxys
+                yield b': keepalive\n\n'
+    finally:
+        subscription.close()
+
+@app.get("/events")
+async def events(seed_type: Optional[List[str]] = Query(None, description="Types de graine suivis (répétable ou séparés par des virgules)")):
+    """Flux Server-Sent Events des nouvelles prédictions (event: predictions) et des alertes hors plage (event: alerts)"""
+    seed_types = [value for values in seed_type or () for value in values.split(',') if value]
+    try:
+        subscription = event_broker.subscribe(seed_types or None)
+    except ValueError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return StreamingResponse(_event_stream(subscription), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/sensor-data")
+async def get_sensor_data(limit: Optional[int] = Query(None, ge=1, description="Taille de page (défaut 100, max 10000)"),
+                    cursor: Optional[str] = Query(None, description="Curseur next_cursor de la page précédente"),
+                    seed_type: Optional[str] = None,
+                    start: Optional[datetime] = Query(None, description="Date de début incluse (UTC)"),
+                    end: Optional[datetime] = Query(None, description="Date de fin exclue (UTC)"),
+                    format: str = Query("json", pattern="^(json|ndjson)$")):
+    """Récupère les données de capteurs, des plus récentes aux plus anciennes"""
+    return await history_response('sensor_data', 'data', limit, cursor, seed_type, start, end, format)
+
 @app.get("/predictions")
-def get_predictions(limit: int = 100):
-    """Récupère l'historique des prédictions"""
+async def get_predictions(limit: Optional[int] = Query(None, ge=1, description="Taille de page (défaut 100, max 10000)"),
+                    cursor: Optional[str] = Query(None, description="Curseur next_cursor de la page précédente"),
+                    seed_type: Optional[str] = None,
+                    start: Optional[datetime] = Query(None, description="Date de début incluse (UTC)"),
+                    end: Optional[datetime] = Query(None, description="Date de fin exclue (UTC)"),
+                    format: str = Query("json", pattern="^(json|ndjson)$")):
+    """Récupère l'historique des prédictions, des plus récentes aux plus anciennes"""
+    return await history_response('predictions', 'predictions', limit, cursor, seed_type, start, end, format)
+
+@app.get("/history/{seed_type}")
+async def get_history(seed_type: str,
+                resolution: str = Query("hour", pattern="^(hour|day)$"),
+                source: str = Query("sensor_data", pattern="^(sensor_data|predictions)$"),
+                start: Optional[datetime] = Query(None, description="Date de début (UTC), intervalle la contenant inclus"),
+                end: Optional[datetime] = Query(None, description="Date de fin exclue (UTC)")):
+    """Moyenne/min/max des paramètres et du score par heure ou par jour, lus dans les tables d'agrégats"""
     try:
-        predictions = db.get_predictions(limit)
-        return {"count": len(predictions), "predictions": predictions}
+        buckets = await adb.get_rollups(source, resolution, seed_type, _to_db_timestamp(start), _to_db_timestamp(end))
+        return FastJSONResponse({
+            "seed_type": seed_type,
+            "source": source,
+            "resolution": resolution,
+            "count": len(buckets),
+            "buckets": buckets
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/stats/{seed_type}")
-def get_stats(seed_type: str):
+async def get_stats(seed_type: str):
     """Récupère les statistiques pour un type de graine"""
     try:
-        stats = db.get_stats_by_seed_type(seed_type)
+        stats = await adb.get_stats_by_seed_type(seed_type)
         return stats
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/model")
+def get_model_info():
+    """Retourne la version et les métadonnées du modèle en service"""
+    info = registry.current.info
+    return {
+        "model_version": info['model_version'],
+        "created_at": info.get('created_at'),
+        "training_data": info.get('training_data', {}),
+        "metrics": info.get('metrics', {}),
+        "retraining": {
+            "interval_seconds": retrainer.interval_seconds,
+            "last_run": retrainer.last_run,
+            "last_result": retrainer.last_result
+        },
+        "reload": artifact_watcher.stats()
+    }
+
+@app.post("/model/retrain")
+async def retrain_model():
+    """Réentraîne le modèle sur le CSV et les lectures étiquetées, hors de la boucle d'événements"""
+    try:
+        return await run_in_threadpool(retrainer.retrain_now)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/metrics")
+def get_metrics():
+    """Compteurs de fonctionnement (cache des résultats, file d'écriture différée, archivage)"""
+    return {
+        "model_version": registry.current.version,
+        "cache": {
+            "predictions": prediction_cache.stats(),
+            "recommendations": recommendation_cache.stats()
+        },
+        "write_behind": write_behind.stats() if write_behind is not None else {"enabled": False},
+        "predict_batching": predict_batcher.stats() if predict_batcher is not None else {"enabled": False},
+        "catalog": catalog_responses.stats(),
+        "ws_ingest": stream_ingestor.stats(),
+        "events": event_broker.stats(),
+        "archive": archiver.stats() if archiver is not None else {"enabled": False},
+        "database": dict(adb.stats(), backend=db.name)
+    }
+
 @app.get("/health")
 def health_check():
     """Vérifie l'état de l'API"""
-    return {"status": "healthy", "model_loaded": model is not None}
+    health = {
+        "status": "healthy",
+        "model_loaded": registry.current.engine is not None,
+        "model_version": registry.current.version
+    }
+    if write_behind is not None:
+        # Prédictions abandonnées par l'écriture différée après échec de toutes les tentatives
+        lost = write_behind.stats()['lost']
+        health["write_behind_lost"] = lost
+        if lost:
+            health["status"] = "degraded"
+    return health
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+Politique de rétention: déplace les lignes de sensor_data et predictions plus anciennes
+que RETENTION_DAYS jours vers des archives SQLite mensuelles.
+
+- Une archive par mois: archives/<base>-YYYY-MM.db, avec les mêmes tables que la base
+  (interrogeable directement avec ATTACH DATABASE).
+- Le déplacement se fait par petits lots: copie du lot dans l'archive, puis suppression
+  dans la base dans une transaction courte. Le verrou d'écriture de la base n'est tenu
+  que le temps de supprimer un lot.
+- Les mois entièrement échus sont compressés en .db.gz; open_archive() et export()
+  les décompressent à la demande.
+
+Les agrégats (seed_stats, rollups horaires et journaliers) ne sont pas modifiés: ils
+couvrent tout l'historique, archives comprises.
+"""
+import csv
+import gzip
+import json
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timedelta, timezone
+
+ARCHIVE_TABLES = ('sensor_data', 'predictions')
+DEFAULT_ARCHIVE_DIR = 'archives'
+ARCHIVE_FORMATS = ('ndjson', 'csv')
+
+
+class Archiver:
+    """Archivage incrémental des lignes anciennes dans des fichiers SQLite mensuels"""
+
+    def __init__(self, db, archive_dir=DEFAULT_ARCHIVE_DIR, retention_days=0, batch_size=1000,
+                 interval_seconds=3600, pause=0.05, compress=True):
+        """
+        Args:
+            db: GerminationDatabase
+            archive_dir: Répertoire des archives mensuelles
+            retention_days: Nombre de jours conservés dans la base (0 = pas d'archivage)
+            batch_size: Nombre de lignes déplacées par transaction
+            interval_seconds: Période de l'archivage automatique (0 = uniquement à la demande)
+            pause: Pause (s) entre deux lots, laissant passer les autres écritures
+            compress: Compresse en .db.gz les mois entièrement échus
+        """
+        self.db = db
+        self.archive_dir = archive_dir
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self.pause = pause
+        self.compress = compress
+        self.prefix = os.path.splitext(os.path.basename(db.db_path))[0]
+        self.last_run = None
+        self.last_result = None
+        self.last_error = None
+        self.moved = {table: 0 for table in ARCHIVE_TABLES}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    # --- Fichiers d'archive ---
+
+    def archive_path(self, month, compressed=False):
+        path = os.path.join(self.archive_dir, f'{self.prefix}-{month}.db')
+        return path + '.gz' if compressed else path
+
+    def months(self):
+        """Archives existantes, du mois le plus ancien au plus récent"""
+        pattern = re.compile(rf'^{re.escape(self.prefix)}-(\d{{4}}-\d{{2}})\.db(\.gz)?$')
+        archives = []
+        if os.path.isdir(self.archive_dir):
+            for name in sorted(os.listdir(self.archive_dir)):
+                match = pattern.match(name)
+                if match:
+                    path = os.path.join(self.archive_dir, name)
+                    archives.append({'month': match.group(1), 'path': path, 'compressed': bool(match.group(2)),
+                                     'size_bytes': os.path.getsize(path)})
+        return archives
+
+    def _writable_path(self, month):
+        """Chemin de l'archive non compressée d'un mois (décompressée si des lignes tardives arrivent)"""
+        path = self.archive_path(month)
+        compressed = self.archive_path(month, compressed=True)
+        if not os.path.exists(path) and os.path.exists(compressed):
+            _gunzip(compressed, path)
+            os.remove(compressed)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        return path
+
+    @contextmanager
+    def open_archive(self, month):
+        """Chemin d'un fichier SQLite lisible pour un mois (copie temporaire si l'archive est compressée)"""
+        path = self.archive_path(month)
+        if os.path.exists(path):
+            yield path
+            return
+        compressed = self.archive_path(month, compressed=True)
+        if not os.path.exists(compressed):
+            raise FileNotFoundError(f"Aucune archive pour le mois {month}")
+        fd, temp_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        try:
+            _gunzip(compressed, temp_path)
+            yield temp_path
+        finally:
+            os.remove(temp_path)
+
+    @contextmanager
+    def open_archives(self):
+        """Chemins lisibles de toutes les archives (pour les recalculs d'agrégats)"""
+        with ExitStack() as stack:
+            yield [stack.enter_context(self.open_archive(archive['month'])) for archive in self.months()]
+
+    def export(self, month, table, out, format='ndjson'):
+        """Écrit les lignes archivées d'une table pour un mois dans un fichier texte; retourne le nombre de lignes"""
+        if table not in ARCHIVE_TABLES:
+            raise ValueError(f"Table inconnue: {table}")
+        if format not in ARCHIVE_FORMATS:
+            raise ValueError(f"Format inconnu: {format}")
+        with self.open_archive(month) as path:
+            conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+            conn.row_factory = sqlite3.Row
+            try:
+                if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                    (table,)).fetchone():
+                    return 0
+                cursor = conn.execute(f'SELECT * FROM {table} ORDER BY timestamp, id')
+                columns = [description[0] for description in cursor.description]
+                writer = None
+                if format == 'csv':
+                    writer = csv.writer(out)
+                    writer.writerow(columns)
+                count = 0
+                while True:
+                    rows = cursor.fetchmany(1000)
+                    if not rows:
+                        return count
+                    if writer is not None:
+                        writer.writerows(rows)
+                    else:
+                        out.write(''.join(json.dumps(dict(row), ensure_ascii=False) + '\n' for row in rows))
+                    count += len(rows)
+            finally:
+                conn.close()
+
+    # --- Archivage ---
+
+    def cutoff(self, now=None):
+        """Date limite (début de journée UTC): les lignes antérieures sont archivées"""
+        now = now or datetime.now(timezone.utc)
+        day = (now - timedelta(days=self.retention_days)).date()
+        return f'{day.isoformat()} 00:00:00'
+
+    def _prepare_archive_table(self, conn, table):
+        """Crée la table dans l'archive attachée (même schéma que la base) et retourne ses colonnes"""
+        sql = conn.execute("SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?",
+                           (table,)).fetchone()[0]
+        conn.execute(re.sub(r'^CREATE TABLE (IF NOT EXISTS )?\w+', f'CREATE TABLE IF NOT EXISTS archive.{table}', sql))
+        conn.execute(f'CREATE INDEX IF NOT EXISTS archive.idx_{table}_timestamp ON {table} (timestamp, id)')
+        # Colonnes ajoutées à la base par une migration postérieure à la création de l'archive
+        archived = {row[1] for row in conn.execute(f'PRAGMA archive.table_info({table})')}
+        columns = []
+        for _, name, declared_type, _, _, _ in conn.execute(f'PRAGMA main.table_info({table})').fetchall():
+            if name not in archived:
+                conn.execute(f'ALTER TABLE archive.{table} ADD COLUMN {name} {declared_type}')
+            columns.append(name)
+        return columns
+
+    def archive_batch(self, table, cutoff):
+        """Déplace au plus batch_size lignes antérieures à cutoff; retourne le nombre de lignes déplacées"""
+        conn = self.db._connection()
+        rows = conn.execute(f'''
+            SELECT id, substr(timestamp, 1, 7) FROM {table}
+            WHERE timestamp < ? ORDER BY timestamp, id LIMIT ?
+        ''', (cutoff, self.batch_size)).fetchall()
+        by_month = defaultdict(list)
+        for row_id, month in rows:
+            by_month[month].append(row_id)
+
+        for month, ids in by_month.items():
+            ids = json.dumps(ids)
+            # 1. Copie dans l'archive (INSERT OR IGNORE: une copie interrompue peut être rejouée)
+            conn.execute('ATTACH DATABASE ? AS archive', (self._writable_path(month),))
+            try:
+                with conn:
+                    columns = ', '.join(self._prepare_archive_table(conn, table))
+                    conn.execute(f'''
+                        INSERT OR IGNORE INTO archive.{table} ({columns})
+                        SELECT {columns} FROM main.{table} WHERE id IN (SELECT value FROM json_each(?))
+                    ''', (ids,))
+            finally:
+                conn.execute('DETACH DATABASE archive')
+            # 2. Suppression dans la base, une fois la copie validée
+            with conn:
+                conn.execute(f'DELETE FROM {table} WHERE id IN (SELECT value FROM json_each(?))', (ids,))
+        return len(rows)
+
+    def seal_closed_months(self, cutoff):
+        """Compresse les archives des mois entièrement antérieurs à cutoff"""
+        sealed = []
+        for archive in self.months():
+            if archive['compressed'] or archive['month'] >= cutoff[:7]:
+                continue
+            conn = sqlite3.connect(archive['path'])
+            try:
+                conn.execute('VACUUM')
+            finally:
+                conn.close()
+            compressed = self.archive_path(archive['month'], compressed=True)
+            with open(archive['path'], 'rb') as src, gzip.open(compressed + '.tmp', 'wb', compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(compressed + '.tmp', compressed)
+            os.remove(archive['path'])
+            sealed.append(archive['month'])
+        return sealed
+
+    def run_once(self, now=None):
+        """Archive toutes les lignes échues, lot par lot, puis compresse les mois clos"""
+        if self.retention_days <= 0:
+            raise ValueError("Aucune politique de rétention configurée (RETENTION_DAYS)")
+        cutoff = self.cutoff(now)
+        moved = {}
+        for table in ARCHIVE_TABLES:
+            moved[table] = 0
+            while not self._stop_event.is_set():
+                count = self.archive_batch(table, cutoff)
+                moved[table] += count
+                if count < self.batch_size:
+                    break
+                time.sleep(self.pause)
+        sealed = self.seal_closed_months(cutoff) if self.compress else []
+
+        result = {'cutoff': cutoff, 'moved': moved, 'sealed': sealed,
+                  'finished_at': datetime.now(timezone.utc).isoformat()}
+        with self._lock:
+            for table, count in moved.items():
+                self.moved[table] += count
+            self.last_run = result['finished_at']
+            self.last_result = result
+        return result
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval_seconds):
+            try:
+                result = self.run_once()
+                print(f"[OK] Archivage avant {result['cutoff']}: {result['moved']}")
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"[ERREUR] Archivage: {e}")
+
+    def start(self):
+        """Démarre l'archivage périodique si une rétention et un intervalle sont configurés"""
+        if self.retention_days <= 0 or self.interval_seconds <= 0 or self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='archiver', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'retention_days': self.retention_days,
+                'archive_dir': self.archive_dir,
+                'moved': dict(self.moved),
+                'last_run': self.last_run,
+                'last_result': self.last_result,
+                'last_error': self.last_error
+            }
+
+
+def archiver_from_env(db):
+    """Archiver configuré par RETENTION_DAYS, ARCHIVE_DIR, ARCHIVE_BATCH_SIZE et ARCHIVE_INTERVAL_SECONDS"""
+    return Archiver(db, os.getenv("ARCHIVE_DIR", DEFAULT_ARCHIVE_DIR),
+                    retention_days=int(os.getenv("RETENTION_DAYS", 0)),
+                    batch_size=int(os.getenv("ARCHIVE_BATCH_SIZE", 1000)),
+                    interval_seconds=float(os.getenv("ARCHIVE_INTERVAL_SECONDS", 3600)))
+
+
+def _gunzip(source, destination):
+    with gzip.open(source, 'rb') as src, open(destination, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
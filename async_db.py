@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+Accès asynchrone à GerminationDatabase pour les endpoints async de l'API.
+
+Les appels SQLite restent bloquants; ils sont exécutés dans des exécuteurs dédiés
+au lieu du pool de threads partagé de Starlette:
+- un thread d'écriture unique: les écritures de l'API sont sérialisées sans se
+  disputer le verrou d'écriture de SQLite. Les petites écritures par lot (prédictions,
+  trames WebSocket) arrivées pendant que l'écrivain est occupé sont fusionnées en une
+  seule transaction (commit groupé); si elle échoue, chaque appelant est réécrit seul
+  et ne reçoit que sa propre erreur. Les paquets de l'import en masse ne sont pas
+  fusionnés (group=False): leurs transactions gardent la taille demandée;
+- un pool de lecteurs: en WAL, les lectures ne sont jamais bloquées par l'écrivain.
+Chaque thread garde sa propre connexion (GerminationDatabase._connection).
+Les autres backends de storage.py passent par les mêmes exécuteurs.
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncGerminationDatabase:
+    """Façade awaitable de GerminationDatabase (un écrivain, plusieurs lecteurs)"""
+
+    def __init__(self, db, readers=4):
+        """
+        Args:
+            db: GerminationDatabase ou autre backend de storage.py
+            readers: Nombre de threads de lecture
+        """
+        self.db = db
+        self.readers = readers
+        self._executors = {}
+        self._lock = threading.Lock()
+        # Opérations en attente ou en cours, et opérations terminées, par type
+        self._pending = {'reads': 0, 'writes': 0}
+        self._completed = {'reads': 0, 'writes': 0}
+        # Écritures par lot en attente du thread d'écriture, par fonction: [(records, future)]
+        self._grouped = {}
+        self.commits = 0
+        self.group_retries = 0
+
+    def _executor(self, kind):
+        """Exécuteur d'un type d'opération, créé au premier usage (et après close())"""
+        with self._lock:
+            executor = self._executors.get(kind)
+            if executor is None:
+                if kind == 'writes':
+                    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-writer')
+                else:
+                    executor = ThreadPoolExecutor(max_workers=self.readers, thread_name_prefix='db-reader')
+                self._executors[kind] = executor
+            return executor
+
+    async def _submit(self, kind, function, *args, **kwargs):
+        executor = self._executor(kind)
+        with self._lock:
+            self._pending[kind] += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, functools.partial(function, *args, **kwargs))
+        finally:
+            with self._lock:
+                self._pending[kind] -= 1
+                self._completed[kind] += 1
+
+    async def _write_grouped(self, function, records):
+        """
+        Écriture par lot avec commit groupé: tous les appels en attente pour la même fonction
+        sont écrits par un seul appel (une transaction). Si la transaction échoue, les lots
+        sont réécrits un par un: une lecture invalide ne fait échouer que son appelant.
+        """
+        future = asyncio.get_running_loop().create_future()
+        with self._lock:
+            self._pending['writes'] += 1
+            pending = self._grouped.setdefault(function, [])
+            pending.append((records, future))
+            schedule = len(pending) == 1
+        if schedule:
+            self._executor('writes').submit(self._flush_grouped, function)
+        try:
+            return await future
+        finally:
+            with self._lock:
+                self._pending['writes'] -= 1
+                self._completed['writes'] += 1
+
+    def _flush_grouped(self, function):
+        """Exécuté dans le thread d'écriture: écrit tout le groupe en attente"""
+        with self._lock:
+            pending = self._grouped.pop(function, [])
+            self.commits += 1
+        try:
+            function([record for records, _ in pending for record in records])
+            errors = [None] * len(pending)
+        except Exception as e:
+            if len(pending) == 1:
+                errors = [e]
+            else:
+                # La transaction commune est annulée: chaque lot est réécrit seul
+                errors = [self._write_alone(function, records) for records, _ in pending]
+        for (records, future), error in zip(pending, errors):
+            try:
+                future.get_loop().call_soon_threadsafe(_resolve, future, len(records), error)
+            except RuntimeError:
+                # Boucle d'événements déjà fermée (arrêt)
+                pass
+
+    def _write_alone(self, function, records):
+        """Réécrit le lot d'un appelant après l'échec du groupe; retourne son exception ou None"""
+        with self._lock:
+            self.commits += 1
+            self.group_retries += 1
+        try:
+            function(records)
+        except Exception as e:
+            return e
+        return None
+
+    def _read(self, function, *args, **kwargs):
+        return self._submit('reads', function, *args, **kwargs)
+
+    def _write(self, function, *args, **kwargs):
+        return self._submit('writes', function, *args, **kwargs)
+
+    # --- Écritures ---
+
+    async def add_sensor_data(self, *args, **kwargs):
+        return await self._write(self.db.add_sensor_data, *args, **kwargs)
+
+    async def add_sensor_data_batch(self, records, group=True):
+        """group=False: transaction propre à cet appel (paquets de taille fixe de l'import en masse)"""
+        if not group:
+            return await self._write(self.db.add_sensor_data_batch, records)
+        return await self._write_grouped(self.db.add_sensor_data_batch, records)
+
+    async def add_prediction(self, *args, **kwargs):
+        return await self._write(self.db.add_prediction, *args, **kwargs)
+
+    async def add_predictions_batch(self, records):
+        return await self._write_grouped(self.db.add_predictions_batch, records)
+
+    # --- Lectures ---
+
+    async def get_sensor_data(self, limit=100):
+        return await self._read(self.db.get_sensor_data, limit)
+
+    async def get_predictions(self, limit=100):
+        return await self._read(self.db.get_predictions, limit)
+
+    async def get_history_page(self, *args, **kwargs):
+        return await self._read(self.db.get_history_page, *args, **kwargs)
+
+    async def get_rollups(self, *args, **kwargs):
+        return await self._read(self.db.get_rollups, *args, **kwargs)
+
+    async def get_stats_by_seed_type(self, seed_type):
+        return await self._read(self.db.get_stats_by_seed_type, seed_type)
+
+    def close(self):
+        """Attend la fin des opérations en cours puis arrête les exécuteurs"""
+        with self._lock:
+            executors, self._executors = self._executors, {}
+        for executor in executors.values():
+            executor.shutdown(wait=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'readers': self.readers,
+                'pending_reads': self._pending['reads'],
+                'pending_writes': self._pending['writes'],
+                'reads': self._completed['reads'],
+                'writes': self._completed['writes'],
+                'commits': self.commits,
+                'group_retries': self.group_retries
+            }
+
+
+def _resolve(future, result, error):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Regroupement (micro-batching) des requêtes /predict simultanées.
+
+Les requêtes déposent leur lecture et attendent leur résultat. Le premier dépôt d'un lot
+arme une minuterie de window_ms: à son expiration, ou dès que max_batch_size lectures
+sont en attente, le lot est traité en un seul appel (prédiction vectorisée et une seule
+écriture), puis chaque requête reçoit son propre résultat. Le délai ajouté à une requête
+est donc borné par window_ms, plus la durée du traitement du lot.
+"""
+import asyncio
+
+
+class MicroBatcher:
+    """Regroupe des appels concurrents (dans la boucle d'événements) en lots"""
+
+    def __init__(self, process_batch, max_batch_size=64, window_ms=2.0):
+        """
+        Args:
+            process_batch: Coroutine recevant la liste des éléments d'un lot et retournant
+                           la liste des résultats, dans le même ordre
+            max_batch_size: Nombre maximal d'éléments par lot (lot traité dès qu'il est plein)
+            window_ms: Attente maximale (ms) entre le premier élément d'un lot et son traitement
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.window_ms = window_ms
+        self._pending = []
+        self._timer = None
+        self._tasks = set()
+        self.submitted = 0
+        self.batches = 0
+        self.full_batches = 0
+        self.max_batch = 0
+        self.errors = 0
+        self.last_error = None
+
+    async def submit(self, item):
+        """Dépose un élément et attend le résultat de son lot"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        self.submitted += 1
+        if len(self._pending) >= self.max_batch_size:
+            self.full_batches += 1
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_ms / 1000, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        # Le lot est traité dans sa propre tâche: le lot suivant se forme pendant ce temps
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        self.batches += 1
+        self.max_batch = max(self.max_batch, len(batch))
+        try:
+            results = await self.process_batch([item for item, _ in batch])
+        except Exception as e:
+            self.errors += 1
+            self.last_error = str(e)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            # Requête annulée (client déconnecté): le résultat est ignoré
+            if not future.done():
+                future.set_result(result)
+
+    async def drain(self):
+        """Traite le lot en cours de formation et attend les lots en cours (appelé à l'arrêt)"""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self):
+        pending = len(self._pending)
+        return {
+            'enabled': True,
+            'window_ms': self.window_ms,
+            'max_batch_size': self.max_batch_size,
+            'submitted': self.submitted,
+            'batches': self.batches,
+            'full_batches': self.full_batches,
+            'average_batch': round((self.submitted - pending) / self.batches, 2) if self.batches else 0,
+            'max_batch': self.max_batch,
+            'pending': pending,
+            'errors': self.errors,
+            'last_error': self.last_error
+        }
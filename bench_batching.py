@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark du regroupement des requêtes POST /predict (batching.py): débit et latence p50/p99
+sans regroupement et avec plusieurs fenêtres (PREDICT_BATCH_WINDOW_MS).
+
+Trois charges (httpx, transport ASGI, sans réseau), cache des résultats désactivé:
+- requêtes isolées (concurrence 1): coût du regroupement quand personne n'attend avec vous;
+- charge soutenue: --concurrency clients envoient leurs requêtes en boucle;
+- rafales: --burst requêtes envoyées au même instant, --bursts fois.
+
+Usage:
+    python bench_batching.py [--requests 3000] [--concurrency 64] [--burst 500] [--windows 1 2 5]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import httpx
+
+SEED_TYPES = ['mais', 'riz', 'ble', 'soja', 'tomate', 'haricot', 'carotte', 'laitue', 'concombre', 'poivron']
+
+
+def random_reading():
+    return {
+        'seed_type': random.choice(SEED_TYPES),
+        'temperature': round(random.uniform(10, 35), 1),
+        'soil_humidity': round(random.uniform(40, 90), 1),
+        'air_humidity': round(random.uniform(40, 90), 1),
+        'light_level': round(random.uniform(20, 90), 1)
+    }
+
+
+async def timed(client, latencies):
+    start = time.perf_counter()
+    response = await client.post('/predict', json=random_reading())
+    latencies.append(time.perf_counter() - start)
+    response.raise_for_status()
+
+
+async def closed_loop(client, n_requests, concurrency, latencies):
+    remaining = iter(range(n_requests))
+
+    async def worker():
+        for _ in remaining:
+            await timed(client, latencies)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def bursts(client, burst, n_bursts, latencies):
+    for _ in range(n_bursts):
+        await asyncio.gather(*(timed(client, latencies) for _ in range(burst)))
+
+
+async def run(app, scenario, n_requests):
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=60) as client:
+        start = time.perf_counter()
+        await scenario(client, latencies)
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'rps': n_requests / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du regroupement des requêtes /predict")
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--burst', type=int, default=500)
+    parser.add_argument('--bursts', type=int, default=6)
+    parser.add_argument('--windows', type=float, nargs='+', default=[1, 2, 5], help="Fenêtres en ms")
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['GERMINATION_DB_PATH'] = os.path.join(tmp, 'bench.db')
+        os.environ['PREDICTION_CACHE_SIZE'] = '0'
+        import api
+        from batching import MicroBatcher
+
+        scenarios = (
+            ("isolees (concurrence 1)", lambda c, lat: closed_loop(c, 300, 1, lat), 300),
+            (f"soutenue (concurrence {args.concurrency})",
+             lambda c, lat: closed_loop(c, args.requests, args.concurrency, lat), args.requests),
+            (f"rafales de {args.burst}", lambda c, lat: bursts(c, args.burst, args.bursts, lat),
+             args.burst * args.bursts)
+        )
+        modes = [("sans regroupement", None)] + [
+            (f"fenetre {window:g} ms", MicroBatcher(api.predict_coalesced, args.max_batch_size, window))
+            for window in args.windows
+        ]
+        print(f"{'charge':<26} | {'mode':<18} | {'req/s':>7} | {'p50 ms':>7} | {'p99 ms':>7} | {'lot moyen':>9}")
+        print("-" * 90)
+        for name, scenario, n_requests in scenarios:
+            for mode, batcher in modes:
+                if batcher is not None:
+                    batcher.submitted = batcher.batches = 0
+                api.predict_batcher = batcher
+                result = asyncio.run(run(api.app, scenario, n_requests))
+                average = batcher.stats()['average_batch'] if batcher is not None else 1
+                print(f"{name:<26} | {mode:<18} | {result['rps']:>7.0f} | "
+                      f"{result['p50_ms']:>7.1f} | {result['p99_ms']:>7.1f} | {average:>9}")
+        print(f"Ecritures: {api.adb.stats()}")
+        api.adb.close()
+        api.db.close()
+
+
+if __name__ == "__main__":
+    main()
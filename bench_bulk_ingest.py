@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de l'import en masse (bulk_ingest): débit du parsing seul, puis parsing +
+écriture dans une base temporaire, pour plusieurs tailles de transaction.
+"""
+import asyncio
+import os
+import random
+import tempfile
+import time
+import bulk_ingest
+from database import GerminationDatabase
+
+N_ROWS = 100000
+NETWORK_CHUNK = 65536
+SEED_TYPES = ['mais', 'riz', 'ble', 'soja', 'tomate']
+
+
+def generer_csv(n):
+    lines = ["seed_type,temperature,soil_humidity,air_humidity,light_level,germination_score,timestamp"]
+    for i in range(n):
+        score = '' if i % 3 else f"{random.uniform(40, 100):.1f}"
+        lines.append(f"{SEED_TYPES[i % len(SEED_TYPES)]},{random.uniform(10, 35):.1f},{random.uniform(30, 90):.1f},"
+                     f"{random.uniform(30, 90):.1f},{random.uniform(0, 100):.1f},{score},"
+                     f"2026-03-{1 + i // 86400 % 28:02d}T{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}")
+    return ("\n".join(lines) + "\n").encode('utf-8')
+
+
+async def flux(data):
+    for i in range(0, len(data), NETWORK_CHUNK):
+        yield data[i:i + NETWORK_CHUNK]
+
+
+def mesurer(data, write_batch, chunk_size):
+    start = time.perf_counter()
+    report = asyncio.run(bulk_ingest.ingest(flux(data), 'csv', write_batch, chunk_size))
+    return report['inserted'] / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    data = generer_csv(N_ROWS)
+
+    async def ignorer(records):
+        pass
+
+    print(f"Parsing seul: {mesurer(data, ignorer, 1000):,.0f} lignes/s")
+    print(f"{'lignes/transaction':>18} | {'lignes/s':>10}")
+    print("-" * 32)
+    for chunk_size in (100, 1000, 5000):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = GerminationDatabase(os.path.join(tmp, 'bench.db'))
+
+            async def ecrire(records):
+                db.add_sensor_data_batch(records)
+
+            print(f"{chunk_size:>18} | {mesurer(data, ecrire, chunk_size):>10,.0f}")
+            db.close()
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de concurrence: endpoints synchrones sur GerminationDatabase (ancien comportement,
+un slot du pool de threads de Starlette par requête) contre endpoints async sur
+AsyncGerminationDatabase (un thread d'écriture, un pool de lecteurs).
+
+1. Charge mixte envoyée en parallèle via httpx (transport ASGI, sans réseau):
+   60% POST /predict, 30% GET /stats/{seed_type}, 10% GET /predictions?limit=200.
+2. Verrou d'écriture tenu 1 s par une autre connexion (VACUUM, sauvegarde, archivage...)
+   pendant 100 POST /predict: latence des GET /stats et POST /recommendations envoyés en même temps.
+
+Usage:
+    python bench_concurrency.py [--requests 3000] [--concurrency 16 64 256]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+import httpx
+
+SEED_TYPES = ['mais', 'riz', 'ble', 'soja', 'tomate', 'haricot', 'carotte', 'laitue', 'concombre', 'poivron']
+
+
+def legacy_app(api):
+    """Réplique des endpoints avant le passage en async: def + appels bloquants à la base"""
+    from fastapi import FastAPI
+    from main import get_recommendations, is_out_of_range
+
+    app = FastAPI()
+
+    @app.post("/predict")
+    def predict(data: api.SensorInput):
+        input_data = data.model_dump()
+        state = api.registry.current
+        predicted_score = state.engine.predict_one(**input_data)
+        recommendations = get_recommendations(**input_data)
+        api.db.add_predictions_batch([(
+            data.seed_type, data.temperature, data.soil_humidity, data.air_humidity, data.light_level,
+            predicted_score, state.version, is_out_of_range(**input_data)
+        )])
+        return {"predicted_score": round(predicted_score, 2), "recommendations": recommendations,
+                "seed_type": data.seed_type, "conditions": input_data, "model_version": state.version}
+
+    @app.post("/recommendations")
+    def recommendations(data: api.SensorInput):
+        return {"recommendations": get_recommendations(**data.model_dump()), "seed_type": data.seed_type}
+
+    @app.get("/stats/{seed_type}")
+    def get_stats(seed_type: str):
+        return api.db.get_stats_by_seed_type(seed_type)
+
+    @app.get("/predictions")
+    def get_predictions(limit: int = 100):
+        page, next_cursor = api.db.get_history_page('predictions', limit)
+        return {"count": len(page), "predictions": page, "next_cursor": next_cursor}
+
+    return app
+
+
+def random_reading():
+    return {
+        'seed_type': random.choice(SEED_TYPES),
+        'temperature': round(random.uniform(10, 35), 1),
+        'soil_humidity': round(random.uniform(40, 90), 1),
+        'air_humidity': round(random.uniform(40, 90), 1),
+        'light_level': round(random.uniform(20, 90), 1)
+    }
+
+
+def random_request():
+    draw = random.random()
+    if draw < 0.6:
+        return 'POST', '/predict', random_reading()
+    if draw < 0.9:
+        return 'GET', f'/stats/{random.choice(SEED_TYPES)}', None
+    return 'GET', '/predictions?limit=200', None
+
+
+async def run_load(app, n_requests, concurrency):
+    latencies = []
+    remaining = iter(range(n_requests))
+
+    async def worker(client):
+        for _ in remaining:
+            method, url, body = random_request()
+            start = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'rps': n_requests / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000
+    }
+
+
+async def run_lock_scenario(app, db_path, lock_seconds=1.0, n_writes=100, n_reads=200):
+    """Latence des lectures pendant qu'un verrou d'écriture externe bloque les /predict"""
+    locked = threading.Event()
+
+    def hold_write_lock():
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        conn.execute('BEGIN IMMEDIATE')
+        locked.set()
+        time.sleep(lock_seconds)
+        conn.execute('COMMIT')
+        conn.close()
+
+    holder = threading.Thread(target=hold_write_lock)
+    holder.start()
+    locked.wait()
+
+    async def timed(client, method, url, body):
+        start = time.perf_counter()
+        response = await client.request(method, url, json=body)
+        response.raise_for_status()
+        return time.perf_counter() - start
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=30) as client:
+        writes = [timed(client, 'POST', '/predict', random_reading()) for _ in range(n_writes)]
+        reads = [timed(client, 'GET', f'/stats/{random.choice(SEED_TYPES)}', None) if i % 2 else
+                 timed(client, 'POST', '/recommendations', random_reading())
+                 for i in range(n_reads)]
+        results = await asyncio.gather(*writes, *reads)
+    latencies = sorted(results[n_writes:])
+    holder.join()
+    return {
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de concurrence sync/async")
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[16, 64, 256])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['GERMINATION_DB_PATH'] = os.path.join(tmp, 'bench.db')
+        os.environ['PREDICTION_CACHE_SIZE'] = '0'
+        import api
+
+        apps = (("def + pool de threads (ancien)", legacy_app(api)), ("async + executeurs dedies", api.app))
+        print(f"{'mode':<32} | {'concurrence':>11} | {'req/s':>7} | {'p50 ms':>7} | {'p99 ms':>7}")
+        print("-" * 78)
+        for concurrency in args.concurrency:
+            for name, app in apps:
+                result = asyncio.run(run_load(app, args.requests, concurrency))
+                print(f"{name:<32} | {concurrency:>11} | {result['rps']:>7.0f} | "
+                      f"{result['p50_ms']:>7.1f} | {result['p99_ms']:>7.1f}")
+        print(f"Ecritures async: {api.adb.stats()}")
+
+        print()
+        print("Lectures pendant un verrou d'ecriture externe de 1 s (100 /predict en attente):")
+        print(f"{'mode':<32} | {'p50 ms':>7} | {'p99 ms':>7}")
+        print("-" * 52)
+        for name, app in apps:
+            result = asyncio.run(run_lock_scenario(app, os.environ['GERMINATION_DB_PATH']))
+            print(f"{name:<32} | {result['p50_ms']:>7.1f} | {result['p99_ms']:>7.1f}")
+        api.adb.close()
+        api.db.close()
+
+
+if __name__ == "__main__":
+    main()
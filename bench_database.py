@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de GerminationDatabase: connexions persistantes + WAL (actuel) contre une
+connexion ouverte et fermée à chaque appel en mode rollback-journal (ancien comportement).
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from database import GerminationDatabase
+
+N_INSERTS = 2000
+N_READS = 2000
+N_READER_THREADS = 4
+
+
+class LegacyDatabase(GerminationDatabase):
+    """Reproduit l'ancien comportement: une connexion par appel, journal par défaut"""
+
+    def _connection(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def add_prediction(self, *args):
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute('''
+                INSERT INTO predictions (seed_type, temperature, soil_humidity, air_humidity, light_level,
+                                         predicted_score, model_version)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', args)
+        conn.close()
+        return cursor.lastrowid
+
+    def get_predictions(self, limit=100):
+        conn = self._connection()
+        rows = conn.execute('SELECT * FROM predictions ORDER BY timestamp DESC LIMIT ?', (limit,)).fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+
+
+def mesurer(db):
+    start = time.perf_counter()
+    for i in range(N_INSERTS):
+        db.add_prediction('mais', 20 + i % 10, 70, 60, 55, 80.0, 'bench')
+    inserts = N_INSERTS / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(N_READS):
+        db.get_predictions(100)
+    reads = N_READS / (time.perf_counter() - start)
+
+    # Lectures concurrentes pendant qu'un thread écrit
+    stop = threading.Event()
+    counts = []
+
+    def lecteur():
+        n = 0
+        while not stop.is_set():
+            db.get_predictions(20)
+            n += 1
+        counts.append(n)
+
+    def ecrivain():
+        while not stop.is_set():
+            db.add_prediction('riz', 25, 80, 70, 50, 90.0, 'bench')
+
+    threads = [threading.Thread(target=lecteur) for _ in range(N_READER_THREADS)]
+    threads.append(threading.Thread(target=ecrivain))
+    for thread in threads:
+        thread.start()
+    time.sleep(2)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    concurrent_reads = sum(counts) / 2
+    return inserts, reads, concurrent_reads
+
+
+if __name__ == "__main__":
+    print(f"{'mode':<30} | {'insertions/s':>12} | {'lectures/s':>10} | {'lectures/s + ecrivain':>21}")
+    print("-" * 82)
+    for name, cls in (("connexion par appel (ancien)", LegacyDatabase),
+                      ("connexions persistantes + WAL", GerminationDatabase)):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = cls(os.path.join(tmp, 'bench.db'))
+            inserts, reads, concurrent_reads = mesurer(db)
+            print(f"{name:<30} | {inserts:>12.0f} | {reads:>10.0f} | {concurrent_reads:>21.0f}")
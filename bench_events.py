@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark du flux SSE (GET /events) contre le polling de GET /predictions, sur un serveur uvicorn réel.
+
+Pour N tableaux de bord: pendant --duration secondes, une passerelle envoie --rate POST /predict
+par seconde, et les N tableaux de bord suivent les prédictions soit par abonnement SSE, soit en
+interrogeant GET /predictions?limit=100 toutes les --poll-interval secondes. Relevés: CPU du
+serveur, latence de POST /predict, délai entre la réponse à /predict et la réception de
+l'événement par les abonnés (SSE) ou par le polling.
+
+Usage:
+    python bench_events.py [--dashboards 10 100] [--rate 100] [--duration 5]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+
+SEED_TYPES = ['mais', 'riz', 'ble', 'soja', 'tomate', 'haricot', 'carotte', 'laitue', 'concombre', 'poivron']
+
+
+def cpu_seconds(pid):
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] * 1000 if values else float('nan')
+
+
+async def gateway(client, rate, duration, sent_at, latencies):
+    """POST /predict à débit fixe; la température porte un identifiant pour retrouver l'événement"""
+    for i in range(int(rate * duration)):
+        start = time.perf_counter()
+        temperature = 10 + i / 1000
+        response = await client.post('/predict', json={
+            'seed_type': random.choice(SEED_TYPES), 'temperature': temperature,
+            'soil_humidity': 60, 'air_humidity': 60, 'light_level': 50})
+        response.raise_for_status()
+        sent_at[round(temperature, 3)] = time.perf_counter()
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(max(0, 1 / rate - (time.perf_counter() - start)))
+
+
+async def sse_dashboard(url, received):
+    async with httpx.AsyncClient(timeout=None) as client:
+        async with client.stream('GET', f'{url}/events') as response:
+            async for line in response.aiter_lines():
+                if line.startswith('data: '):
+                    now = time.perf_counter()
+                    for prediction in json.loads(line[6:]).get('predictions', ()):
+                        received.setdefault(round(prediction['temperature'], 3), now)
+
+
+async def polling_dashboard(url, interval, received):
+    async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+        while True:
+            response = await client.get('/predictions?limit=100')
+            now = time.perf_counter()
+            for prediction in response.json()['predictions']:
+                received.setdefault(round(prediction['temperature'], 3), now)
+            await asyncio.sleep(interval)
+
+
+async def scenario(url, pid, mode, dashboards, args):
+    # Première réception de chaque prédiction, par tableau de bord
+    received, sent_at, latencies = [{} for _ in range(dashboards)], {}, []
+    if mode == 'sse':
+        tasks = [asyncio.ensure_future(sse_dashboard(url, seen)) for seen in received]
+    else:
+        tasks = [asyncio.ensure_future(polling_dashboard(url, args.poll_interval, seen)) for seen in received]
+    await asyncio.sleep(1)
+    cpu = cpu_seconds(pid)
+    async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+        await gateway(client, args.rate, args.duration, sent_at, latencies)
+        await asyncio.sleep(args.poll_interval if mode == 'poll' else 0.5)
+        cpu = cpu_seconds(pid) - cpu
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    delays = [max(0, at - sent_at[key]) for seen in received for key, at in seen.items() if key in sent_at]
+    return {'cpu': cpu / (args.duration + 0.5), 'predict_p50': percentile(latencies, 0.5),
+            'delay_p50': percentile(delays, 0.5), 'delay_p99': percentile(delays, 0.99)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SSE contre polling")
+    parser.add_argument('--dashboards', type=int, nargs='+', default=[10, 100])
+    parser.add_argument('--rate', type=float, default=100, help="POST /predict par seconde")
+    parser.add_argument('--duration', type=float, default=5)
+    parser.add_argument('--poll-interval', type=float, default=1.0)
+    parser.add_argument('--port', type=int, default=8792)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, GERMINATION_DB_PATH=os.path.join(tmp, 'bench.db'), PREDICTION_CACHE_SIZE='0')
+        server = subprocess.Popen([sys.executable, '-m', 'uvicorn', 'api:app', '--port', str(args.port),
+                                   '--log-level', 'warning'], env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        url = f'http://127.0.0.1:{args.port}'
+        try:
+            deadline = time.monotonic() + 60
+            while True:
+                try:
+                    httpx.get(f'{url}/health').raise_for_status()
+                    break
+                except httpx.HTTPError:
+                    if time.monotonic() > deadline:
+                        raise RuntimeError("uvicorn n'a pas demarre")
+                    time.sleep(0.2)
+
+            print(f"{args.rate:g} POST /predict/s pendant {args.duration:g} s; polling toutes les {args.poll_interval:g} s")
+            print(f"{'tableaux de bord':>16} | {'mode':<8} | {'CPU serveur':>11} | {'/predict p50 ms':>15} | "
+                  f"{'delai p50 ms':>12} | {'delai p99 ms':>12}")
+            print("-" * 92)
+            for dashboards in args.dashboards:
+                for mode in ('poll', 'sse'):
+                    result = asyncio.run(scenario(url, server.pid, mode, dashboards, args))
+                    print(f"{dashboards:>16} | {mode:<8} | {result['cpu'] * 100:>10.0f}% | "
+                          f"{result['predict_p50']:>15.1f} | {result['delay_p50']:>12.0f} | {result['delay_p99']:>12.0f}")
+        finally:
+            server.terminate()
+            server.wait(30)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Compare l'entraînement incrémental (statistiques suffisantes) à un réentraînement complet
+LinearRegression: mêmes coefficients, mais un coût de résolution indépendant de l'historique.
+"""
+import time
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+from incremental import SufficientStatistics
+from inference import NUMERIC_FEATURES
+from main import OPTIMAL_CONDITIONS
+
+TAILLES = [10_000, 100_000, 1_000_000]
+NOUVELLES_LECTURES = 100
+
+
+def generer(n, rng):
+    seed_types = np.array(list(OPTIMAL_CONDITIONS.keys()))[rng.integers(0, len(OPTIMAL_CONDITIONS), n)]
+    features = np.column_stack([
+        rng.uniform(-10, 50, n), rng.uniform(0, 100, n), rng.uniform(0, 100, n), rng.uniform(0, 14, n)
+    ])
+    targets = features @ [1.5, -0.3, 0.4, 2.0] + rng.normal(0, 5, n) + 40
+    return seed_types, features, targets
+
+
+def refit_complet(seed_types, features, targets):
+    df = pd.DataFrame(features, columns=NUMERIC_FEATURES)
+    df['seed_type'] = seed_types
+    encoded = pd.get_dummies(df, columns=['seed_type'])
+    return LinearRegression().fit(encoded, targets), list(encoded.columns)
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    print(f"{'historique':>12} | {'refit complet':>14} | {'incremental':>12} | {'ecart max coef':>14}")
+    print("-" * 62)
+    for taille in TAILLES:
+        seed_types, features, targets = generer(taille, rng)
+        stats = SufficientStatistics()
+        stats.add_many(seed_types[:-NOUVELLES_LECTURES], features[:-NOUVELLES_LECTURES],
+                       targets[:-NOUVELLES_LECTURES])
+
+        start = time.perf_counter()
+        reference, columns = refit_complet(seed_types, features, targets)
+        duree_refit = time.perf_counter() - start
+
+        # Arrivée de nouvelles lectures étiquetées puis résolution
+        start = time.perf_counter()
+        stats.add_many(seed_types[-NOUVELLES_LECTURES:], features[-NOUVELLES_LECTURES:],
+                       targets[-NOUVELLES_LECTURES:])
+        model, incremental_columns = stats.solve()
+        duree_incremental = time.perf_counter() - start
+
+        assert incremental_columns == columns
+        ecart = max(np.abs(model.coef_ - reference.coef_).max(), abs(model.intercept_ - reference.intercept_))
+        print(f"{taille:>12,} | {duree_refit * 1000:>11.1f} ms | {duree_incremental * 1000:>9.2f} ms | {ecart:>14.2e}")
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""Microbenchmark: prédiction pandas (main.predict_score) vs moteur compilé (inference.CompiledModel)"""
+import random
+import time
+import pandas as pd
+from main import train_germination_model, predict_score, light_percent_to_hours, OPTIMAL_CONDITIONS
+from inference import CompiledModel
+
+N_SINGLE = 2000
+N_BATCH = 10000
+FEATURE_COLUMNS = ['seed_type', 'temperature', 'soil_humidity', 'air_humidity', 'light_level']
+
+
+def generer_lectures(n, seed=42):
+    rng = random.Random(seed)
+    seed_types = list(OPTIMAL_CONDITIONS.keys()) + ['inconnue']
+    return [
+        {
+            'seed_type': rng.choice(seed_types),
+            'temperature': rng.uniform(-10, 50),
+            'soil_humidity': rng.uniform(0, 100),
+            'air_humidity': rng.uniform(0, 100),
+            'light_level': rng.uniform(0, 100)
+        }
+        for _ in range(n)
+    ]
+
+
+def predict_scores_batch(model, model_columns, rows):
+    """Référence pandas par lot: un unique DataFrame encodé pour toutes les lectures (light_level en %)"""
+    df = pd.DataFrame(rows, columns=FEATURE_COLUMNS)
+    df['light_level'] = light_percent_to_hours(df['light_level'])
+    df_encoded = pd.get_dummies(df, columns=['seed_type'])
+    df_aligned = df_encoded.reindex(columns=model_columns, fill_value=0)
+    return model.predict(df_aligned)
+
+
+def chronometrer(fonction, repetitions=1):
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        result = fonction()
+    return (time.perf_counter() - start) / repetitions, result
+
+
+if __name__ == "__main__":
+    model, model_columns = train_germination_model('sensors_data.csv')
+    engine = CompiledModel.from_model(model, model_columns)
+    lectures = generer_lectures(N_SINGLE)
+
+    # Vérification: résultats identiques au chemin pandas
+    ecarts = sum(
+        1 for row in lectures
+        if engine.predict_one(**row) != float(predict_score(model, model_columns, row)[0])
+    )
+    print(f"Lectures unitaires differentes du chemin pandas: {ecarts}/{len(lectures)}")
+
+    duree_pandas, _ = chronometrer(lambda: [predict_score(model, model_columns, row) for row in lectures])
+    duree_compile, _ = chronometrer(lambda: [engine.predict_one(**row) for row in lectures])
+    print("\n--- Prediction unitaire ---")
+    print(f"pandas  : {duree_pandas / N_SINGLE * 1e6:10.1f} us/lecture")
+    print(f"compile : {duree_compile / N_SINGLE * 1e6:10.1f} us/lecture")
+    print(f"gain    : x{duree_pandas / duree_compile:.0f}")
+
+    lot = generer_lectures(N_BATCH, seed=7)
+    duree_pandas, scores_pandas = chronometrer(lambda: predict_scores_batch(model, model_columns, lot), 5)
+    duree_compile, scores_compile = chronometrer(lambda: engine.predict_batch(lot), 5)
+    ecart_max = max(abs(a - b) for a, b in zip(scores_pandas, scores_compile))
+    print(f"\n--- Prediction par lot ({N_BATCH} lectures) ---")
+    print(f"pandas  : {duree_pandas / N_BATCH * 1e6:10.2f} us/lecture")
+    print(f"compile : {duree_compile / N_BATCH * 1e6:10.2f} us/lecture")
+    print(f"gain    : x{duree_pandas / duree_compile:.1f}")
+    print(f"ecart max avec le chemin pandas: {ecart_max:.2e}")
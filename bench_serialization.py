@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de la sérialisation des réponses volumineuses (fast_json.py) et de la compression gzip.
+
+1. Temps de sérialisation d'une page de --rows prédictions: chemin par défaut de FastAPI
+   (jsonable_encoder + json.dumps), json.dumps direct, orjson (s'il est installé).
+2. Octets transmis et temps de compression selon le niveau gzip.
+3. GET /predictions?limit=... de bout en bout (transport ASGI), avec et sans Accept-Encoding: gzip.
+
+Usage:
+    python bench_serialization.py [--rows 10000] [--repeat 20]
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import random
+import tempfile
+import time
+import httpx
+from fastapi.encoders import jsonable_encoder
+import fast_json
+
+SEED_TYPES = ['mais', 'riz', 'ble', 'soja', 'tomate', 'haricot', 'carotte', 'laitue', 'concombre', 'poivron']
+
+
+def prediction_records(n):
+    return [(random.choice(SEED_TYPES), round(random.uniform(10, 35), 1), round(random.uniform(40, 90), 1),
+             round(random.uniform(40, 90), 1), round(random.uniform(20, 90), 1), random.uniform(0, 100),
+             'v1', random.random() < 0.2) for _ in range(n)]
+
+
+def best_time(function, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def fastapi_default(content):
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, allow_nan=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def stdlib_direct(content):
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+async def fetch(app, path, repeat, headers):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=60) as client:
+        best, wire = float('inf'), 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            best = min(best, time.perf_counter() - start)
+            response.raise_for_status()
+            wire = int(response.headers['content-length']) if 'content-length' in response.headers else 0
+        return best, wire
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de sérialisation JSON et de compression")
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['GERMINATION_DB_PATH'] = os.path.join(tmp, 'bench.db')
+        import api
+
+        api.db.add_predictions_batch(prediction_records(args.rows))
+        page, next_cursor = api.db.get_history_page('predictions', args.rows)
+        content = {"count": len(page), "predictions": page, "next_cursor": next_cursor}
+
+        print(f"Serialisation d'une page de {len(page)} predictions (meilleur de {args.repeat}):")
+        encoders = [("jsonable_encoder + json.dumps (defaut)", lambda: fastapi_default(content)),
+                    ("json.dumps direct", lambda: stdlib_direct(content))]
+        if fast_json.orjson is not None:
+            encoders.append(("orjson", lambda: fast_json.orjson.dumps(content)))
+        else:
+            print("  (orjson non installe)")
+        reference = None
+        for name, function in encoders:
+            elapsed, body = best_time(function, args.repeat)
+            reference = reference or elapsed
+            assert json.loads(body) == content
+            print(f"  {name:<40} {elapsed * 1000:>7.1f} ms  x{reference / elapsed:.1f}")
+
+        body = fast_json.dumps(content)
+        print(f"\nOctets transmis ({len(body)} octets non compresses):")
+        for level in (1, 5, 9):
+            elapsed, compressed = best_time(lambda: gzip.compress(body, compresslevel=level), args.repeat // 4 or 1)
+            print(f"  gzip niveau {level}: {len(compressed):>8} octets ({len(body) / len(compressed):.1f}x), "
+                  f"{elapsed * 1000:.1f} ms")
+
+        path = f'/predictions?limit={args.rows}'
+        print(f"\nGET {path} de bout en bout (GZIP_MIN_SIZE={api.GZIP_MIN_SIZE}):")
+        for name, headers in (("sans compression", {'Accept-Encoding': 'identity'}),
+                              ("Accept-Encoding: gzip", {'Accept-Encoding': 'gzip'})):
+            elapsed, wire = asyncio.run(fetch(api.app, path, args.repeat // 4 or 1, headers))
+            print(f"  {name:<24} {elapsed * 1000:>7.1f} ms  {wire:>8} octets")
+        api.adb.close()
+        api.db.close()
+
+
+if __name__ == "__main__":
+    main()
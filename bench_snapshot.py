@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Compare le chargement des données d'entraînement: analyse du CSV (pandas, module csv)
+contre l'instantané binaire en colonnes lu par memory mapping (snapshot.py).
+
+Usage:
+    python bench_snapshot.py [--rows 1000000]
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from incremental import SufficientStatistics
+from inference import NUMERIC_FEATURES
+from main import OPTIMAL_CONDITIONS
+from snapshot import TrainingSnapshot
+
+
+def generate_csv(path, n, rng):
+    seeds = np.array(list(OPTIMAL_CONDITIONS.keys()))
+    df = pd.DataFrame({
+        'seed_type': seeds[rng.integers(0, len(seeds), n)],
+        'temperature': rng.uniform(-10, 50, n).round(1),
+        'soil_humidity': rng.uniform(0, 100, n).round(1),
+        'air_humidity': rng.uniform(0, 100, n).round(1),
+        'light_level': rng.uniform(0, 14, n).round(2),
+    })
+    df['germination_score'] = (df[NUMERIC_FEATURES].to_numpy() @ [1.5, -0.3, 0.4, 2.0] + 40).round(1)
+    df.to_csv(path, index=False)
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def with_pandas(path):
+    df = pd.read_csv(path)
+    stats = SufficientStatistics()
+    stats.add_many(df['seed_type'].to_numpy(), df[NUMERIC_FEATURES].to_numpy(), df['germination_score'].to_numpy())
+    return stats
+
+
+def with_csv_module(path):
+    stats = SufficientStatistics()
+    stats.add_csv(path)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CSV contre instantané binaire")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'data.csv')
+        generate_csv(csv_path, args.rows, np.random.default_rng(0))
+        snapshot = TrainingSnapshot(os.path.join(tmp, 'snapshot'))
+        _, export_time = timed(lambda: snapshot.sync(csv_path))
+        sizes = {'csv': os.path.getsize(csv_path),
+                 'instantane': sum(os.path.getsize(os.path.join(snapshot.path, name))
+                                   for name in os.listdir(snapshot.path))}
+
+        reference, pandas_time = timed(lambda: with_pandas(csv_path))
+        _, csv_time = timed(lambda: with_csv_module(csv_path))
+        stats, snapshot_time = timed(lambda: TrainingSnapshot(snapshot.path).statistics())
+        _, append_time = timed(lambda: snapshot.append(['mais'] * 1000, np.ones((1000, 4)), np.ones(1000)))
+
+        model, _ = stats.solve()
+        expected, _ = reference.solve()
+        print(f"{args.rows:,} lignes: CSV {sizes['csv'] / 1e6:.1f} Mo, instantane {sizes['instantane'] / 1e6:.1f} Mo "
+              f"(export initial {export_time:.2f} s)")
+        print(f"{'chargement + statistiques':<34} | {'duree':>9}")
+        print("-" * 48)
+        print(f"{'pandas.read_csv':<34} | {pandas_time * 1000:>6.0f} ms")
+        print(f"{'module csv (SufficientStatistics)':<34} | {csv_time * 1000:>6.0f} ms")
+        print(f"{'instantane np.memmap':<34} | {snapshot_time * 1000:>6.0f} ms")
+        print(f"Ajout de 1000 lectures etiquetees: {append_time * 1000:.1f} ms")
+        print(f"Ecart max des coefficients (float32 vs float64): {np.abs(model.coef_ - expected.coef_).max():.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark des backends de stockage (sqlite, memory, columnar), sans l'API:
+- insertion de lectures par lots (ingestion en masse),
+- insertion de prédictions une par une (chemin de /predict sans commit groupé),
+- lecture de pages d'historique et de statistiques.
+
+Usage:
+    python bench_storage.py [--rows 100000] [--batch-size 1000]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from storage import STORAGE_BACKENDS, create_storage
+
+SEED_TYPES = ['mais', 'riz', 'ble', 'soja', 'tomate', 'haricot', 'carotte', 'laitue', 'concombre', 'poivron']
+
+
+def readings(n):
+    rng = random.Random(42)
+    start = time.mktime((2026, 1, 1, 0, 0, 0, 0, 0, 0))
+    return [(rng.choice(SEED_TYPES), round(rng.uniform(10, 35), 1), round(rng.uniform(40, 90), 1),
+             round(rng.uniform(40, 90), 1), round(rng.uniform(20, 90), 1), round(rng.uniform(0, 100), 1),
+             time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start + i * 30)))
+            for i in range(n)]
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def bench(storage, rows, batch_size, n_predictions=2000, n_reads=2000):
+    def insert_batches():
+        for i in range(0, len(rows), batch_size):
+            storage.add_sensor_data_batch(rows[i:i + batch_size])
+
+    def insert_predictions():
+        for i in range(n_predictions):
+            storage.add_prediction(SEED_TYPES[i % 10], 25.0, 70.0, 60.0, 55.0, 80.0, 'bench', False)
+
+    def read_pages():
+        for i in range(n_reads):
+            storage.get_history_page('sensor_data', 100, seed_type=SEED_TYPES[i % 10])
+            storage.get_stats_by_seed_type(SEED_TYPES[i % 10])
+
+    return {
+        'batch_rows_s': len(rows) / timed(insert_batches),
+        'single_rows_s': n_predictions / timed(insert_predictions),
+        'read_ms': timed(read_pages) / n_reads * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des backends de stockage")
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    rows = readings(args.rows)
+    print(f"{'backend':<10} | {'lots lignes/s':>13} | {'unitaire lignes/s':>17} | {'page+stats ms':>13} | {'ouverture s':>11}")
+    print("-" * 78)
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in STORAGE_BACKENDS:
+            path = os.path.join(tmp, backend)
+            storage = create_storage(backend, path)
+            result = bench(storage, rows, args.batch_size)
+            storage.close()
+            # Réouverture: reconstruction des index en mémoire pour le journal en colonnes
+            start = time.perf_counter()
+            create_storage(backend, path).close()
+            reopen = time.perf_counter() - start if backend != 'memory' else 0.0
+            print(f"{backend:<10} | {result['batch_rows_s']:>13.0f} | {result['single_rows_s']:>17.0f} | "
+                  f"{result['read_ms']:>13.3f} | {reopen:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
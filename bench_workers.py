@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Débit du mode multi-workers (gunicorn.conf.py) selon le nombre de workers, et mémoire
+partagée en copie sur écriture entre les workers.
+
+Pour chaque nombre de workers: démarre gunicorn sur une base temporaire, envoie une charge
+de POST /predict (inférence + écriture via le processus d'écriture) et de POST /recommendations
+(CPU seul) depuis des processus clients, puis relève le PSS/USS des workers (/proc/<pid>/smaps_rollup).
+
+Usage:
+    python bench_workers.py [--workers 1 2 4] [--requests 4000] [--concurrency 64]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+
+SEED_TYPES = ['mais', 'riz', 'ble', 'soja', 'tomate', 'haricot', 'carotte', 'laitue', 'concombre', 'poivron']
+
+
+def random_reading():
+    return {
+        'seed_type': random.choice(SEED_TYPES),
+        'temperature': round(random.uniform(10, 35), 1),
+        'soil_humidity': round(random.uniform(40, 90), 1),
+        'air_humidity': round(random.uniform(40, 90), 1),
+        'light_level': round(random.uniform(20, 90), 1)
+    }
+
+
+async def client_load(url, path, n_requests, concurrency):
+    remaining = iter(range(n_requests))
+
+    async def worker(client):
+        for _ in remaining:
+            response = await client.post(path, json=random_reading())
+            response.raise_for_status()
+
+    async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+
+
+def run_client(args):
+    asyncio.run(client_load(*args))
+
+
+def load(url, path, n_requests, concurrency, clients):
+    """Charge répartie sur plusieurs processus clients (un seul client saturerait avant le serveur)"""
+    share = (url, path, n_requests // clients, concurrency // clients)
+    start = time.perf_counter()
+    with multiprocessing.Pool(clients) as pool:
+        pool.map(run_client, [share] * clients)
+    return n_requests // clients * clients / (time.perf_counter() - start)
+
+
+def memory_kb(pid):
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:', 'Private_Clean:', 'Private_Dirty:'):
+                values[parts[0][:-1]] = int(parts[1])
+    return {'rss': values['Rss'], 'pss': values['Pss'], 'uss': values['Private_Clean'] + values['Private_Dirty']}
+
+
+def children(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as f:
+        return [int(child) for child in f.read().split()]
+
+
+def bench(workers, args, port):
+    with tempfile.TemporaryDirectory() as tmp:
+        pid_file = os.path.join(tmp, 'gunicorn.pid')
+        env = dict(os.environ, WEB_CONCURRENCY=str(workers), PORT=str(port),
+                   GERMINATION_DB_PATH=os.path.join(tmp, 'bench.db'), PREDICTION_CACHE_SIZE='0',
+                   GERMINATION_WRITER_ADDRESS=os.path.join(tmp, 'writer.sock'))
+        server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--pid', pid_file,
+                                   '--log-level', 'warning', 'api:app'],
+                                  env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        url = f'http://127.0.0.1:{port}'
+        try:
+            deadline = time.monotonic() + 60
+            while True:
+                try:
+                    if httpx.get(f'{url}/health').status_code == 200 and len(children(server.pid)) > workers:
+                        break
+                except (httpx.HTTPError, FileNotFoundError):
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError("gunicorn n'a pas demarre")
+                time.sleep(0.2)
+            # Préchauffage de chaque worker
+            load(url, '/recommendations', 200 * workers, 16, 1)
+            result = {
+                'predict': load(url, '/predict', args.requests, args.concurrency, args.clients),
+                'recommendations': load(url, '/recommendations', args.requests, args.concurrency, args.clients)
+            }
+            worker_pids = [pid for pid in children(server.pid)
+                           if 'spawn_main' not in open(f'/proc/{pid}/cmdline').read()]
+            memory = [memory_kb(pid) for pid in worker_pids]
+            result['rss_mb'] = sum(m['rss'] for m in memory) / len(memory) / 1024
+            result['pss_mb'] = sum(m['pss'] for m in memory) / len(memory) / 1024
+            result['uss_mb'] = sum(m['uss'] for m in memory) / len(memory) / 1024
+            return result
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du mode multi-workers")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--requests', type=int, default=4000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--clients', type=int, default=2, help="Processus clients générant la charge")
+    parser.add_argument('--port', type=int, default=8790)
+    args = parser.parse_args()
+
+    print(f"CPU disponibles: {os.cpu_count()}")
+    print(f"{'workers':>7} | {'/predict req/s':>14} | {'/recommendations req/s':>22} | "
+          f"{'RSS Mo':>7} | {'PSS Mo':>7} | {'USS Mo':>7}")
+    print("-" * 80)
+    for workers in args.workers:
+        result = bench(workers, args, args.port)
+        print(f"{workers:>7} | {result['predict']:>14.0f} | {result['recommendations']:>22.0f} | "
+              f"{result['rss_mb']:>7.1f} | {result['pss_mb']:>7.1f} | {result['uss_mb']:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
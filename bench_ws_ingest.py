@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de l'ingestion WebSocket (/ws/ingest) contre HTTP, sur un serveur uvicorn réel.
+
+1. Débit: --readings lectures envoyées par une passerelle
+   - HTTP: POST /sensor-data puis POST /predict par lecture (connexion keep-alive);
+   - WebSocket, une lecture par trame (trames envoyées sans attendre les réponses);
+   - WebSocket, lots de --frame-size lectures par trame.
+2. Client lent: la passerelle envoie --slow-frames trames sans lire les réponses; la mémoire
+   du serveur (RSS) reste stable, la file de la connexion étant bornée (WS_QUEUE_SIZE).
+
+Nécessite websockets (pip install websockets, inclus dans uvicorn[standard]).
+
+Usage:
+    python bench_ws_ingest.py [--readings 5000] [--frame-size 50] [--slow-frames 200000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+import websockets
+
+SEED_TYPES = ['mais', 'riz', 'ble', 'soja', 'tomate', 'haricot', 'carotte', 'laitue', 'concombre', 'poivron']
+
+
+def random_reading():
+    return {
+        'seed_type': random.choice(SEED_TYPES),
+        'temperature': round(random.uniform(10, 35), 1),
+        'soil_humidity': round(random.uniform(40, 90), 1),
+        'air_humidity': round(random.uniform(40, 90), 1),
+        'light_level': round(random.uniform(20, 90), 1)
+    }
+
+
+def rss_mb(pid):
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0
+
+
+async def http_ingest(url, readings):
+    async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+        for reading in readings:
+            (await client.post('/sensor-data', json=reading)).raise_for_status()
+            (await client.post('/predict', json=reading)).raise_for_status()
+
+
+async def ws_ingest(ws_url, frames):
+    async with websockets.connect(ws_url, max_size=None, ping_interval=None) as ws:
+        async def send():
+            for frame in frames:
+                await ws.send(json.dumps(frame))
+
+        sender = asyncio.ensure_future(send())
+        for _ in frames:
+            response = json.loads(await ws.recv())
+            assert 'error' not in response, response
+        await sender
+
+
+async def slow_client(ws_url, n_frames, server_pid, metrics_url, duration=8.0):
+    """
+    Envoie n_frames trames sans lire les réponses et relève, pendant duration secondes, les trames
+    envoyées, les trames traitées par le serveur et la RSS du serveur. L'écart envoyé - traité reste
+    dans les tampons TCP (et la bibliothèque cliente), pas dans le processus serveur.
+    """
+    samples = []
+    async with websockets.connect(ws_url, max_size=None, ping_interval=None) as ws:
+        sent = 0
+
+        async def send():
+            nonlocal sent
+            for i in range(n_frames):
+                await ws.send(json.dumps(dict(random_reading(), id=i)))
+                sent += 1
+                if i % 1000 == 0:
+                    # send() ne rend la main que si le tampon d'envoi est plein: laisse passer les relevés
+                    await asyncio.sleep(0)
+
+        sender = asyncio.ensure_future(send())
+        start = time.monotonic()
+        while time.monotonic() - start < duration:
+            await asyncio.sleep(1)
+            async with httpx.AsyncClient() as client:
+                metrics = (await client.get(metrics_url)).json()['ws_ingest']
+            samples.append((time.monotonic() - start, sent, metrics['frames'],
+                            metrics['backpressure_waits'], rss_mb(server_pid)))
+        sender.cancel()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'ingestion WebSocket")
+    parser.add_argument('--readings', type=int, default=5000)
+    parser.add_argument('--frame-size', type=int, default=50)
+    parser.add_argument('--slow-frames', type=int, default=200000)
+    parser.add_argument('--port', type=int, default=8791)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, GERMINATION_DB_PATH=os.path.join(tmp, 'bench.db'), PREDICTION_CACHE_SIZE='0')
+        # Pings espacés: un client qui sature le serveur plus de ws-ping-timeout (20 s par défaut)
+        # est déconnecté, son pong restant derrière les trames non lues
+        server = subprocess.Popen([sys.executable, '-m', 'uvicorn', 'api:app', '--port', str(args.port),
+                                   '--log-level', 'warning', '--ws-ping-interval', '600'], env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        url, ws_url = f'http://127.0.0.1:{args.port}', f'ws://127.0.0.1:{args.port}/ws/ingest'
+        try:
+            deadline = time.monotonic() + 60
+            while True:
+                try:
+                    httpx.get(f'{url}/health').raise_for_status()
+                    break
+                except httpx.HTTPError:
+                    if time.monotonic() > deadline:
+                        raise RuntimeError("uvicorn n'a pas demarre")
+                    time.sleep(0.2)
+
+            readings = [random_reading() for _ in range(args.readings)]
+            batches = [{'id': i, 'readings': readings[i:i + args.frame_size]}
+                       for i in range(0, len(readings), args.frame_size)]
+            print(f"{args.readings} lectures (enregistrement + prediction):")
+            for name, run in (("HTTP /sensor-data + /predict", lambda: http_ingest(url, readings)),
+                              ("WebSocket, 1 lecture/trame", lambda: ws_ingest(ws_url, readings)),
+                              (f"WebSocket, {args.frame_size} lectures/trame", lambda: ws_ingest(ws_url, batches))):
+                start = time.perf_counter()
+                asyncio.run(run())
+                elapsed = time.perf_counter() - start
+                print(f"  {name:<32} {args.readings / elapsed:>8.0f} lectures/s")
+
+            print(f"\nClient lent ({args.slow_frames} trames envoyees sans lire les reponses, "
+                  f"RSS serveur avant: {rss_mb(server.pid):.0f} Mo):")
+            print(f"  {'t (s)':>5} | {'envoyees':>8} | {'traitees':>8} | {'hors serveur':>12} | {'attentes':>8} | {'RSS Mo':>6}")
+            for elapsed, sent, frames, waits, rss in asyncio.run(
+                    slow_client(ws_url, args.slow_frames, server.pid, f'{url}/metrics')):
+                print(f"  {elapsed:>5.1f} | {sent:>8} | {frames:>8} | {sent - frames:>12} | {waits:>8} | {rss:>6.0f}")
+        finally:
+            server.terminate()
+            server.wait(30)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Import en masse de lectures de capteurs (CSV ou NDJSON) pour POST /sensor-data/bulk.
+
+Le corps de la requête est lu au fil de l'eau: chaque bloc reçu est découpé en lignes,
+validé, et les lectures valides sont écrites par paquets de taille fixe, chacun dans sa
+propre transaction (executemany). La mémoire utilisée ne dépend pas de la taille du fichier.
+"""
+import codecs
+import csv
+import json
+import math
+from datetime import datetime, timezone
+
+# Bornes identiques à celles de SensorInput
+SENSOR_LIMITS = {
+    'temperature': (-10, 50),
+    'soil_humidity': (0, 100),
+    'air_humidity': (0, 100),
+    'light_level': (0, 100)
+}
+REQUIRED_COLUMNS = ('seed_type',) + tuple(SENSOR_LIMITS)
+BULK_FORMATS = ('csv', 'ndjson')
+
+# Taille par défaut d'une transaction et nombre maximal d'erreurs détaillées dans la réponse
+DEFAULT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+
+def parse_timestamp(value):
+    """Date ISO 8601 -> texte comparable à la colonne timestamp (UTC), None si absente"""
+    if value is None or value == '':
+        return None
+    parsed = datetime.fromisoformat(str(value).strip())
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def parse_reading(seed_type, temperature, soil_humidity, air_humidity, light_level,
+                  germination_score=None, timestamp=None):
+    """
+    Valide une lecture et retourne le tuple attendu par GerminationDatabase.add_sensor_data_batch.
+    Lève ValueError avec un message explicite si une valeur est absente ou invalide.
+    """
+    seed_type = seed_type.strip() if isinstance(seed_type, str) else seed_type
+    if not seed_type or not isinstance(seed_type, str):
+        raise ValueError("seed_type manquant")
+    values = [seed_type]
+    for name, raw in zip(SENSOR_LIMITS, (temperature, soil_humidity, air_humidity, light_level)):
+        if raw is None or raw == '':
+            raise ValueError(f"{name} manquant")
+        try:
+            value = float(raw)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} n'est pas un nombre: {raw!r}")
+        low, high = SENSOR_LIMITS[name]
+        if not low <= value <= high:
+            raise ValueError(f"{name}={value} hors de l'intervalle [{low}, {high}]")
+        values.append(value)
+    if germination_score is None or germination_score == '':
+        values.append(None)
+    else:
+        try:
+            score = float(germination_score)
+        except (TypeError, ValueError):
+            raise ValueError(f"germination_score n'est pas un nombre: {germination_score!r}")
+        if not math.isfinite(score):
+            raise ValueError(f"germination_score invalide: {germination_score!r}")
+        values.append(score)
+    try:
+        values.append(parse_timestamp(timestamp))
+    except (TypeError, ValueError):
+        raise ValueError(f"timestamp invalide: {timestamp!r}")
+    return tuple(values)
+
+
+async def iter_line_blocks(chunks):
+    """
+    Découpe un flux asynchrone d'octets en blocs de lignes complètes (une liste par bloc reçu).
+    Les octets invalides en UTF-8 sont remplacés: la ligne concernée sera rejetée à la validation.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8-sig')(errors='replace')
+    pending = ''
+    async for chunk in chunks:
+        lines = (pending + decoder.decode(chunk)).split('\n')
+        pending = lines.pop()
+        if lines:
+            yield lines
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield [pending]
+
+
+async def iter_readings(chunks, format):
+    """
+    Produit (numéro de ligne, tuple validé ou None, message d'erreur ou None) pour chaque
+    ligne non vide du corps. Lève ValueError si l'en-tête CSV est inutilisable.
+    """
+    if format not in BULK_FORMATS:
+        raise ValueError(f"Format inconnu: {format}")
+    line_number = 0
+    positions = None
+    async for lines in iter_line_blocks(chunks):
+        first_line = line_number + 1
+        line_number += len(lines)
+        lines = [line.rstrip('\r') for line in lines]
+
+        if format == 'ndjson':
+            for offset, line in enumerate(lines):
+                if not line.strip():
+                    continue
+                try:
+                    reading = json.loads(line)
+                    if not isinstance(reading, dict):
+                        raise ValueError("la ligne n'est pas un objet JSON")
+                    record = parse_reading(*(reading.get(name) for name in REQUIRED_COLUMNS),
+                                           reading.get('germination_score'), reading.get('timestamp'))
+                except (ValueError, TypeError) as e:
+                    yield first_line + offset, None, str(e)
+                    continue
+                yield first_line + offset, record, None
+            continue
+
+        for offset, row in enumerate(csv.reader(lines)):
+            if not row or (len(row) == 1 and not row[0].strip()):
+                continue
+            if positions is None:
+                # Première ligne non vide: en-tête (mêmes colonnes que sensors_data.csv, timestamp optionnel)
+                header = [name.strip() for name in row]
+                missing = [name for name in REQUIRED_COLUMNS if name not in header]
+                if missing:
+                    raise ValueError(f"Colonnes manquantes dans l'en-tête CSV: {', '.join(missing)}")
+                positions = [header.index(name) if name in header else None
+                             for name in REQUIRED_COLUMNS + ('germination_score', 'timestamp')]
+                continue
+            try:
+                record = parse_reading(*(row[i] if i is not None and i < len(row) else None for i in positions))
+            except ValueError as e:
+                yield first_line + offset, None, str(e)
+                continue
+            yield first_line + offset, record, None
+
+
+async def ingest(chunks, format, write_batch, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Importe un corps CSV/NDJSON et retourne un rapport: lignes lues, insérées, rejetées,
+    détail par transaction et premières erreurs de validation.
+
+    Args:
+        chunks: Itérable asynchrone d'octets (request.stream())
+        format: 'csv' ou 'ndjson'
+        write_batch: Coroutine écrivant une liste de tuples en une transaction
+        chunk_size: Nombre de lectures par transaction
+    """
+    report = {'format': format, 'rows': 0, 'inserted': 0, 'rejected': 0, 'failed': 0,
+              'chunks': [], 'errors': [], 'errors_truncated': False}
+    batch, batch_lines = [], []
+
+    async def flush():
+        entry = {'chunk': len(report['chunks']) + 1, 'first_line': batch_lines[0],
+                 'last_line': batch_lines[-1], 'inserted': 0}
+        try:
+            await write_batch(batch)
+            entry['inserted'] = len(batch)
+            report['inserted'] += len(batch)
+        except Exception as e:
+            # Transaction annulée: aucune lecture de ce paquet n'est enregistrée
+            entry['error'] = str(e)
+            report['failed'] += len(batch)
+        report['chunks'].append(entry)
+
+    async for line, record, error in iter_readings(chunks, format):
+        report['rows'] += 1
+        if error is not None:
+            report['rejected'] += 1
+            if len(report['errors']) < MAX_REPORTED_ERRORS:
+                report['errors'].append({'line': line, 'error': error})
+            else:
+                report['errors_truncated'] = True
+            continue
+        batch.append(record)
+        batch_lines.append(line)
+        if len(batch) >= chunk_size:
+            await flush()
+            batch, batch_lines = [], []
+    if batch:
+        await flush()
+    return report
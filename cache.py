@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Cache LRU borné pour les résultats de /predict et /recommendations.
+
+Les capteurs ont une résolution fixe: les mêmes lectures reviennent en permanence.
+La clé est le tuple (seed_type, temperature, soil_humidity, air_humidity, light_level),
+éventuellement quantifié. Le cache est vidé dès que la version du modèle change.
+"""
+import threading
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """Cache LRU thread-safe avec invalidation par version de modèle"""
+
+    def __init__(self, maxsize=4096, quantum=0.0):
+        """
+        Args:
+            maxsize: Nombre maximal d'entrées (0 désactive le cache)
+            quantum: Pas de quantification des valeurs numériques de la clé (0 = valeurs exactes).
+                     Avec un pas non nul, des lectures voisines partagent le même résultat.
+        """
+        self.maxsize = maxsize
+        self.quantum = quantum
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def make_key(self, seed_type, temperature, soil_humidity, air_humidity, light_level):
+        values = (temperature, soil_humidity, air_humidity, light_level)
+        if self.quantum:
+            values = tuple(round(value / self.quantum) for value in values)
+        return (seed_type,) + values
+
+    def _check_version(self, version):
+        # Appelé sous verrou
+        if version != self._version:
+            if self._entries:
+                self._entries.clear()
+                self.invalidations += 1
+            self._version = version
+
+    def get(self, key, version=None):
+        """Retourne la valeur en cache pour cette version du modèle, ou None"""
+        if not self.maxsize:
+            return None
+        with self._lock:
+            self._check_version(version)
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, version=None):
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'quantum': self.quantum,
+                'model_version': self._version,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Backend de stockage en journal de colonnes, en ajout seul (STORAGE_BACKEND=columnar).
+
+Pour l'ingestion à haut débit: une écriture par lot ajoute un bloc binaire à la fin
+d'un fichier par colonne, sans index ni transaction à maintenir sur disque. Les index,
+seed_stats et rollups vivent en mémoire (MemoryStorage) et sont reconstruits en
+rejouant le journal à l'ouverture.
+
+Répertoire du journal:
+- manifest.json: version du format et type numpy de chaque colonne
+- strings.jsonl: dictionnaire des chaînes (seed_type, model_version), une chaîne JSON par ligne;
+  les colonnes stockent le rang de la chaîne (-1 = NULL)
+- <table>.<colonne>.bin: valeurs brutes de la colonne (numpy tofile); scores NULL = NaN,
+  timestamps en secondes depuis l'epoch (UTC)
+
+Une écriture interrompue peut laisser des colonnes de longueurs différentes: à l'ouverture,
+toutes les colonnes d'une table sont tronquées à la plus courte (les lignes incomplètes
+sont perdues, les autres restent cohérentes).
+"""
+import json
+import os
+from typing import Dict, List
+
+import numpy as np
+
+from memory_storage import TABLE_COLUMNS, MemoryStorage
+
+LOG_FORMAT_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+STRINGS_FILE = 'strings.jsonl'
+
+# Type numpy de chaque colonne stockée
+COLUMN_TYPES = {
+    table: {column: {'id': '<i8', 'seed_type': '<i4', 'model_version': '<i4', 'timestamp': '<i8',
+                     'out_of_range': 'u1'}.get(column, '<f8')
+            for column in columns}
+    for table, columns in TABLE_COLUMNS.items()
+}
+_STRING_COLUMNS = ('seed_type', 'model_version')
+
+
+def _to_epoch(timestamps) -> np.ndarray:
+    """Timestamps 'YYYY-MM-DD HH:MM:SS' (UTC) -> secondes depuis l'epoch (ValueError si invalide)"""
+    return np.asarray(timestamps, dtype='datetime64[s]').astype('<i8')
+
+
+def _from_epoch(values: np.ndarray) -> List[str]:
+    return np.char.replace(np.datetime_as_string(values.astype('datetime64[s]')), 'T', ' ').tolist()
+
+
+class ColumnarLogStorage(MemoryStorage):
+    """Journal de colonnes sur disque, servi depuis les index en mémoire de MemoryStorage"""
+
+    name = 'columnar'
+
+    def __init__(self, log_dir='germination_log', fsync=False):
+        """
+        Args:
+            log_dir: Répertoire du journal (créé s'il n'existe pas)
+            fsync: Force l'écriture sur disque à chaque lot (plus lent; sinon flush seulement)
+        """
+        super().__init__()
+        self.log_dir = log_dir
+        self.fsync = fsync
+        self._strings = []
+        self._string_codes = {}
+        self._files = {}
+        os.makedirs(log_dir, exist_ok=True)
+        self._check_manifest()
+        self._load()
+
+    def _path(self, name):
+        return os.path.join(self.log_dir, name)
+
+    def _check_manifest(self):
+        path = self._path(MANIFEST_FILE)
+        manifest = {'format': LOG_FORMAT_VERSION, 'tables': COLUMN_TYPES}
+        if not os.path.exists(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+            return
+        with open(path, encoding='utf-8') as f:
+            existing = json.load(f)
+        if existing != json.loads(json.dumps(manifest)):
+            raise ValueError(f"Journal incompatible dans {self.log_dir} "
+                             f"(format {existing.get('format')}, attendu {LOG_FORMAT_VERSION})")
+
+    def _load(self):
+        """Relit le dictionnaire de chaînes et rejoue les colonnes dans les index en mémoire"""
+        path = self._path(STRINGS_FILE)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                content = f.read()
+            # Une dernière ligne sans fin de ligne est une écriture interrompue
+            complete = content[:content.rfind(b'\n') + 1]
+            if len(complete) < len(content):
+                with open(path, 'r+b') as f:
+                    f.truncate(len(complete))
+            for line in complete.decode('utf-8').splitlines():
+                value = json.loads(line)
+                self._string_codes[value] = len(self._strings)
+                self._strings.append(value)
+        self._strings_file = open(path, 'a', encoding='utf-8')
+
+        for table, types in COLUMN_TYPES.items():
+            paths = {column: self._path(f'{table}.{column}.bin') for column in types}
+            length = min(os.path.getsize(p) // np.dtype(types[c]).itemsize if os.path.exists(p) else 0
+                         for c, p in paths.items())
+            columns = {}
+            for column, p in paths.items():
+                if os.path.exists(p) and os.path.getsize(p) != length * np.dtype(types[column]).itemsize:
+                    with open(p, 'r+b') as f:
+                        f.truncate(length * np.dtype(types[column]).itemsize)
+                columns[column] = np.fromfile(p, dtype=types[column], count=length) if length else None
+                self._files[table, column] = open(p, 'ab')
+            if length:
+                self._store(table, list(zip(*(self._decode(table, column, values)
+                                               for column, values in columns.items()))))
+
+    def _decode(self, table, column, values: np.ndarray) -> list:
+        if column in _STRING_COLUMNS:
+            strings = self._strings
+            return [strings[code] if code >= 0 else None for code in values.tolist()]
+        if column == 'timestamp':
+            return _from_epoch(values)
+        if column == TABLE_COLUMNS[table][6]:
+            return [None if score != score else score for score in values.tolist()]
+        return values.tolist()
+
+    def _code(self, value) -> int:
+        """Rang d'une chaîne dans le dictionnaire (ajoutée au fichier si nouvelle)"""
+        if value is None:
+            return -1
+        code = self._string_codes.get(value)
+        if code is None:
+            code = len(self._strings)
+            self._strings_file.write(json.dumps(value, ensure_ascii=False) + '\n')
+            self._strings.append(value)
+            self._string_codes[value] = code
+        return code
+
+    def _write(self, table: str, rows: List[tuple]):
+        """Ajoute le lot à chaque fichier de colonne, puis aux index en mémoire"""
+        types = COLUMN_TYPES[table]
+        encoded = {}
+        for column, values in zip(TABLE_COLUMNS[table], zip(*rows)):
+            if column in _STRING_COLUMNS:
+                values = [self._code(value) for value in values]
+            elif column == 'timestamp':
+                values = _to_epoch(values)
+            elif column == TABLE_COLUMNS[table][6]:
+                values = [np.nan if value is None else value for value in values]
+            encoded[column] = np.asarray(values, dtype=types[column])
+        # Le dictionnaire est sur disque avant les codes qui y font référence
+        self._strings_file.flush()
+        for column, values in encoded.items():
+            f = self._files[table, column]
+            values.tofile(f)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        self._store(table, rows)
+
+    def close(self):
+        """Ferme les fichiers du journal"""
+        with self._lock:
+            for f in self._files.values():
+                f.close()
+            self._files = {}
+            self._strings_file.close()
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        stats['log_dir'] = self.log_dir
+        stats['size_bytes'] = sum(os.path.getsize(self._path(name)) for name in os.listdir(self.log_dir))
+        return stats
@@ -1,127 +1,642 @@
 # -*- coding: utf-8 -*-
+import base64
 import sqlite3
+import threading
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional, Tuple
+from storage import StorageBackend
 
-class GerminationDatabase:
+# Pragmas appliqués à chaque connexion. Le mode WAL permet aux lecteurs de ne jamais
+# attendre l'écrivain; synchronous=NORMAL reste sûr en WAL (pas de corruption possible,
+# seules les dernières transactions peuvent être perdues en cas de coupure de courant).
+CONNECTION_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA cache_size=-16000',      # 16 Mo de cache de pages
+    'PRAGMA mmap_size=268435456',    # lectures via mmap jusqu'à 256 Mo
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA busy_timeout=5000'
+)
+
+# Nombre de requêtes préparées conservées par connexion
+STATEMENT_CACHE_SIZE = 128
+
+# Requêtes partagées par les insertions unitaires et par lot (même requête préparée).
+# timestamp NULL: date courante (les lectures importées en masse peuvent fournir la leur)
+INSERT_SENSOR_DATA_SQL = '''
+    INSERT INTO sensor_data (seed_type, temperature, soil_humidity, air_humidity, light_level,
+                             germination_score, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+'''
+
+INSERT_PREDICTION_SQL = '''
+    INSERT INTO predictions (seed_type, temperature, soil_humidity, air_humidity, light_level,
+                             predicted_score, model_version, out_of_range)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Tables exposées par l'historique paginé
+HISTORY_TABLES = ('sensor_data', 'predictions')
+
+def encode_cursor(row) -> str:
+    """Curseur opaque de pagination: position (timestamp, id) de la dernière ligne lue"""
+    raw = f"{row['timestamp']}|{row['id']}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Décode un curseur de pagination (ValueError si invalide)"""
+    try:
+        timestamp, row_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').rsplit('|', 1)
+        return timestamp, int(row_id)
+    except Exception:
+        raise ValueError(f"Curseur de pagination invalide: {cursor}")
+
+def _history_query(table: str, seed_type: Optional[str] = None, start: Optional[str] = None,
+                   end: Optional[str] = None, cursor: Optional[str] = None):
+    """
+    Requête de l'historique d'une table, de la plus récente à la plus ancienne.
+    La pagination par clé (keyset) reprend strictement après (timestamp, id) du curseur,
+    ce qui reste en O(taille de page) quelle que soit la profondeur.
+    """
+    if table not in HISTORY_TABLES:
+        raise ValueError(f"Table inconnue: {table}")
+    conditions, params = [], []
+    if seed_type is not None:
+        conditions.append('seed_type = ?')
+        params.append(seed_type)
+    if start is not None:
+        conditions.append('timestamp >= ?')
+        params.append(start)
+    if end is not None:
+        conditions.append('timestamp < ?')
+        params.append(end)
+    if cursor is not None:
+        conditions.append('(timestamp, id) < (?, ?)')
+        params.extend(decode_cursor(cursor))
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    return f'SELECT * FROM {table} {where} ORDER BY timestamp DESC, id DESC', params
+
+# --- Migrations de schéma ---
+# Chaque migration est une fonction recevant une connexion dans une transaction ouverte.
+# Ne jamais modifier une migration publiée: en ajouter une nouvelle à la fin de MIGRATIONS.
+
+def _migration_initial_schema(conn):
+    """Tables sensor_data et predictions (compatible avec les bases créées avant les migrations)"""
+    # Table pour les données de capteurs
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS sensor_data (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            seed_type TEXT NOT NULL,
+            temperature REAL NOT NULL,
+            soil_humidity REAL NOT NULL,
+            air_humidity REAL NOT NULL,
+            light_level REAL NOT NULL,
+            germination_score REAL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Table pour l'historique des prédictions
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS predictions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            seed_type TEXT NOT NULL,
+            temperature REAL NOT NULL,
+            soil_humidity REAL NOT NULL,
+            air_humidity REAL NOT NULL,
+            light_level REAL NOT NULL,
+            predicted_score REAL NOT NULL,
+            model_version TEXT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Bases créées avant l'ajout de la version du modèle
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(predictions)')]
+    if 'model_version' not in columns:
+        conn.execute('ALTER TABLE predictions ADD COLUMN model_version TEXT')
+
+def _migration_history_indexes(conn):
+    """Index pour les requêtes triées par date et les statistiques par type de graine"""
+    # ORDER BY timestamp DESC, id DESC LIMIT ? sans tri ni parcours complet
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_sensor_data_timestamp ON sensor_data (timestamp, id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_predictions_timestamp ON predictions (timestamp, id)')
+    # Couvrant pour COUNT/AVG/MIN/MAX(predicted_score) WHERE seed_type = ?
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_predictions_seed_type_score ON predictions (seed_type, predicted_score)')
+    # Historique d'un type de graine trié par date
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_sensor_data_seed_type_timestamp ON sensor_data (seed_type, timestamp, id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_predictions_seed_type_timestamp ON predictions (seed_type, timestamp, id)')
+
+def _migration_seed_stats(conn):
+    """
+    Agrégats par type de graine tenus à jour par trigger à chaque insertion dans predictions
+    (dans la même transaction). La moyenne et la variance suivent l'algorithme de Welford:
+    m2_score = somme des carrés des écarts à la moyenne.
+    """
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(predictions)')]
+    if 'out_of_range' not in columns:
+        # 1 si au moins un paramètre était hors des conditions optimales (0 pour l'historique existant)
+        conn.execute('ALTER TABLE predictions ADD COLUMN out_of_range INTEGER NOT NULL DEFAULT 0')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS seed_stats (
+            seed_type TEXT PRIMARY KEY,
+            count INTEGER NOT NULL,
+            mean_score REAL NOT NULL,
+            m2_score REAL NOT NULL,
+            min_score REAL NOT NULL,
+            max_score REAL NOT NULL,
+            out_of_range_count INTEGER NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_predictions_seed_stats AFTER INSERT ON predictions
+        BEGIN
+            INSERT INTO seed_stats (seed_type, count, mean_score, m2_score, min_score, max_score, out_of_range_count)
+            VALUES (NEW.seed_type, 1, NEW.predicted_score, 0, NEW.predicted_score, NEW.predicted_score,
+                    NEW.out_of_range)
+            ON CONFLICT (seed_type) DO UPDATE SET
+                count = count + 1,
+                mean_score = mean_score + (NEW.predicted_score - mean_score) / (count + 1),
+                m2_score = m2_score + (NEW.predicted_score - mean_score)
+                    * (NEW.predicted_score - (mean_score + (NEW.predicted_score - mean_score) / (count + 1))),
+                min_score = MIN(min_score, NEW.predicted_score),
+                max_score = MAX(max_score, NEW.predicted_score),
+                out_of_range_count = out_of_range_count + NEW.out_of_range;
+        END
+    ''')
+    _rebuild_seed_stats(conn)
+
+SEED_STATS_COLUMNS = ('seed_type', 'count', 'mean_score', 'm2_score', 'min_score', 'max_score',
+                      'out_of_range_count')
+
+def _seed_stats_select(source: str = 'predictions') -> str:
+    """Agrégats par type de graine d'une table de prédictions (moyenne puis somme des carrés des écarts)"""
+    return f'''
+        SELECT p.seed_type, a.count, a.mean_score, SUM((p.predicted_score - a.mean_score) * (p.predicted_score - a.mean_score)),
+               a.min_score, a.max_score, a.out_of_range_count
+        FROM {source} p
+        JOIN (
+            SELECT seed_type, COUNT(*) AS count, AVG(predicted_score) AS mean_score,
+                   MIN(predicted_score) AS min_score, MAX(predicted_score) AS max_score,
+                   SUM(out_of_range) AS out_of_range_count
+            FROM {source} GROUP BY seed_type
+        ) a ON a.seed_type = p.seed_type
+        WHERE true
+        GROUP BY p.seed_type
+    '''
+
+# Fusion de deux agrégats (Chan et al.): les expressions du SET lisent les valeurs d'avant la mise à jour
+_SEED_STATS_MERGE = '''
+    ON CONFLICT (seed_type) DO UPDATE SET
+        count = count + excluded.count,
+        mean_score = mean_score + (excluded.mean_score - mean_score) * excluded.count / (count + excluded.count),
+        m2_score = m2_score + excluded.m2_score + (excluded.mean_score - mean_score) * (excluded.mean_score - mean_score)
+            * count * excluded.count / (count + excluded.count),
+        min_score = MIN(min_score, excluded.min_score),
+        max_score = MAX(max_score, excluded.max_score),
+        out_of_range_count = out_of_range_count + excluded.out_of_range_count
+'''
+
+def _archive_rows(archive_paths, table: str, sql: str) -> List[tuple]:
+    """Exécute une requête d'agrégation sur chaque archive (lecture seule) contenant la table"""
+    rows = []
+    for path in archive_paths:
+        conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        try:
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone():
+                rows.extend(conn.execute(sql).fetchall())
+        finally:
+            conn.close()
+    return rows
+
+def _rebuild_seed_stats(conn, target: str = 'seed_stats', archive_rows: List[tuple] = ()):
+    """Recalcule seed_stats depuis la table predictions et les agrégats des archives"""
+    columns = ', '.join(SEED_STATS_COLUMNS)
+    conn.execute(f'DELETE FROM {target}')
+    conn.execute(f'INSERT INTO {target} ({columns}) {_seed_stats_select()} {_SEED_STATS_MERGE}')
+    conn.executemany(f"INSERT INTO {target} ({columns}) VALUES ({', '.join('?' * len(SEED_STATS_COLUMNS))}) "
+                     f"{_SEED_STATS_MERGE}", archive_rows)
+
+def _format_seed_stats(seed_type, row) -> Dict:
+    """Statistiques exposées par /stats à partir d'une ligne de seed_stats (ou None)"""
+    if row is None:
+        return {'seed_type': seed_type, 'count': 0, 'avg_score': 0, 'min_score': 0, 'max_score': 0,
+                'variance': 0, 'std_dev': 0, 'out_of_range_ratio': 0}
+    count = row['count']
+    variance = max(row['m2_score'], 0.0) / count
+    return {
+        'seed_type': seed_type,
+        'count': count,
+        'avg_score': round(row['mean_score'], 2) if row['mean_score'] else 0,
+        'min_score': round(row['min_score'], 2) if row['min_score'] else 0,
+        'max_score': round(row['max_score'], 2) if row['max_score'] else 0,
+        'variance': round(variance, 2),
+        'std_dev': round(variance ** 0.5, 2),
+        'out_of_range_ratio': round(row['out_of_range_count'] / count, 4)
+    }
+
+# --- Agrégats par intervalle de temps (rollups) ---
+# Une table par source et par résolution, clé (seed_type, bucket), où bucket est le début
+# de l'intervalle au format de la colonne timestamp. Les sommes sont stockées (moyenne =
+# somme / nombre) pour que chaque insertion se réduise à une mise à jour additive.
+
+ROLLUP_RESOLUTIONS = {
+    'hour': '%Y-%m-%d %H:00:00',
+    'day': '%Y-%m-%d 00:00:00'
+}
+# Score agrégé de chaque source (germination_score peut être NULL dans sensor_data)
+ROLLUP_SCORES = {
+    'sensor_data': 'germination_score',
+    'predictions': 'predicted_score'
+}
+ROLLUP_PARAMETERS = ('temperature', 'soil_humidity', 'air_humidity', 'light_level')
+
+def rollup_table(source: str, resolution: str) -> str:
+    """Nom de la table d'agrégats d'une source pour une résolution (ValueError si inconnue)"""
+    if source not in ROLLUP_SCORES:
+        raise ValueError(f"Source inconnue: {source}")
+    if resolution not in ROLLUP_RESOLUTIONS:
+        raise ValueError(f"Resolution inconnue: {resolution}")
+    return f'{source}_rollup_{resolution}'
+
+def _rollup_columns() -> List[str]:
+    columns = ['count']
+    for parameter in ROLLUP_PARAMETERS:
+        columns += [f'{parameter}_sum', f'{parameter}_min', f'{parameter}_max']
+    return columns + ['score_count', 'score_sum', 'score_min', 'score_max']
+
+def _rollup_updates() -> List[str]:
+    """Fusion d'une ligne d'agrégats (excluded) dans l'intervalle existant"""
+    updates = ['count = count + excluded.count']
+    for parameter in ROLLUP_PARAMETERS:
+        updates += [
+            f'{parameter}_sum = {parameter}_sum + excluded.{parameter}_sum',
+            f'{parameter}_min = MIN({parameter}_min, excluded.{parameter}_min)',
+            f'{parameter}_max = MAX({parameter}_max, excluded.{parameter}_max)'
+        ]
+    return updates + [
+        'score_count = score_count + excluded.score_count',
+        'score_sum = score_sum + excluded.score_sum',
+        # MIN/MAX scalaires retournent NULL si un argument est NULL
+        'score_min = COALESCE(MIN(score_min, excluded.score_min), score_min, excluded.score_min)',
+        'score_max = COALESCE(MAX(score_max, excluded.score_max), score_max, excluded.score_max)'
+    ]
+
+def _rollup_trigger_sql(source: str, resolution: str) -> str:
+    """Trigger qui ajoute chaque nouvelle ligne de la source à son intervalle"""
+    table = rollup_table(source, resolution)
+    score = f'NEW.{ROLLUP_SCORES[source]}'
+    values = ['1']
+    for parameter in ROLLUP_PARAMETERS:
+        values += [f'NEW.{parameter}'] * 3
+    values += [f'{score} IS NOT NULL', f'COALESCE({score}, 0)', score, score]
+    return f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table} AFTER INSERT ON {source}
+        WHEN NEW.timestamp IS NOT NULL
+        BEGIN
+            INSERT INTO {table} (seed_type, bucket, {', '.join(_rollup_columns())})
+            VALUES (NEW.seed_type, strftime('{ROLLUP_RESOLUTIONS[resolution]}', NEW.timestamp), {', '.join(values)})
+            ON CONFLICT (seed_type, bucket) DO UPDATE SET {', '.join(_rollup_updates())};
+        END
+    '''
+
+def _rollup_select(source: str, resolution: str) -> str:
+    """Agrégats par (seed_type, intervalle) d'une table source"""
+    score = ROLLUP_SCORES[source]
+    aggregates = ['COUNT(*)']
+    for parameter in ROLLUP_PARAMETERS:
+        aggregates += [f'SUM({parameter})', f'MIN({parameter})', f'MAX({parameter})']
+    aggregates += [f'COUNT({score})', f'COALESCE(SUM({score}), 0)', f'MIN({score})', f'MAX({score})']
+    return f'''
+        SELECT seed_type, strftime('{ROLLUP_RESOLUTIONS[resolution]}', timestamp) AS bucket, {', '.join(aggregates)}
+        FROM {source}
+        WHERE timestamp IS NOT NULL
+        GROUP BY seed_type, bucket
+    '''
+
+def _rebuild_rollup(conn, source: str, resolution: str, archive_rows: List[tuple] = ()):
+    """Recalcule une table d'agrégats depuis sa source et les agrégats des archives"""
+    table = rollup_table(source, resolution)
+    columns = ['seed_type', 'bucket'] + _rollup_columns()
+    merge = f"ON CONFLICT (seed_type, bucket) DO UPDATE SET {', '.join(_rollup_updates())}"
+    conn.execute(f'DELETE FROM {table}')
+    conn.execute(f"INSERT INTO {table} ({', '.join(columns)}) {_rollup_select(source, resolution)} {merge}")
+    conn.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) {merge}",
+                     archive_rows)
+
+def _migration_rollups(conn):
+    """Tables d'agrégats horaires et journaliers de sensor_data et predictions, tenues à jour par trigger"""
+    definitions = ['count INTEGER NOT NULL']
+    for parameter in ROLLUP_PARAMETERS:
+        definitions += [f'{parameter}_sum REAL NOT NULL', f'{parameter}_min REAL NOT NULL',
+                        f'{parameter}_max REAL NOT NULL']
+    definitions += ['score_count INTEGER NOT NULL', 'score_sum REAL NOT NULL', 'score_min REAL', 'score_max REAL']
+    for source in ROLLUP_SCORES:
+        for resolution in ROLLUP_RESOLUTIONS:
+            table = rollup_table(source, resolution)
+            conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS {table} (
+                    seed_type TEXT NOT NULL,
+                    bucket TEXT NOT NULL,
+                    {', '.join(definitions)},
+                    PRIMARY KEY (seed_type, bucket)
+                ) WITHOUT ROWID
+            ''')
+            conn.execute(_rollup_trigger_sql(source, resolution))
+            _rebuild_rollup(conn, source, resolution)
+
+def _migration_drop_seed_type_score_index(conn):
+    """
+    Les statistiques par type de graine sont lues dans seed_stats depuis la migration 3:
+    l'index couvrant (seed_type, predicted_score) n'est plus utilisé mais reste mis à jour à chaque insertion
+    """
+    conn.execute('DROP INDEX IF EXISTS idx_predictions_seed_type_score')
+
+def _rollup_query(source: str, resolution: str, start: Optional[str] = None, end: Optional[str] = None):
+    """Requête des intervalles d'un type de graine recouvrant [start, end), du plus ancien au plus récent"""
+    table = rollup_table(source, resolution)
+    columns = ['bucket', 'count']
+    for parameter in ROLLUP_PARAMETERS:
+        columns += [f'ROUND({parameter}_sum / count, 2) AS {parameter}_mean',
+                    f'{parameter}_min', f'{parameter}_max']
+    columns += ['score_count', 'ROUND(score_sum / NULLIF(score_count, 0), 2) AS score_mean',
+                'score_min', 'score_max']
+    conditions, params = ['seed_type = ?'], []
+    if start is not None:
+        # Inclut l'intervalle contenant start
+        conditions.append(f"bucket >= strftime('{ROLLUP_RESOLUTIONS[resolution]}', ?)")
+        params.append(start)
+    if end is not None:
+        conditions.append('bucket < ?')
+        params.append(end)
+    return f"SELECT {', '.join(columns)} FROM {table} WHERE {' AND '.join(conditions)} ORDER BY bucket", params
+
+MIGRATIONS = [
+    (1, "schema initial (sensor_data, predictions)", _migration_initial_schema),
+    (2, "index sur timestamp et seed_type", _migration_history_indexes),
+    (3, "agregats par type de graine (seed_stats)", _migration_seed_stats),
+    (4, "agregats horaires et journaliers (rollups)", _migration_rollups),
+    (5, "suppression de l'index inutilise sur predictions (seed_type, predicted_score)",
+     _migration_drop_seed_type_score_index),
+]
+
+class GerminationDatabase(StorageBackend):
+    """Backend SQLite (par défaut): schéma migré, agrégats tenus à jour par trigger"""
+    
+    name = 'sqlite'
+    
     def __init__(self, db_path='germination.db'):
         self.db_path = db_path
+        # Une connexion persistante par thread (les connexions sqlite3 ne se partagent pas entre threads)
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
         self.init_database()
     
+    def _connection(self) -> sqlite3.Connection:
+        """Retourne la connexion du thread courant, ouverte et configurée au premier appel"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, cached_statements=STATEMENT_CACHE_SIZE)
+            conn.row_factory = sqlite3.Row
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+    
+    def close(self):
+        """Ferme toutes les connexions ouvertes par cette instance"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                # Connexion créée dans un autre thread: fermée à la fin de ce thread
+                pass
+        self._local = threading.local()
+    
     def init_database(self):
-        """Initialise la base de données avec les tables nécessaires"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Table pour les données de capteurs
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS sensor_data (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                seed_type TEXT NOT NULL,
-                temperature REAL NOT NULL,
-                soil_humidity REAL NOT NULL,
-                air_humidity REAL NOT NULL,
-                light_level REAL NOT NULL,
-                germination_score REAL,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Table pour l'historique des prédictions
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS predictions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                seed_type TEXT NOT NULL,
-                temperature REAL NOT NULL,
-                soil_humidity REAL NOT NULL,
-                air_humidity REAL NOT NULL,
-                light_level REAL NOT NULL,
-                predicted_score REAL NOT NULL,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        """Initialise la base de données et applique les migrations de schéma en attente"""
+        self.migrate()
+    
+    def schema_version(self) -> int:
+        """Version du schéma (PRAGMA user_version) de la base"""
+        return self._connection().execute('PRAGMA user_version').fetchone()[0]
+    
+    def migrate(self) -> List[int]:
+        """
+        Applique dans l'ordre les migrations dont la version est supérieure à celle
+        de la base. Chaque migration s'exécute dans sa propre transaction avec la mise
+        à jour de user_version: une base n'est jamais laissée à moitié migrée.
+        Retourne les versions appliquées.
+        """
+        conn = self._connection()
+        applied = []
+        for version, description, migration in MIGRATIONS:
+            if version <= self.schema_version():
+                continue
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                # Une autre instance a pu migrer entre-temps
+                if conn.execute('PRAGMA user_version').fetchone()[0] >= version:
+                    conn.rollback()
+                    continue
+                migration(conn)
+                conn.execute(f'PRAGMA user_version = {int(version)}')
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            applied.append(version)
+            print(f"[OK] Migration {version} appliquee: {description}")
+        return applied
     
     def add_sensor_data(self, seed_type: str, temperature: float, soil_humidity: float,
                        air_humidity: float, light_level: float, germination_score: Optional[float] = None):
         """Ajoute des données de capteurs"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO sensor_data (seed_type, temperature, soil_humidity, air_humidity, light_level, germination_score)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (seed_type, temperature, soil_humidity, air_humidity, light_level, germination_score))
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(INSERT_SENSOR_DATA_SQL, (
+                seed_type, temperature, soil_humidity, air_humidity, light_level, germination_score, None
+            ))
+        return cursor.lastrowid
+    
+    def add_sensor_data_batch(self, records: List[tuple]) -> int:
+        """Ajoute plusieurs lectures de capteurs dans une seule transaction
         
-        conn.commit()
-        data_id = cursor.lastrowid
-        conn.close()
-        return data_id
+        Chaque enregistrement est un tuple (seed_type, temperature, soil_humidity, air_humidity,
+        light_level, germination_score, timestamp); timestamp None = date courante.
+        """
+        if not records:
+            return 0
+        conn = self._connection()
+        with conn:
+            conn.executemany(INSERT_SENSOR_DATA_SQL, records)
+        return len(records)
     
     def add_prediction(self, seed_type: str, temperature: float, soil_humidity: float,
-                      air_humidity: float, light_level: float, predicted_score: float):
-        """Enregistre une prédiction"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO predictions (seed_type, temperature, soil_humidity, air_humidity, light_level, predicted_score)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (seed_type, temperature, soil_humidity, air_humidity, light_level, predicted_score))
+                      air_humidity: float, light_level: float, predicted_score: float,
+                      model_version: Optional[str] = None, out_of_range: bool = False):
+        """Enregistre une prédiction (les agrégats de seed_stats sont mis à jour par trigger)"""
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(INSERT_PREDICTION_SQL, (
+                seed_type, temperature, soil_humidity, air_humidity, light_level, predicted_score,
+                model_version, int(out_of_range)
+            ))
+        return cursor.lastrowid
+    
+    def add_predictions_batch(self, records: List[tuple]) -> int:
+        """Enregistre plusieurs prédictions dans une seule transaction
         
-        conn.commit()
-        pred_id = cursor.lastrowid
-        conn.close()
-        return pred_id
+        Chaque enregistrement est un tuple (seed_type, temperature, soil_humidity, air_humidity,
+        light_level, predicted_score, model_version, out_of_range).
+        """
+        if not records:
+            return 0
+        conn = self._connection()
+        with conn:
+            conn.executemany(INSERT_PREDICTION_SQL, records)
+        return len(records)
     
     def get_sensor_data(self, limit: int = 100) -> List[Dict]:
         """Récupère les données de capteurs"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        cursor = self._connection().cursor()
         
-        cursor.execute('SELECT * FROM sensor_data ORDER BY timestamp DESC LIMIT ?', (limit,))
+        cursor.execute('SELECT * FROM sensor_data ORDER BY timestamp DESC, id DESC LIMIT ?', (limit,))
+        rows = cursor.fetchall()
+        
+        return [dict(row) for row in rows]
+    
+    def get_labeled_sensor_data(self, after_id: int = 0) -> List[Dict]:
+        """Récupère les données de capteurs ayant un score de germination réel (pour l'entraînement)"""
+        cursor = self._connection().cursor()
+        
+        cursor.execute('''
+            SELECT id, seed_type, temperature, soil_humidity, air_humidity, light_level, germination_score
+            FROM sensor_data
+            WHERE germination_score IS NOT NULL AND id > ?
+            ORDER BY id
+        ''', (after_id,))
         rows = cursor.fetchall()
-        conn.close()
         
         return [dict(row) for row in rows]
     
     def get_predictions(self, limit: int = 100) -> List[Dict]:
         """Récupère l'historique des prédictions"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        cursor = self._connection().cursor()
         
-        cursor.execute('SELECT * FROM predictions ORDER BY timestamp DESC LIMIT ?', (limit,))
+        cursor.execute('SELECT * FROM predictions ORDER BY timestamp DESC, id DESC LIMIT ?', (limit,))
         rows = cursor.fetchall()
-        conn.close()
         
         return [dict(row) for row in rows]
     
-    def get_stats_by_seed_type(self, seed_type: str) -> Dict:
-        """Récupère les statistiques pour un type de graine"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def get_history_page(self, table: str, limit: int = 100, cursor: Optional[str] = None,
+                         seed_type: Optional[str] = None, start: Optional[str] = None,
+                         end: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Récupère une page de l'historique (sensor_data ou predictions).
+        Retourne (lignes, curseur de la page suivante ou None).
+        """
+        sql, params = _history_query(table, seed_type, start, end, cursor)
+        rows = self._connection().execute(f'{sql} LIMIT ?', params + [limit + 1]).fetchall()
         
-        cursor.execute('''
-            SELECT 
-                COUNT(*) as count,
-                AVG(predicted_score) as avg_score,
-                MIN(predicted_score) as min_score,
-                MAX(predicted_score) as max_score
-            FROM predictions
-            WHERE seed_type = ?
-        ''', (seed_type,))
-        
-        row = cursor.fetchone()
-        conn.close()
+        next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return [dict(row) for row in rows[:limit]], next_cursor
+    
+    def iter_history(self, table: str, seed_type: Optional[str] = None, start: Optional[str] = None,
+                     end: Optional[str] = None, cursor: Optional[str] = None,
+                     limit: Optional[int] = None, chunk_size: int = 500) -> Iterator[Dict]:
+        """
+        Parcourt l'historique ligne par ligne en lisant le curseur SQLite par blocs:
+        la mémoire utilisée ne dépend pas du nombre de lignes exportées.
+        Utilise sa propre connexion, que le générateur peut être consommé depuis
+        n'importe quel thread (réponses en streaming).
+        """
+        sql, params = _history_query(table, seed_type, start, end, cursor)
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        try:
+            result = conn.execute(sql, params)
+            while True:
+                rows = result.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+        finally:
+            conn.close()
+    
+    def get_rollups(self, source: str, resolution: str, seed_type: str, start: Optional[str] = None,
+                    end: Optional[str] = None) -> List[Dict]:
+        """
+        Récupère les agrégats (moyenne/min/max par paramètre et du score) d'un type de graine
+        par heure ou par jour, lus dans les tables de rollup sans parcourir les lignes brutes.
+        """
+        sql, params = _rollup_query(source, resolution, start, end)
+        rows = self._connection().execute(sql, [seed_type] + params).fetchall()
+        return [dict(row) for row in rows]
+    
+    def rebuild_rollups(self, archive_paths: List[str] = ()):
+        """
+        Recalcule toutes les tables d'agrégats horaires et journaliers depuis les tables
+        courantes et les archives (fichiers SQLite non compressés, voir archive.py).
+        """
+        archived = {(source, resolution): _archive_rows(archive_paths, source, _rollup_select(source, resolution))
+                    for source in ROLLUP_SCORES for resolution in ROLLUP_RESOLUTIONS}
+        conn = self._connection()
+        with conn:
+            for (source, resolution), rows in archived.items():
+                _rebuild_rollup(conn, source, resolution, rows)
+    
+    def get_stats_by_seed_type(self, seed_type: str) -> Dict:
+        """Récupère les statistiques pour un type de graine (lecture d'une ligne de seed_stats)"""
+        row = self._connection().execute(
+            'SELECT * FROM seed_stats WHERE seed_type = ?', (seed_type,)
+        ).fetchone()
+        return _format_seed_stats(seed_type, row)
+    
+    def check_seed_stats(self, tolerance: float = 1e-6, archive_paths: List[str] = ()) -> List[Dict]:
+        """
+        Compare seed_stats à un recalcul complet depuis predictions et les archives.
+        Retourne la liste des écarts (vide si les agrégats sont cohérents).
+        """
+        archived = _archive_rows(archive_paths, 'predictions', _seed_stats_select())
+        conn = self._connection()
+        conn.execute('''
+            CREATE TEMP TABLE IF NOT EXISTS seed_stats_check (
+                seed_type TEXT PRIMARY KEY, count INTEGER, mean_score REAL, m2_score REAL,
+                min_score REAL, max_score REAL, out_of_range_count INTEGER
+            )
+        ''')
+        with conn:
+            stored = {row['seed_type']: dict(row) for row in conn.execute('SELECT * FROM seed_stats')}
+            _rebuild_seed_stats(conn, 'temp.seed_stats_check', archived)
+            expected = {row['seed_type']: dict(row) for row in conn.execute('SELECT * FROM temp.seed_stats_check')}
         
-        return {
-            'seed_type': seed_type,
-            'count': row[0],
-            'avg_score': round(row[1], 2) if row[1] else 0,
-            'min_score': round(row[2], 2) if row[2] else 0,
-            'max_score': round(row[3], 2) if row[3] else 0
-        }
+        differences = []
+        for seed_type in sorted(set(stored) | set(expected)):
+            actual, wanted = stored.get(seed_type), expected.get(seed_type)
+            if actual is None or wanted is None:
+                differences.append({'seed_type': seed_type, 'stored': actual, 'expected': wanted})
+                continue
+            for column, value in wanted.items():
+                if column == 'seed_type':
+                    continue
+                if abs(actual[column] - value) > tolerance * max(1.0, abs(value)):
+                    differences.append({'seed_type': seed_type, 'column': column,
+                                        'stored': actual[column], 'expected': value})
+        return differences
+    
+    def rebuild_seed_stats(self, archive_paths: List[str] = ()):
+        """Recalcule entièrement seed_stats depuis predictions et les archives"""
+        archived = _archive_rows(archive_paths, 'predictions', _seed_stats_select())
+        conn = self._connection()
+        with conn:
+            _rebuild_seed_stats(conn, archive_rows=archived)
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Commandes d'administration de la base SQLite.
+
+Usage:
+    python db_admin.py [--db germination.db] status
+    python db_admin.py [--db germination.db] migrate
+    python db_admin.py [--db germination.db] check-stats
+    python db_admin.py [--db germination.db] rebuild-stats
+    python db_admin.py [--db germination.db] rebuild-rollups
+    python db_admin.py [--db germination.db] archive --retention-days 90
+    python db_admin.py [--db germination.db] archives
+    python db_admin.py [--db germination.db] export-archive 2026-01 --table predictions --format csv
+    python db_admin.py [--db germination.db] extract-archive 2026-01 --output predictions-2026-01.db
+    python db_admin.py [--db germination.db] export-snapshot --snapshot training_snapshot --data sensors_data.csv
+"""
+import argparse
+import os
+import shutil
+import sys
+from archive import ARCHIVE_FORMATS, ARCHIVE_TABLES, DEFAULT_ARCHIVE_DIR, Archiver
+from database import GerminationDatabase, MIGRATIONS
+from snapshot import DEFAULT_SNAPSHOT_DIR, TrainingSnapshot
+
+
+def cmd_status(db, args):
+    version = db.schema_version()
+    print(f"Base: {db.db_path}")
+    print(f"Version du schema: {version} (derniere: {MIGRATIONS[-1][0]})")
+    for number, description, _ in MIGRATIONS:
+        etat = "appliquee" if number <= version else "en attente"
+        print(f"  {number}. {description} [{etat}]")
+
+
+def cmd_migrate(db, args):
+    # GerminationDatabase applique les migrations à l'ouverture
+    print(f"[OK] Schema a jour (version {db.schema_version()})")
+
+
+def cmd_check_stats(db, args):
+    with archiver_for(db, args).open_archives() as archive_paths:
+        differences = db.check_seed_stats(archive_paths=archive_paths)
+    if not differences:
+        print("[OK] Agregats seed_stats coherents avec la table predictions et les archives")
+        return
+    for diff in differences:
+        print(f"[ERREUR] {diff}")
+    print(f"{len(differences)} ecart(s) detecte(s); corriger avec: python db_admin.py rebuild-stats")
+    raise SystemExit(1)
+
+
+def cmd_rebuild_stats(db, args):
+    with archiver_for(db, args).open_archives() as archive_paths:
+        db.rebuild_seed_stats(archive_paths)
+    print("[OK] Agregats seed_stats recalcules depuis la table predictions")
+
+
+def cmd_rebuild_rollups(db, args):
+    with archiver_for(db, args).open_archives() as archive_paths:
+        db.rebuild_rollups(archive_paths)
+    print("[OK] Agregats horaires et journaliers recalcules")
+
+
+def archiver_for(db, args):
+    return Archiver(db, args.archive_dir, retention_days=getattr(args, 'retention_days', 0),
+                    batch_size=getattr(args, 'batch_size', 1000))
+
+
+def cmd_archive(db, args):
+    result = archiver_for(db, args).run_once()
+    for table, count in result['moved'].items():
+        print(f"[OK] {table}: {count} ligne(s) anterieure(s) a {result['cutoff']} archivee(s)")
+    for month in result['sealed']:
+        print(f"[OK] Archive {month} compressee")
+
+
+def cmd_archives(db, args):
+    archives = archiver_for(db, args).months()
+    if not archives:
+        print(f"Aucune archive dans {args.archive_dir}")
+    for archive in archives:
+        etat = "compressee" if archive['compressed'] else "en cours"
+        print(f"  {archive['month']}  {archive['size_bytes'] / 1024:>10.1f} Ko  [{etat}]  {archive['path']}")
+
+
+def cmd_export_archive(db, args):
+    archiver = archiver_for(db, args)
+    if args.output == '-':
+        count = archiver.export(args.month, args.table, sys.stdout, args.format)
+    else:
+        with open(args.output, 'w', newline='', encoding='utf-8') as out:
+            count = archiver.export(args.month, args.table, out, args.format)
+    print(f"[OK] {count} ligne(s) exportee(s)", file=sys.stderr)
+
+
+def cmd_extract_archive(db, args):
+    # Copie non compressée, utilisable avec ATTACH DATABASE
+    with archiver_for(db, args).open_archive(args.month) as path:
+        shutil.copyfile(path, args.output)
+    print(f"[OK] Archive {args.month} extraite dans {args.output}")
+
+
+def cmd_export_snapshot(db, args):
+    # Ajoute uniquement les lectures étiquetées postérieures au dernier export
+    result = TrainingSnapshot(args.snapshot).sync(args.data, db)
+    if result['rebuilt']:
+        print(f"[OK] Instantane reconstruit depuis {args.data}")
+    print(f"[OK] {result['new_labeled_rows']} lecture(s) etiquetee(s) ajoutee(s); "
+          f"{result['rows']} ligne(s) dans {args.snapshot} (sensor_data jusqu'a l'id {result['last_sensor_data_id']})")
+
+
+COMMANDS = {
+    'status': cmd_status,
+    'migrate': cmd_migrate,
+    'check-stats': cmd_check_stats,
+    'rebuild-stats': cmd_rebuild_stats,
+    'rebuild-rollups': cmd_rebuild_rollups,
+    'archive': cmd_archive,
+    'archives': cmd_archives,
+    'export-archive': cmd_export_archive,
+    'extract-archive': cmd_extract_archive,
+    'export-snapshot': cmd_export_snapshot,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Administration de la base de germination")
+    parser.add_argument('--db', default=os.getenv("GERMINATION_DB_PATH", "germination.db"),
+                        help="Chemin de la base SQLite")
+    parser.add_argument('--archive-dir', default=os.getenv("ARCHIVE_DIR", DEFAULT_ARCHIVE_DIR),
+                        help="Répertoire des archives mensuelles")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('status', help="Affiche la version du schéma et les migrations")
+    subparsers.add_parser('migrate', help="Applique les migrations en attente")
+    subparsers.add_parser('check-stats', help="Vérifie les agrégats seed_stats contre un recalcul complet")
+    subparsers.add_parser('rebuild-stats', help="Recalcule les agrégats seed_stats")
+    subparsers.add_parser('rebuild-rollups', help="Recalcule les agrégats horaires et journaliers")
+    archive = subparsers.add_parser('archive', help="Archive les lignes plus anciennes que la rétention")
+    archive.add_argument('--retention-days', type=int, default=int(os.getenv("RETENTION_DAYS", 0)),
+                         help="Nombre de jours conservés dans la base")
+    archive.add_argument('--batch-size', type=int, default=int(os.getenv("ARCHIVE_BATCH_SIZE", 1000)),
+                         help="Lignes déplacées par transaction")
+    subparsers.add_parser('archives', help="Liste les archives mensuelles")
+    export = subparsers.add_parser('export-archive', help="Exporte une table archivée d'un mois")
+    export.add_argument('month', help="Mois (AAAA-MM)")
+    export.add_argument('--table', choices=ARCHIVE_TABLES, default='predictions')
+    export.add_argument('--format', choices=ARCHIVE_FORMATS, default='ndjson')
+    export.add_argument('--output', default='-', help="Fichier de sortie (- pour la sortie standard)")
+    extract = subparsers.add_parser('extract-archive', help="Décompresse l'archive d'un mois pour ATTACH")
+    extract.add_argument('month', help="Mois (AAAA-MM)")
+    extract.add_argument('--output', required=True, help="Fichier SQLite de destination")
+    snapshot = subparsers.add_parser('export-snapshot',
+                                     help="Écrit ou complète l'instantané binaire des données d'entraînement")
+    snapshot.add_argument('--snapshot', default=os.getenv("TRAINING_SNAPSHOT_DIR", DEFAULT_SNAPSHOT_DIR),
+                          help="Répertoire de l'instantané")
+    snapshot.add_argument('--data', default='sensors_data.csv', help="CSV d'entraînement de référence")
+    args = parser.parse_args()
+
+    db = GerminationDatabase(args.db)
+    try:
+        COMMANDS[args.command](db, args)
+    except (ValueError, FileNotFoundError) as e:
+        print(f"[ERREUR] {e}")
+        raise SystemExit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Diffusion en direct des prédictions et des alertes (Server-Sent Events, GET /events).
+
+Les endpoints publient chaque lot de prédictions enregistré; le courtier le découpe par type de
+graine, sérialise chaque message SSE une seule fois et le dépose dans la file de chaque abonné
+intéressé. Aucun abonné n'interroge la base: N tableaux de bord coûtent N dépôts en file, pas
+N requêtes SQLite.
+
+Chaque abonné a une file bornée. Un abonné trop lent perd les messages qui ne tiennent pas dans
+sa file (le publieur n'attend jamais); il reçoit ensuite un message « lagged » avec le nombre de
+messages perdus, et peut se resynchroniser avec GET /predictions.
+"""
+import asyncio
+import itertools
+import threading
+from datetime import datetime, timezone
+from fast_json import dumps
+
+
+def format_event(event, data, event_id=None):
+    """Message SSE (octets) prêt à être envoyé à tous les abonnés"""
+    lines = [f'event: {event}']
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append('data: ' + dumps(data).decode('utf-8'))
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+class Subscription:
+    """File d'un abonné, filtrée sur des types de graine (None: tous)"""
+
+    def __init__(self, broker, seed_types, queue_size):
+        self.broker = broker
+        self.seed_types = seed_types
+        self.queue = asyncio.Queue(queue_size)
+        self.loop = asyncio.get_running_loop()
+        self.dropped = 0
+
+    def _deliver(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            self.broker.dropped += 1
+        else:
+            self.broker.delivered += 1
+
+    async def get(self):
+        """Prochain message; précédé d'un message « lagged » si des messages ont été perdus"""
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            return format_event('lagged', {'dropped': dropped})
+        return await self.queue.get()
+
+    async def get_many(self, max_messages=64):
+        """Messages en attente (au moins un) concaténés: un seul envoi pour une rafale"""
+        messages = [await self.get()]
+        while len(messages) < max_messages and not self.queue.empty():
+            messages.append(self.queue.get_nowait())
+        return b''.join(messages)
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class EventBroker:
+    """Diffusion en mémoire (un processus) vers des abonnés filtrés par type de graine"""
+
+    def __init__(self, queue_size=256, max_subscribers=1000):
+        """
+        Args:
+            queue_size: Messages en attente maximum par abonné
+            max_subscribers: Nombre maximal d'abonnés simultanés
+        """
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subscriptions = set()
+        self._all = set()
+        self._by_seed_type = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    @property
+    def subscribers(self):
+        return len(self._subscriptions)
+
+    def subscribe(self, seed_types=None):
+        """Nouvel abonné (appelé dans la boucle d'événements); ValueError si la limite est atteinte"""
+        subscription = Subscription(self, frozenset(seed_types) if seed_types else None, self.queue_size)
+        with self._lock:
+            if self.subscribers >= self.max_subscribers:
+                raise ValueError(f"Trop d'abonnes (max {self.max_subscribers})")
+            self._subscriptions.add(subscription)
+            if subscription.seed_types is None:
+                self._all.add(subscription)
+            else:
+                for seed_type in subscription.seed_types:
+                    self._by_seed_type.setdefault(seed_type, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+            self._all.discard(subscription)
+            for seed_type in subscription.seed_types or ():
+                subscriptions = self._by_seed_type.get(seed_type)
+                if subscriptions is not None:
+                    subscriptions.discard(subscription)
+                    if not subscriptions:
+                        del self._by_seed_type[seed_type]
+
+    def publish(self, event, items):
+        """
+        Diffuse des éléments (dictionnaires avec une clé seed_type): un message par type de graine,
+        {"<event>": [...], "timestamp": ...}, sérialisé une fois et déposé chez chaque abonné concerné.
+        """
+        if not self._subscriptions:
+            return
+        groups = {}
+        for item in items:
+            groups.setdefault(item['seed_type'], []).append(item)
+        timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        for seed_type, group in groups.items():
+            with self._lock:
+                targets = list(self._all) + list(self._by_seed_type.get(seed_type, ()))
+            if not targets:
+                continue
+            message = format_event(event, {'seed_type': seed_type, event: group, 'timestamp': timestamp},
+                                   next(self._ids))
+            self.published += 1
+            for subscription in targets:
+                if running is subscription.loop:
+                    subscription._deliver(message)
+                    continue
+                # Publication depuis un autre thread: dépôt dans la boucle de l'abonné
+                try:
+                    subscription.loop.call_soon_threadsafe(subscription._deliver, message)
+                except RuntimeError:
+                    # Boucle fermée: abonné parti
+                    self.unsubscribe(subscription)
+
+    def stats(self):
+        return {
+            'subscribers': self.subscribers,
+            'max_subscribers': self.max_subscribers,
+            'queue_size': self.queue_size,
+            'published': self.published,
+            'delivered': self.delivered,
+            'dropped': self.dropped
+        }
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+Sérialisation JSON directe des réponses volumineuses (pages d'historique, lots de prédictions).
+
+Par défaut, FastAPI passe le contenu retourné par un endpoint dans jsonable_encoder, qui
+parcourt et recopie chaque dictionnaire de ligne en Python, avant json.dumps. Les lignes
+lues dans la base ne contiennent que des str, int, float et None: elles sont sérialisées
+telles quelles. orjson est utilisé s'il est installé (pip install orjson), sinon json.dumps
+compact.
+"""
+import json
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(content):
+    """Sérialise un contenu déjà compatible JSON en octets UTF-8"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def ndjson_lines(rows):
+    """Lignes NDJSON (octets) d'un bloc de lignes"""
+    if orjson is not None:
+        return b''.join(orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE) for row in rows)
+    return ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows).encode('utf-8')
+
+
+class FastJSONResponse(Response):
+    """Réponse JSON sans jsonable_encoder: le contenu doit être composé de dict, list, str, nombres et None"""
+    media_type = "application/json"
+
+    def render(self, content):
+        return dumps(content)
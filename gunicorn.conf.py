@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Mode multi-workers: gunicorn (pré-fork) + workers uvicorn.
+
+    gunicorn -c gunicorn.conf.py api:app
+    WEB_CONCURRENCY=4 gunicorn -c gunicorn.conf.py api:app
+
+- preload_app: api.py (modèle compilé, tables de recommandations, migrations de la base)
+  est importé une seule fois dans le maître, avant le fork. Les workers partagent ces
+  pages mémoire en copie sur écriture; gc.freeze() évite que le ramasse-miettes des
+  workers ne les touche (et ne les duplique) en parcourant les objets du maître.
+- Écritures: un processus d'écriture unique (writer_process.py), démarré par le maître,
+  reçoit les écritures de tous les workers; les workers lisent la base directement.
+- Archivage: dans le processus d'écriture. Réentraînement: dans chaque worker, qui
+  possède sa propre copie du modèle; le worker qui obtient un nouveau modèle publie
+  son artefact (MODEL_ARTIFACT_PATH) et les autres le rechargent en quelques secondes
+  (MODEL_RELOAD_INTERVAL_SECONDS, retraining.ArtifactWatcher).
+"""
+import gc
+import multiprocessing
+import os
+import secrets
+import tempfile
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+# CPU réellement attribués au processus (conteneurs), à défaut ceux de la machine
+_cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else multiprocessing.cpu_count()
+workers = int(os.getenv('WEB_CONCURRENCY', _cpus))
+worker_class = 'uvicorn.workers.UvicornWorker'
+preload_app = True
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = 5
+
+# Adresse et clé du processus d'écriture, lues par api.py à l'import (avant le fork)
+os.environ.setdefault('GERMINATION_WRITER_ADDRESS',
+                      os.path.join(tempfile.gettempdir(), f'germination-writer-{os.getpid()}.sock'))
+os.environ['GERMINATION_WRITER_AUTHKEY'] = secrets.token_hex(16)
+
+# Pas de collecte pendant le chargement de l'application: réactivée dans chaque worker
+gc.disable()
+
+_writer = {}
+
+
+def when_ready(server):
+    """Application chargée dans le maître: démarre le processus d'écriture et gèle le tas"""
+    import api
+    # Connexions SQLite ouvertes par les migrations: jamais partagées avec les processus fils
+    api.db.close()
+
+    from writer_process import serve
+    context = multiprocessing.get_context('spawn')
+    stop_event = context.Event()
+    process = context.Process(target=serve, name='germination-writer', daemon=True, args=(
+        os.environ['GERMINATION_WRITER_ADDRESS'], bytes.fromhex(os.environ['GERMINATION_WRITER_AUTHKEY']),
+        api.db.db_path
+    ), kwargs={'stop_event': stop_event})
+    process.start()
+    _writer.update(process=process, stop_event=stop_event)
+    server.log.info("Processus d'ecriture demarre (pid %s)", process.pid)
+
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    gc.enable()
+
+
+def on_exit(server):
+    """Arrêt du maître: le processus d'écriture termine la transaction en cours puis s'arrête"""
+    process = _writer.get('process')
+    if process is None:
+        return
+    _writer['stop_event'].set()
+    process.join(10)
+    if process.is_alive():
+        process.terminate()
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Entraînement incrémental des moindres carrés à partir de statistiques suffisantes.
+
+Pour le modèle linéaire [temperature, soil_humidity, air_humidity, light_level] + One-Hot
+de seed_type, il suffit de conserver par type de graine: n, somme de x, somme de x x^T,
+somme de y et somme de x y. Ajouter une lecture coûte O(1) et la résolution ne dépend
+que du nombre de features, pas de la taille de l'historique. La solution est la même que
+celle de sklearn.linear_model.LinearRegression sur les mêmes données (moindres carrés
+centrés, solution de norme minimale car les colonnes One-Hot sont colinéaires).
+"""
+import csv
+import numpy as np
+from inference import NUMERIC_FEATURES, SEED_PREFIX
+
+N_NUMERIC = len(NUMERIC_FEATURES)
+
+
+class LinearModel:
+    """Modèle linéaire résolu (mêmes attributs que LinearRegression)"""
+
+    def __init__(self, coef, intercept):
+        self.coef_ = coef
+        self.intercept_ = intercept
+
+
+class SufficientStatistics:
+    """Statistiques suffisantes X^T X et X^T y, regroupées par type de graine"""
+
+    def __init__(self):
+        # seed_type -> [n, sum_x (4,), sum_xx (4, 4), sum_y, sum_xy (4,)]
+        self.per_seed = {}
+
+    @property
+    def n_samples(self):
+        return int(sum(stats[0] for stats in self.per_seed.values()))
+
+    def _seed_stats(self, seed_type):
+        stats = self.per_seed.get(seed_type)
+        if stats is None:
+            stats = [0, np.zeros(N_NUMERIC), np.zeros((N_NUMERIC, N_NUMERIC)), 0.0, np.zeros(N_NUMERIC)]
+            self.per_seed[seed_type] = stats
+        return stats
+
+    def add(self, seed_type, features, target):
+        """Ajoute une lecture étiquetée (features dans l'ordre NUMERIC_FEATURES, light_level en heures)"""
+        x = np.asarray(features, dtype=np.float64)
+        stats = self._seed_stats(seed_type)
+        stats[0] += 1
+        stats[1] += x
+        stats[2] += np.outer(x, x)
+        stats[3] += float(target)
+        stats[4] += x * float(target)
+
+    def add_many(self, seed_types, features, targets):
+        """Ajoute un lot de lectures étiquetées en une opération vectorisée par type de graine"""
+        names, codes = np.unique(np.asarray(seed_types), return_inverse=True)
+        self.add_coded(codes, names, features, targets)
+
+    def add_coded(self, codes, seed_types, features, targets):
+        """Ajoute un lot dont le type de graine est donné par son rang dans seed_types (instantanés en colonnes)"""
+        codes = np.asarray(codes).reshape(-1)
+        features = np.asarray(features, dtype=np.float64).reshape(-1, N_NUMERIC)
+        targets = np.asarray(targets, dtype=np.float64)
+        for code in np.unique(codes):
+            mask = codes == code
+            x, y = features[mask], targets[mask]
+            stats = self._seed_stats(str(seed_types[code]))
+            stats[0] += len(y)
+            stats[1] += x.sum(axis=0)
+            stats[2] += x.T @ x
+            stats[3] += float(y.sum())
+            stats[4] += x.T @ y
+
+    def add_csv(self, data_path):
+        """Ajoute les lectures d'un CSV au format de sensors_data.csv (sans pandas)"""
+        seed_types, features, targets = [], [], []
+        with open(data_path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                seed_types.append(row['seed_type'])
+                features.append([float(row[name]) for name in NUMERIC_FEATURES])
+                targets.append(float(row['germination_score']))
+        if seed_types:
+            self.add_many(seed_types, features, targets)
+        return len(seed_types)
+
+    def columns(self):
+        """Colonnes du modèle, dans le même ordre que pd.get_dummies"""
+        return NUMERIC_FEATURES + [SEED_PREFIX + seed for seed in sorted(self.per_seed)]
+
+    def solve(self):
+        """
+        Résout les moindres carrés et retourne (LinearModel, colonnes).
+        Coût O(d^3) avec d = 4 + nombre de types de graines.
+        """
+        seeds = sorted(self.per_seed)
+        n_features = N_NUMERIC + len(seeds)
+        n = self.n_samples
+        if n == 0:
+            raise ValueError("Aucune donnée d'entraînement")
+
+        # Matrices non centrées Z^T Z et Z^T y pour Z = [x, One-Hot(seed_type)]
+        gram = np.zeros((n_features, n_features))
+        cross = np.zeros(n_features)
+        sums = np.zeros(n_features)
+        sum_y = 0.0
+        for j, seed in enumerate(seeds):
+            count, sum_x, sum_xx, seed_sum_y, sum_xy = self.per_seed[seed]
+            k = N_NUMERIC + j
+            gram[:N_NUMERIC, :N_NUMERIC] += sum_xx
+            gram[:N_NUMERIC, k] = sum_x
+            gram[k, :N_NUMERIC] = sum_x
+            gram[k, k] = count
+            cross[:N_NUMERIC] += sum_xy
+            cross[k] = seed_sum_y
+            sums[:N_NUMERIC] += sum_x
+            sums[k] = count
+            sum_y += seed_sum_y
+
+        # Centrage, comme LinearRegression(fit_intercept=True)
+        mean_z = sums / n
+        mean_y = sum_y / n
+        centered_gram = gram - n * np.outer(mean_z, mean_z)
+        centered_cross = cross - n * mean_z * mean_y
+
+        # Solution de norme minimale (les colonnes One-Hot centrées sont colinéaires)
+        coef = np.linalg.pinv(centered_gram, rcond=1e-10, hermitian=True) @ centered_cross
+        intercept = mean_y - mean_z @ coef
+        return LinearModel(coef, float(intercept)), self.columns()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Moteur d'inférence compilé pour le modèle linéaire de germination.
+
+Un LinearRegression entraîné sur [temperature, soil_humidity, air_humidity, light_level]
++ seed_type encodé en One-Hot se réduit, pour chaque type de graine, à 4 poids et
+un terme propre à la graine. Ce module compile coef_/intercept_ et model_columns en
+une table compacte (une ligne par graine) pour prédire sans pandas.
+"""
+from itertools import chain
+from operator import itemgetter
+import numpy as np
+from main import light_percent_to_hours
+
+NUMERIC_FEATURES = ['temperature', 'soil_humidity', 'air_humidity', 'light_level']
+SEED_PREFIX = 'seed_type_'
+
+_numeric_getter = itemgetter(*NUMERIC_FEATURES)
+
+
+class CompiledModel:
+    """Table de coefficients par type de graine compilée depuis un modèle linéaire"""
+
+    def __init__(self, seed_types, table, intercept):
+        """
+        Args:
+            seed_types: Types de graines connus du modèle, dans l'ordre des lignes de la table
+            table: Tableau (len(seed_types) + 1, 5) de [w_temperature, w_soil_humidity,
+                   w_air_humidity, w_light_level, w_seed]. La dernière ligne sert aux
+                   types de graines inconnus (aucune colonne One-Hot active).
+            intercept: Ordonnée à l'origine du modèle
+        """
+        self.seed_types = list(seed_types)
+        self.seed_index = {seed_type: i for i, seed_type in enumerate(self.seed_types)}
+        self.unknown_index = len(self.seed_types)
+        self.table = np.ascontiguousarray(table, dtype=np.float64)
+        self.intercept = float(intercept)
+
+    @classmethod
+    def from_model(cls, model, model_columns):
+        """Compile un LinearRegression entraîné et ses colonnes de features"""
+        columns = list(model_columns)
+        coef = np.asarray(model.coef_, dtype=np.float64).ravel()
+
+        numeric_positions = [columns.index(name) for name in NUMERIC_FEATURES]
+        seed_columns = [(i, col) for i, col in enumerate(columns) if col.startswith(SEED_PREFIX)]
+
+        table = np.zeros((len(seed_columns) + 1, len(NUMERIC_FEATURES) + 1))
+        table[:, :len(NUMERIC_FEATURES)] = coef[numeric_positions]
+        for row, (position, _) in enumerate(seed_columns):
+            table[row, -1] = coef[position]
+
+        seed_types = [col[len(SEED_PREFIX):] for _, col in seed_columns]
+        return cls(seed_types, table, model.intercept_)
+
+    def predict_one(self, seed_type, temperature, soil_humidity, air_humidity, light_level):
+        """
+        Prédit le score pour une lecture (light_level en %).
+        Résultat identique bit à bit à main.predict_score.
+        """
+        weights = self.table[self.seed_index.get(seed_type, self.unknown_index)]
+        features = np.array([temperature, soil_humidity, air_humidity,
+                             light_percent_to_hours(light_level), 1.0])
+        return float(np.dot(features, weights)) + self.intercept
+
+    def predict_batch(self, rows):
+        """
+        Prédit les scores d'une liste de lectures (dictionnaires, light_level en %)
+        en une seule opération vectorisée. Écart avec predict_one limité à l'arrondi
+        flottant (~1e-13).
+        """
+        if not rows:
+            return np.zeros(0)
+
+        codes = np.fromiter(
+            (self.seed_index.get(row['seed_type'], self.unknown_index) for row in rows),
+            dtype=np.intp, count=len(rows)
+        )
+        features = np.fromiter(
+            chain.from_iterable(map(_numeric_getter, rows)),
+            dtype=np.float64, count=len(rows) * len(NUMERIC_FEATURES)
+        ).reshape(len(rows), len(NUMERIC_FEATURES))
+        features[:, 3] = light_percent_to_hours(features[:, 3])
+        weights = self.table[codes]
+        return np.einsum('ij,ij->i', features, weights[:, :-1]) + weights[:, -1] + self.intercept
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
-import pandas as pd
-from sklearn.linear_model import LinearRegression
+# pandas et scikit-learn sont importés dans les fonctions qui en ont besoin (entraînement,
+# lecture CSV) pour que le service puisse démarrer sans les charger.
 
 def light_percent_to_hours(light_percent):
     """
@@ -78,14 +78,24 @@ RECOMMENDATIONS_PH = {
     'high': "Le pH du sol est trop élevé. Ajoutez du compost, du fumier ou du sulfate d’ammonium pour acidifier légèrement le sol."
 }
 
-def train_germination_model(data_path='sensors_data.csv'):
+def train_germination_model(data_path='sensors_data.csv', extra_rows=None):
     """
     Entraîne un modèle pour prédire le score de germination en prenant
     en compte le type de graine comme une caractéristique.
+    
+    Args:
+        data_path: Fichier CSV d'entraînement (light_level en heures)
+        extra_rows: Lectures étiquetées supplémentaires (dictionnaires avec les mêmes
+                    colonnes que le CSV, light_level en heures)
     """
+    import pandas as pd
+    from sklearn.linear_model import LinearRegression
+
     try:
         # 1. Charger les données
         df = pd.read_csv(data_path)
+        if extra_rows:
+            df = pd.concat([df, pd.DataFrame(extra_rows, columns=df.columns)], ignore_index=True)
         
         # Valider les colonnes requises
         required_columns = ['seed_type', 'temperature', 'soil_humidity', 'air_humidity', 'light_level', 'germination_score']
@@ -120,55 +130,24 @@ def get_recommendations(seed_type, temperature, soil_humidity, air_humidity, lig
         soil_humidity: Humidité du sol en %
         air_humidity: Humidité de l'air en %
         light_level: Niveau de lumière en % (0-100)
-    """
-    if seed_type not in OPTIMAL_CONDITIONS:
-        return [f"[ERREUR] Type de graine '{seed_type}' non reconnu."]
-
-    # Convertir le pourcentage de lumière en heures équivalentes
-    light_hours = light_percent_to_hours(light_level)
-
-    conditions = OPTIMAL_CONDITIONS[seed_type]
-    recommendations = []
     
-    # Analyse de chaque paramètre
-    min_temp, max_temp = conditions['temperature']
-    if temperature < min_temp:
-        recommendations.append(f"[TEMPERATURE] Trop basse. Ideal: {min_temp}-{max_temp}C.")
-    elif temperature > max_temp:
-        recommendations.append(f"[TEMPERATURE] Trop elevee. Ideal: {min_temp}-{max_temp}C.")
-
-    min_hum, max_hum = conditions['soil_humidity']
-    if soil_humidity < min_hum:
-        recommendations.append(f"[HUMIDITE] Sol trop sec. Ideal: {min_hum}-{max_hum}%")
-    elif soil_humidity > max_hum:
-        recommendations.append(f"[HUMIDITE] Sol trop humide. Ideal: {min_hum}-{max_hum}%")
-
-    min_light, max_light = conditions['light_level']
-    if light_hours < min_light:
-        min_percent = int((min_light / 14) * 100)
-        max_percent = int((max_light / 14) * 100)
-        recommendations.append(f"[LUMIERE] Insuffisante ({light_level}%). Ideal: {min_percent}-{max_percent}%")
-    elif light_hours > max_light:
-        min_percent = int((min_light / 14) * 100)
-        max_percent = int((max_light / 14) * 100)
-        recommendations.append(f"[LUMIERE] Excessive ({light_level}%). Ideal: {min_percent}-{max_percent}%")
-
-    min_air, max_air = conditions['air_humidity']
-    if air_humidity < min_air:
-        recommendations.append(f"[HUMIDITE AIR] Trop basse. Ideal: {min_air}-{max_air}%")
-    elif air_humidity > max_air:
-        recommendations.append(f"[HUMIDITE AIR] Trop elevee. Ideal: {min_air}-{max_air}%")
+    Les règles sont évaluées par la table compilée de recommendation_engine.
+    """
+    from recommendation_engine import default_table
+    return default_table.recommend(seed_type, temperature, soil_humidity, air_humidity, light_level)
 
-    if not recommendations:
-        recommendations.append(f"[OK] Conditions optimales pour le {seed_type}.")
-        
-    return recommendations
+def is_out_of_range(seed_type, temperature, soil_humidity, air_humidity, light_level):
+    """Indique si au moins un paramètre est hors des conditions optimales du type de graine"""
+    from recommendation_engine import default_table
+    return default_table.out_of_range(seed_type, temperature, soil_humidity, air_humidity, light_level)
 
 def predict_score(model, model_columns, data):
     """
     Prépare les données pour la prédiction en s'assurant que les colonnes correspondent
     à celles utilisées pour l'entraînement.
     """
+    import pandas as pd
+
     # Convertir light_level de % en heures pour le modèle
     data_copy = data.copy()
     if 'light_level' in data_copy:
@@ -183,6 +162,15 @@ def predict_score(model, model_columns, data):
     # Fait la prédiction
     return model.predict(df_aligned)
 
+def get_recommendations_batch(rows):
+    """
+    Évalue les recommandations d'une liste de lectures en une seule opération vectorisée.
+    Retourne un RecommendationBatch: batch[i] donne les messages de la lecture i,
+    construits à la demande.
+    """
+    from recommendation_engine import default_table
+    return default_table.evaluate(rows)
+
 # --- Point d'entrée du script ---
 if __name__ == "__main__":
     # Entraîner le modèle au démarrage
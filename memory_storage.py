@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+Backend de stockage entièrement en mémoire (STORAGE_BACKEND=memory).
+
+Mêmes résultats que GerminationDatabase, sans E/S: sert à mesurer le coût propre de
+l'API (sérialisation, validation, inférence) indépendamment du stockage, et de base
+au journal en colonnes (columnar_log.py).
+
+- Lignes stockées en tuples, dans l'ordre des colonnes des tables SQLite.
+- Index triés par (timestamp, id), global et par type de graine: l'historique paginé
+  se résout par bisection, en O(log n + taille de page).
+- seed_stats (Welford) et rollups horaires/journaliers tenus à jour à chaque insertion,
+  comme les triggers SQLite.
+Les données sont perdues à l'arrêt du processus.
+"""
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, List, Optional, Tuple
+
+from database import (HISTORY_TABLES, ROLLUP_PARAMETERS, ROLLUP_SCORES, _format_seed_stats, decode_cursor,
+                      encode_cursor, rollup_table)
+from storage import StorageBackend
+
+# Colonnes des tables, dans l'ordre de SELECT * sur une base SQLite migrée
+TABLE_COLUMNS = {
+    'sensor_data': ('id', 'seed_type', 'temperature', 'soil_humidity', 'air_humidity', 'light_level',
+                    'germination_score', 'timestamp'),
+    'predictions': ('id', 'seed_type', 'temperature', 'soil_humidity', 'air_humidity', 'light_level',
+                    'predicted_score', 'model_version', 'timestamp', 'out_of_range')
+}
+# Position des colonnes utilisées par les index et les agrégats
+_SEED, _SCORE = 1, 6
+_TIMESTAMP = {'sensor_data': 7, 'predictions': 8}
+
+# Longueur du préfixe de timestamp identifiant l'intervalle, et complément jusqu'au format de bucket
+_BUCKETS = {
+    'hour': (13, ':00:00'),
+    'day': (10, ' 00:00:00')
+}
+
+
+def current_timestamp() -> str:
+    """Date courante au format de CURRENT_TIMESTAMP (UTC, 'YYYY-MM-DD HH:MM:SS')"""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _round(value: float) -> float:
+    """
+    Arrondi à 2 décimales proche de ROUND(x, 2) de SQLite: demi vers l'extérieur, sur la valeur
+    décimale à 15 chiffres significatifs (round() de Python arrondit la valeur binaire: 2.675 -> 2.67).
+    """
+    return float(Decimal(f'{value:.15g}').quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+
+
+def _bucket(timestamp: str, resolution: str) -> str:
+    length, suffix = _BUCKETS[resolution]
+    return timestamp[:length] + suffix
+
+
+class MemoryStorage(StorageBackend):
+    """Stockage en mémoire, thread-safe (un verrou pour les écritures et les lectures)"""
+
+    name = 'memory'
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._rows = {table: {} for table in HISTORY_TABLES}
+        self._last_id = {table: 0 for table in HISTORY_TABLES}
+        # Clés (timestamp, id) triées: toutes les lignes, et par type de graine
+        self._keys = {table: [] for table in HISTORY_TABLES}
+        self._seed_keys = {table: {} for table in HISTORY_TABLES}
+        # Ids croissants des lectures ayant un germination_score (réentraînement incrémental)
+        self._labeled_ids = []
+        # seed_type -> [count, mean_score, m2_score, min_score, max_score, out_of_range_count]
+        self._seed_stats = {}
+        # table de rollup -> seed_type -> bucket -> agrégats (ordre de database._rollup_columns)
+        self._rollups = {rollup_table(source, resolution): {}
+                         for source in ROLLUP_SCORES for resolution in _BUCKETS}
+
+    # --- Écritures ---
+
+    def add_sensor_data(self, seed_type: str, temperature: float, soil_humidity: float,
+                        air_humidity: float, light_level: float, germination_score: Optional[float] = None) -> int:
+        """Ajoute des données de capteurs"""
+        return self._insert('sensor_data', [(seed_type, temperature, soil_humidity, air_humidity, light_level,
+                                             germination_score, None)])
+
+    def add_sensor_data_batch(self, records: List[tuple]) -> int:
+        """Ajoute plusieurs lectures (seed_type, ..., germination_score, timestamp); timestamp None = date courante"""
+        if not records:
+            return 0
+        self._insert('sensor_data', records)
+        return len(records)
+
+    def add_prediction(self, seed_type: str, temperature: float, soil_humidity: float,
+                       air_humidity: float, light_level: float, predicted_score: float,
+                       model_version: Optional[str] = None, out_of_range: bool = False) -> int:
+        """Enregistre une prédiction"""
+        return self._insert('predictions', [(seed_type, temperature, soil_humidity, air_humidity, light_level,
+                                             predicted_score, model_version, out_of_range)])
+
+    def add_predictions_batch(self, records: List[tuple]) -> int:
+        """Enregistre plusieurs prédictions (seed_type, ..., predicted_score, model_version, out_of_range)"""
+        if not records:
+            return 0
+        self._insert('predictions', records)
+        return len(records)
+
+    def _insert(self, table: str, records: List[tuple]) -> int:
+        """Attribue ids et timestamps, écrit les lignes et retourne le dernier id"""
+        with self._lock:
+            now = None
+            last_id = self._last_id[table]
+            rows = []
+            for record in records:
+                last_id += 1
+                if table == 'sensor_data':
+                    seed_type, temperature, soil_humidity, air_humidity, light_level, score, timestamp = record
+                    if timestamp is None:
+                        timestamp = now = now or current_timestamp()
+                    rows.append((last_id, seed_type, float(temperature), float(soil_humidity), float(air_humidity),
+                                 float(light_level), None if score is None else float(score), timestamp))
+                else:
+                    seed_type, temperature, soil_humidity, air_humidity, light_level, score, version, oor = record
+                    now = now or current_timestamp()
+                    rows.append((last_id, seed_type, float(temperature), float(soil_humidity), float(air_humidity),
+                                 float(light_level), float(score), version, now, int(oor)))
+            self._write(table, rows)
+            return last_id
+
+    def _write(self, table: str, rows: List[tuple]):
+        """Écrit des lignes complètes (surchargée par les backends persistants)"""
+        self._store(table, rows)
+
+    def _store(self, table: str, rows: List[tuple]):
+        """Ajoute des lignes complètes aux tables, aux index et aux agrégats"""
+        data, keys, seed_keys = self._rows[table], self._keys[table], self._seed_keys[table]
+        position = _TIMESTAMP[table]
+        for row in rows:
+            row_id, seed_type, timestamp = row[0], row[_SEED], row[position]
+            data[row_id] = row
+            key = (timestamp, row_id)
+            _add_key(keys, key)
+            _add_key(seed_keys.setdefault(seed_type, []), key)
+            score = row[_SCORE]
+            if table == 'sensor_data':
+                if score is not None:
+                    self._labeled_ids.append(row_id)
+            else:
+                self._update_seed_stats(seed_type, score, row[9])
+            for resolution in _BUCKETS:
+                self._update_rollup(rollup_table(table, resolution), seed_type, _bucket(timestamp, resolution),
+                                    row[2:6], score)
+            self._last_id[table] = max(self._last_id[table], row_id)
+
+    def _update_seed_stats(self, seed_type, score, out_of_range):
+        """Mise à jour de Welford (même calcul que trg_predictions_seed_stats)"""
+        stats = self._seed_stats.get(seed_type)
+        if stats is None:
+            self._seed_stats[seed_type] = [1, score, 0.0, score, score, out_of_range]
+            return
+        count, mean = stats[0] + 1, stats[1]
+        new_mean = mean + (score - mean) / count
+        stats[0], stats[1] = count, new_mean
+        stats[2] += (score - mean) * (score - new_mean)
+        stats[3], stats[4] = min(stats[3], score), max(stats[4], score)
+        stats[5] += out_of_range
+
+    def _update_rollup(self, table, seed_type, bucket, parameters, score):
+        buckets = self._rollups[table].setdefault(seed_type, {})
+        aggregate = buckets.get(bucket)
+        if aggregate is None:
+            aggregate = [1]
+            for value in parameters:
+                aggregate += [value, value, value]
+            aggregate += [0, 0.0, score, score] if score is None else [1, score, score, score]
+            buckets[bucket] = aggregate
+            return
+        aggregate[0] += 1
+        for i, value in enumerate(parameters):
+            offset = 1 + 3 * i
+            aggregate[offset] += value
+            if value < aggregate[offset + 1]:
+                aggregate[offset + 1] = value
+            if value > aggregate[offset + 2]:
+                aggregate[offset + 2] = value
+        if score is not None:
+            aggregate[-4] += 1
+            aggregate[-3] += score
+            aggregate[-2] = score if aggregate[-2] is None else min(aggregate[-2], score)
+            aggregate[-1] = score if aggregate[-1] is None else max(aggregate[-1], score)
+
+    # --- Lectures ---
+
+    def get_labeled_sensor_data(self, after_id: int = 0) -> List[Dict]:
+        """Récupère les données de capteurs ayant un score de germination réel (pour l'entraînement)"""
+        columns = TABLE_COLUMNS['sensor_data'][:7]
+        with self._lock:
+            ids = self._labeled_ids[bisect_left(self._labeled_ids, after_id + 1):]
+            data = self._rows['sensor_data']
+            return [dict(zip(columns, data[row_id])) for row_id in ids]
+
+    def get_history_page(self, table: str, limit: int = 100, cursor: Optional[str] = None,
+                         seed_type: Optional[str] = None, start: Optional[str] = None,
+                         end: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Récupère une page de l'historique (sensor_data ou predictions), de la plus récente
+        à la plus ancienne. Retourne (lignes, curseur de la page suivante ou None).
+        """
+        if table not in HISTORY_TABLES:
+            raise ValueError(f"Table inconnue: {table}")
+        position = decode_cursor(cursor) if cursor is not None else None
+        columns = TABLE_COLUMNS[table]
+        with self._lock:
+            keys = self._keys[table] if seed_type is None else self._seed_keys[table].get(seed_type, [])
+            low = bisect_left(keys, (start,)) if start is not None else 0
+            high = len(keys)
+            if end is not None:
+                high = bisect_left(keys, (end,), low, high)
+            if position is not None:
+                high = min(high, bisect_left(keys, position, low, high))
+            selected = keys[max(low, high - limit):high]
+            data = self._rows[table]
+            rows = [dict(zip(columns, data[row_id])) for _, row_id in reversed(selected)]
+        next_cursor = encode_cursor(rows[-1]) if rows and high - low > limit else None
+        return rows, next_cursor
+
+    def get_rollups(self, source: str, resolution: str, seed_type: str, start: Optional[str] = None,
+                    end: Optional[str] = None) -> List[Dict]:
+        """Agrégats d'un type de graine par heure ou par jour (mêmes champs que GerminationDatabase)"""
+        table = rollup_table(source, resolution)
+        first = _bucket(start, resolution) if start is not None else None
+        with self._lock:
+            buckets = sorted((bucket, list(aggregate))
+                             for bucket, aggregate in self._rollups[table].get(seed_type, {}).items()
+                             if (first is None or bucket >= first) and (end is None or bucket < end))
+        result = []
+        for bucket, aggregate in buckets:
+            count = aggregate[0]
+            row = {'bucket': bucket, 'count': count}
+            for i, parameter in enumerate(ROLLUP_PARAMETERS):
+                total, low, high = aggregate[1 + 3 * i:4 + 3 * i]
+                row.update({f'{parameter}_mean': _round(total / count),
+                            f'{parameter}_min': low, f'{parameter}_max': high})
+            score_count, score_sum, score_min, score_max = aggregate[-4:]
+            row.update({'score_count': score_count,
+                        'score_mean': _round(score_sum / score_count) if score_count else None,
+                        'score_min': score_min, 'score_max': score_max})
+            result.append(row)
+        return result
+
+    def get_stats_by_seed_type(self, seed_type: str) -> Dict:
+        """Récupère les statistiques pour un type de graine"""
+        with self._lock:
+            stats = self._seed_stats.get(seed_type)
+            row = None if stats is None else dict(zip(
+                ('count', 'mean_score', 'm2_score', 'min_score', 'max_score', 'out_of_range_count'), stats))
+        return _format_seed_stats(seed_type, row)
+
+    def stats(self) -> Dict:
+        """Nombre de lignes par table"""
+        with self._lock:
+            return {table: len(rows) for table, rows in self._rows.items()}
+
+
+def _add_key(keys: list, key: tuple):
+    """Ajout à une liste triée: en fin de liste dans le cas courant (timestamps croissants)"""
+    if not keys or keys[-1] < key:
+        keys.append(key)
+    else:
+        insort(keys, key)
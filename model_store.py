@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Artefacts de modèle versionnés.
+
+Un artefact est un petit fichier JSON contenant les coefficients, l'ordre des colonnes,
+l'empreinte des données d'entraînement et les métriques. L'API le charge au démarrage
+au lieu de relire le CSV et de réentraîner le modèle.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from inference import CompiledModel
+
+ARTIFACT_FORMAT_VERSION = 1
+DEFAULT_MODEL_DIR = 'models'
+LATEST_ARTIFACT_NAME = 'latest.json'
+DEFAULT_ARTIFACT_PATH = os.path.join(DEFAULT_MODEL_DIR, LATEST_ARTIFACT_NAME)
+
+
+def file_sha256(path):
+    """Calcule l'empreinte SHA-256 d'un fichier"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def compute_model_version(columns, coef, intercept):
+    """
+    Version dérivée du contenu du modèle: deux entraînements produisant les mêmes
+    coefficients ont la même version, quel que soit le processus qui les a produits.
+    """
+    payload = json.dumps({'columns': list(columns), 'coef': list(coef), 'intercept': intercept})
+    return 'm-' + hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+
+
+def build_artifact(model, model_columns, training_data=None, metrics=None):
+    """
+    Construit l'artefact d'un LinearRegression entraîné.
+
+    Args:
+        training_data: Description des données d'entraînement (path, sha256, rows)
+        metrics: Métriques d'évaluation (r2, mae, rmse, ...)
+    """
+    columns = [str(col) for col in model_columns]
+    coef = [float(c) for c in model.coef_]
+    intercept = float(model.intercept_)
+    return {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'model_version': compute_model_version(columns, coef, intercept),
+        'model_type': type(model).__name__,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'columns': columns,
+        'coef': coef,
+        'intercept': intercept,
+        'training_data': training_data or {},
+        'metrics': metrics or {}
+    }
+
+
+def save_artifact(artifact, model_dir=DEFAULT_MODEL_DIR):
+    """
+    Écrit l'artefact sous un nom versionné puis met à jour latest.json de façon atomique.
+    Retourne le chemin du fichier versionné.
+    """
+    os.makedirs(model_dir, exist_ok=True)
+    versioned_path = os.path.join(model_dir, f"germination_model_{artifact['model_version']}.json")
+    for path in (versioned_path, os.path.join(model_dir, LATEST_ARTIFACT_NAME)):
+        write_artifact(artifact, path)
+    return versioned_path
+
+
+def write_artifact(artifact, path):
+    """
+    Remplace le fichier d'artefact de façon atomique: un lecteur (autre worker) voit
+    l'ancien ou le nouveau contenu, jamais un fichier partiel
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Fichier temporaire propre au processus: plusieurs workers peuvent publier en même temps
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(artifact, indent=2, ensure_ascii=False))
+    os.replace(tmp_path, path)
+
+
+def load_artifact(path=DEFAULT_ARTIFACT_PATH):
+    """Charge et valide un artefact de modèle"""
+    with open(path, 'r', encoding='utf-8') as f:
+        artifact = json.load(f)
+
+    if artifact.get('format_version') != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"Format d'artefact non supporté: {artifact.get('format_version')}")
+    if len(artifact['coef']) != len(artifact['columns']):
+        raise ValueError("Artefact invalide: nombre de coefficients différent du nombre de colonnes")
+    return artifact
+
+
+class _ArtifactModel:
+    """Vue minimale d'un artefact exposant coef_/intercept_ comme un LinearRegression"""
+
+    def __init__(self, artifact):
+        self.coef_ = artifact['coef']
+        self.intercept_ = artifact['intercept']
+
+
+def compile_artifact(artifact):
+    """Compile un artefact en moteur d'inférence"""
+    return CompiledModel.from_model(_ArtifactModel(artifact), artifact['columns'])
+
+
+def load_serving_model(artifact_path=DEFAULT_ARTIFACT_PATH, data_path='sensors_data.csv', force_training=False):
+    """
+    Charge le modèle de service depuis l'artefact, ou l'entraîne depuis le CSV
+    si l'artefact est absent ou si force_training est vrai. pandas et scikit-learn
+    ne sont importés que dans le cas de l'entraînement.
+
+    Returns:
+        (engine, artifact): moteur compilé et métadonnées de l'artefact
+    """
+    if not force_training and os.path.exists(artifact_path):
+        artifact = load_artifact(artifact_path)
+        print(f"[OK] Modele charge depuis {artifact_path} (version {artifact['model_version']})")
+        return compile_artifact(artifact), artifact
+
+    if not force_training:
+        print(f"[INFO] Artefact {artifact_path} introuvable, entrainement depuis {data_path}")
+        print("[INFO] Executez 'python train.py' pour accelerer les prochains demarrages")
+    from main import train_germination_model
+    model, model_columns = train_germination_model(data_path)
+    artifact = build_artifact(model, model_columns, training_data={
+        'path': data_path,
+        'sha256': file_sha256(data_path)
+    })
+    return CompiledModel.from_model(model, model_columns), artifact
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Moteur de recommandations piloté par table.
+
+Les règles de OPTIMAL_CONDITIONS sont compilées une fois en tableaux de bornes
+(une ligne par type de graine, une colonne par paramètre) et en table de messages
+pré-formatés. Un lot de lectures est évalué en une opération vectorisée qui produit
+un code de statut par paramètre (ok / bas / haut); les messages ne sont construits
+qu'à la lecture d'un résultat.
+"""
+import numpy as np
+from main import OPTIMAL_CONDITIONS, light_percent_to_hours
+
+# Ordre des paramètres = ordre des messages retournés
+PARAMETERS = ['temperature', 'soil_humidity', 'light_level', 'air_humidity']
+LIGHT = PARAMETERS.index('light_level')
+
+STATUS_OK = 0
+STATUS_LOW = 1
+STATUS_HIGH = 2
+
+
+def _compile_templates(seed_type, conditions):
+    """Messages pré-formatés d'un type de graine: templates[param][status]"""
+    min_temp, max_temp = conditions['temperature']
+    min_hum, max_hum = conditions['soil_humidity']
+    min_light, max_light = conditions['light_level']
+    min_air, max_air = conditions['air_humidity']
+    min_percent = int((min_light / 14) * 100)
+    max_percent = int((max_light / 14) * 100)
+    return [
+        (None,
+         f"[TEMPERATURE] Trop basse. Ideal: {min_temp}-{max_temp}C.",
+         f"[TEMPERATURE] Trop elevee. Ideal: {min_temp}-{max_temp}C."),
+        (None,
+         f"[HUMIDITE] Sol trop sec. Ideal: {min_hum}-{max_hum}%",
+         f"[HUMIDITE] Sol trop humide. Ideal: {min_hum}-{max_hum}%"),
+        # Le message de lumière contient la valeur lue: (préfixe, suffixe)
+        (None,
+         ("[LUMIERE] Insuffisante (", f"%). Ideal: {min_percent}-{max_percent}%"),
+         ("[LUMIERE] Excessive (", f"%). Ideal: {min_percent}-{max_percent}%")),
+        (None,
+         f"[HUMIDITE AIR] Trop basse. Ideal: {min_air}-{max_air}%",
+         f"[HUMIDITE AIR] Trop elevee. Ideal: {min_air}-{max_air}%"),
+    ]
+
+
+class RecommendationTable:
+    """Règles de recommandation compilées en tableaux de bornes et de messages"""
+
+    def __init__(self, conditions=None):
+        conditions = OPTIMAL_CONDITIONS if conditions is None else conditions
+        self.seed_types = list(conditions.keys())
+        self.seed_index = {seed_type: i for i, seed_type in enumerate(self.seed_types)}
+        self.unknown_index = len(self.seed_types)
+
+        # Bornes (n_seeds + 1, 4); la ligne des graines inconnues ne signale rien
+        self.low = np.full((len(self.seed_types) + 1, len(PARAMETERS)), -np.inf)
+        self.high = np.full((len(self.seed_types) + 1, len(PARAMETERS)), np.inf)
+        for i, seed_type in enumerate(self.seed_types):
+            for j, parameter in enumerate(PARAMETERS):
+                self.low[i, j], self.high[i, j] = conditions[seed_type][parameter]
+
+        self._bounds = [tuple(zip(self.low[i].tolist(), self.high[i].tolist()))
+                        for i in range(len(self.seed_types))]
+        self.templates = [_compile_templates(seed_type, conditions[seed_type]) for seed_type in self.seed_types]
+        self.ok_messages = [f"[OK] Conditions optimales pour le {seed_type}." for seed_type in self.seed_types]
+
+    def status_one(self, code, temperature, soil_humidity, air_humidity, light_level):
+        """Codes de statut d'une lecture (sans numpy, pour le chemin unitaire)"""
+        (t_low, t_high), (s_low, s_high), (l_low, l_high), (a_low, a_high) = self._bounds[code]
+        light_hours = light_percent_to_hours(light_level)
+        return (
+            STATUS_LOW if temperature < t_low else STATUS_HIGH if temperature > t_high else STATUS_OK,
+            STATUS_LOW if soil_humidity < s_low else STATUS_HIGH if soil_humidity > s_high else STATUS_OK,
+            STATUS_LOW if light_hours < l_low else STATUS_HIGH if light_hours > l_high else STATUS_OK,
+            STATUS_LOW if air_humidity < a_low else STATUS_HIGH if air_humidity > a_high else STATUS_OK,
+        )
+
+    def render(self, seed_type, code, status, light_level):
+        """Construit les messages d'une lecture à partir de ses codes de statut"""
+        if code == self.unknown_index:
+            return [f"[ERREUR] Type de graine '{seed_type}' non reconnu."]
+
+        templates = self.templates[code]
+        messages = []
+        for parameter, parameter_status in enumerate(status):
+            if parameter_status:
+                template = templates[parameter][parameter_status]
+                if parameter == LIGHT:
+                    prefix, suffix = template
+                    template = f"{prefix}{light_level}{suffix}"
+                messages.append(template)
+        if not messages:
+            messages.append(self.ok_messages[code])
+        return messages
+
+    def assess(self, seed_type, temperature, soil_humidity, air_humidity, light_level):
+        """
+        Évaluation d'une lecture: (code de graine, codes de statut). Ne contient aucun texte
+        propre à la lecture: c'est elle que l'on met en cache, les messages étant construits
+        ensuite par render_assessment avec la valeur de lumière de chaque lecture.
+        """
+        code = self.seed_index.get(seed_type, self.unknown_index)
+        if code == self.unknown_index:
+            return code, ()
+        return code, self.status_one(code, temperature, soil_humidity, air_humidity, light_level)
+
+    def render_assessment(self, seed_type, assessment, light_level):
+        code, status = assessment
+        return self.render(seed_type, code, status, light_level)
+
+    def recommend(self, seed_type, temperature, soil_humidity, air_humidity, light_level):
+        """Recommandations pour une lecture (même résultat que l'analyse historique)"""
+        assessment = self.assess(seed_type, temperature, soil_humidity, air_humidity, light_level)
+        return self.render_assessment(seed_type, assessment, light_level)
+
+    def out_of_range(self, seed_type, temperature, soil_humidity, air_humidity, light_level):
+        """True si au moins un paramètre est hors des conditions optimales (False si graine inconnue)"""
+        code = self.seed_index.get(seed_type, self.unknown_index)
+        if code == self.unknown_index:
+            return False
+        return any(self.status_one(code, temperature, soil_humidity, air_humidity, light_level))
+
+    def evaluate(self, rows):
+        """
+        Évalue un lot de lectures (dictionnaires, light_level en %) en une opération
+        vectorisée et retourne un RecommendationBatch.
+        """
+        seed_types = [row['seed_type'] for row in rows]
+        codes = np.fromiter((self.seed_index.get(s, self.unknown_index) for s in seed_types),
+                            dtype=np.intp, count=len(rows))
+        light_levels = [row['light_level'] for row in rows]
+        values = np.array(
+            [[row['temperature'], row['soil_humidity'], row['light_level'], row['air_humidity']]
+             for row in rows],
+            dtype=np.float64
+        ).reshape(len(rows), len(PARAMETERS))
+        values[:, LIGHT] = light_percent_to_hours(values[:, LIGHT])
+
+        status = np.where(values < self.low[codes], STATUS_LOW,
+                          np.where(values > self.high[codes], STATUS_HIGH, STATUS_OK)).astype(np.int8)
+        return RecommendationBatch(self, seed_types, codes, status, light_levels)
+
+
+class RecommendationBatch:
+    """
+    Résultat d'une évaluation par lot: codes de statut (n, 4) et messages construits
+    à la demande (batch[i]), mis en cache par combinaison de statuts.
+    """
+
+    def __init__(self, table, seed_types, codes, status, light_levels):
+        self.table = table
+        self.seed_types = seed_types
+        self.codes = codes
+        self.status = status
+        self.light_levels = light_levels
+        self._rendered = {}
+
+    @property
+    def out_of_range(self):
+        """Masque des lectures dont au moins un paramètre est hors des conditions optimales"""
+        return self.status.any(axis=1)
+
+    def __len__(self):
+        return len(self.seed_types)
+
+    def _messages(self, seed_type, code, status, light_level):
+        if status[LIGHT] and code != self.table.unknown_index:
+            # Le message dépend de la valeur de lumière lue
+            return self.table.render(seed_type, code, status, light_level)
+        key = (code, status) if code != self.table.unknown_index else (code, seed_type)
+        messages = self._rendered.get(key)
+        if messages is None:
+            messages = self.table.render(seed_type, code, status, None)
+            self._rendered[key] = messages
+        return list(messages)
+
+    def assessments(self):
+        """Évaluations (code de graine, codes de statut) de chaque lecture, comme RecommendationTable.assess"""
+        statuses = map(tuple, self.status.tolist())
+        for code, status in zip(self.codes.tolist(), statuses):
+            yield (code, ()) if code == self.table.unknown_index else (code, status)
+
+    def __getitem__(self, i):
+        return self._messages(self.seed_types[i], int(self.codes[i]),
+                              tuple(self.status[i].tolist()), self.light_levels[i])
+
+    def __iter__(self):
+        statuses = map(tuple, self.status.tolist())
+        for seed_type, code, status, light_level in zip(self.seed_types, self.codes.tolist(),
+                                                          statuses, self.light_levels):
+            yield self._messages(seed_type, code, status, light_level)
+
+
+# Table compilée à partir de OPTIMAL_CONDITIONS
+default_table = RecommendationTable()
+
+
+def rebuild_default_table():
+    """Recompile default_table (à appeler après toute modification de OPTIMAL_CONDITIONS)"""
+    global default_table
+    default_table = RecommendationTable()
+    return default_table
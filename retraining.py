@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+Réentraînement en arrière-plan et remplacement atomique du modèle de service.
+
+Le modèle courant est un ModelState immuable référencé par ModelRegistry. Une requête
+lit registry.current une seule fois et utilise ce même état jusqu'à sa réponse; le
+réentraînement construit un nouvel état complet puis remplace la référence en une
+seule affectation, donc aucune requête ne voit un modèle à moitié mis à jour.
+
+Avec plusieurs workers, chacun a son registre: le worker qui réentraîne publie l'artefact
+(artifact_path) et les autres le rechargent (ArtifactWatcher).
+"""
+import os
+import threading
+from datetime import datetime, timezone
+import numpy as np
+from main import light_percent_to_hours
+from inference import CompiledModel
+from incremental import SufficientStatistics
+from model_store import build_artifact, compile_artifact, file_sha256, load_artifact, write_artifact
+
+
+def _same_coefficients(info, artifact):
+    """Vrai si deux artefacts décrivent le même modèle à l'arrondi flottant près"""
+    return (
+        info.get('columns') == artifact['columns']
+        and np.allclose(info['coef'], artifact['coef'], rtol=1e-9, atol=1e-9)
+        and np.isclose(info['intercept'], artifact['intercept'], rtol=1e-9, atol=1e-9)
+    )
+
+
+class ModelState:
+    """Modèle compilé et ses métadonnées (artefact), jamais modifié après création"""
+
+    __slots__ = ('engine', 'info', 'version')
+
+    def __init__(self, engine, info):
+        self.engine = engine
+        self.info = info
+        self.version = info['model_version']
+
+
+class ModelRegistry:
+    """Référence vers le modèle de service courant"""
+
+    def __init__(self, engine, info):
+        self._state = ModelState(engine, info)
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> ModelState:
+        return self._state
+
+    def swap(self, engine, info) -> ModelState:
+        """Remplace le modèle courant et retourne l'ancien état"""
+        new_state = ModelState(engine, info)
+        with self._lock:
+            previous, self._state = self._state, new_state
+        return previous
+
+
+class Retrainer:
+    """
+    Réentraîne périodiquement le modèle sur le CSV de référence et les lectures
+    étiquetées de la table sensor_data, hors du chemin des requêtes, à partir de
+    statistiques suffisantes tenues à jour (voir incremental.py).
+    """
+
+    def __init__(self, registry, db, data_path='sensors_data.csv', interval_seconds=0, snapshot=None,
+                 artifact_path=None):
+        """
+        Args:
+            interval_seconds: Période du réentraînement automatique (0 = uniquement à la demande)
+            snapshot: TrainingSnapshot optionnel: les statistiques initiales sont lues par memory
+                      mapping au lieu d'analyser le CSV, et les lectures étiquetées y sont ajoutées
+            artifact_path: Fichier où publier l'artefact de chaque nouveau modèle (None: non publié)
+        """
+        self.registry = registry
+        self.db = db
+        self.data_path = data_path
+        self.snapshot = snapshot
+        self.artifact_path = artifact_path
+        self.interval_seconds = interval_seconds
+        self.last_run = None
+        self.last_result = None
+        # Statistiques suffisantes du CSV et des lectures étiquetées déjà intégrées
+        self.stats = None
+        self.last_sensor_data_id = 0
+        self.labeled_rows = 0
+        self._retrain_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _ingest_new_labeled_rows(self):
+        """Ajoute aux statistiques les lectures étiquetées arrivées depuis le dernier passage"""
+        if self.stats is None and self.snapshot is not None:
+            # Instantané réimporté si le CSV a changé, puis relu sans analyse de texte
+            self.snapshot.sync(self.data_path)
+            self.stats = self.snapshot.statistics()
+            self.csv_sha256 = self.snapshot.csv['sha256']
+            self.last_sensor_data_id = self.snapshot.last_sensor_data_id
+            self.labeled_rows = self.snapshot.labeled_rows
+        elif self.stats is None:
+            self.stats = SufficientStatistics()
+            self.stats.add_csv(self.data_path)
+            self.csv_sha256 = file_sha256(self.data_path)
+
+        labeled = self.db.get_labeled_sensor_data(after_id=self.last_sensor_data_id)
+        if labeled:
+            # Les lectures de l'API sont en %, le CSV d'entraînement en heures
+            seed_types = [row['seed_type'] for row in labeled]
+            features = [[row['temperature'], row['soil_humidity'], row['air_humidity'],
+                         light_percent_to_hours(row['light_level'])] for row in labeled]
+            targets = [row['germination_score'] for row in labeled]
+            if self.snapshot is not None:
+                # Mêmes valeurs float32 que celles relues depuis l'instantané au prochain démarrage
+                features, targets = np.float32(features), np.float32(targets)
+                self.snapshot.append(seed_types, features, targets, last_sensor_data_id=labeled[-1]['id'])
+            self.stats.add_many(seed_types, features, targets)
+            self.last_sensor_data_id = labeled[-1]['id']
+            self.labeled_rows += len(labeled)
+        return len(labeled)
+
+    def retrain_now(self):
+        """
+        Met à jour le modèle avec les nouvelles lectures étiquetées et le publie si ses
+        coefficients ont changé. Le coût dépend du nombre de nouvelles lectures, pas de
+        la taille de l'historique.
+        """
+        with self._retrain_lock:
+            new_rows = self._ingest_new_labeled_rows()
+            model, model_columns = self.stats.solve()
+            artifact = build_artifact(model, model_columns, training_data={
+                'path': self.data_path,
+                'sha256': self.csv_sha256,
+                'rows': self.stats.n_samples,
+                'labeled_rows': self.labeled_rows,
+                'last_sensor_data_id': self.last_sensor_data_id
+            })
+
+            previous = self.registry.current
+            if not _same_coefficients(previous.info, artifact):
+                self.registry.swap(CompiledModel.from_model(model, model_columns), artifact)
+                if self.artifact_path:
+                    # Les autres workers rechargent ce fichier (ArtifactWatcher)
+                    write_artifact(artifact, self.artifact_path)
+                status = 'updated'
+            else:
+                status = 'unchanged'
+
+            self.last_run = datetime.now(timezone.utc).isoformat(timespec='seconds')
+            self.last_result = {
+                'status': status,
+                'previous_version': previous.version,
+                'model_version': self.registry.current.version,
+                'new_labeled_rows': new_rows,
+                'labeled_rows': self.labeled_rows,
+                'finished_at': self.last_run
+            }
+            return self.last_result
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval_seconds):
+            try:
+                result = self.retrain_now()
+                print(f"[OK] Reentrainement: {result['status']} ({result['model_version']})")
+            except Exception as e:
+                self.last_result = {'status': 'error', 'error': str(e)}
+                print(f"[ERREUR] Reentrainement: {e}")
+
+    def start(self):
+        """Démarre le réentraînement périodique si un intervalle est configuré"""
+        if self.interval_seconds <= 0 or self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='retrainer', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+def _last_sensor_data_id(info):
+    return info.get('training_data', {}).get('last_sensor_data_id') or 0
+
+
+class ArtifactWatcher:
+    """
+    Recharge le modèle quand le fichier d'artefact publié change (mode multi-workers):
+    un stat() par période, la lecture du fichier seulement quand il a été remplacé.
+    """
+
+    def __init__(self, registry, artifact_path, interval_seconds=2.0):
+        """
+        Args:
+            artifact_path: Artefact publié par Retrainer (artifact_path)
+            interval_seconds: Période de vérification (0 = désactivé)
+        """
+        self.registry = registry
+        self.artifact_path = artifact_path
+        self.interval_seconds = interval_seconds
+        self.reloads = 0
+        self.last_reload = None
+        self.last_error = None
+        self._signature = self._stat()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.artifact_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def check(self):
+        """Recharge l'artefact s'il a changé; retourne True si le modèle a été remplacé"""
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        artifact = load_artifact(self.artifact_path)
+        current = self.registry.current
+        if artifact['model_version'] == current.version:
+            return False
+        if _last_sensor_data_id(artifact) < _last_sensor_data_id(current.info):
+            # Publication concurrente d'un modèle entraîné sur moins de données: ignorée
+            return False
+        self.registry.swap(compile_artifact(artifact), artifact)
+        self.reloads += 1
+        self.last_reload = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        return True
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval_seconds):
+            try:
+                if self.check():
+                    print(f"[OK] Modele recharge depuis {self.artifact_path} ({self.registry.current.version})")
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"[ERREUR] Rechargement du modele: {e}")
+
+    def start(self):
+        if self.interval_seconds <= 0 or self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='artifact-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self):
+        return {
+            'interval_seconds': self.interval_seconds,
+            'artifact_path': self.artifact_path,
+            'reloads': self.reloads,
+            'last_reload': self.last_reload,
+            'last_error': self.last_error
+        }
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Instantané binaire en colonnes des données d'entraînement, lu par memory mapping.
+
+Le CSV de référence et les lectures étiquetées de sensor_data sont écrits une fois
+dans des tableaux de largeur fixe; l'entraînement les relit avec np.memmap, sans
+analyse de texte. Les nouvelles lectures étiquetées sont ajoutées à la fin des
+fichiers, sans réécrire l'existant.
+
+Répertoire de l'instantané:
+- manifest.json: nombre de lignes, type numpy de chaque colonne, types de graines
+  (rang = code), empreinte du CSV importé et dernier id de sensor_data intégré
+- seed_type.bin: code du type de graine (uint16)
+- temperature.bin, soil_humidity.bin, air_humidity.bin, light_level.bin: features
+  du modèle en float32 (light_level en heures, comme le CSV)
+- germination_score.bin: cible en float32
+
+Le manifeste est réécrit (remplacement atomique) après l'ajout des données: les
+lecteurs ne voient que les lignes validées, et les octets d'un ajout interrompu
+sont tronqués à l'ajout suivant. Un seul processus doit écrire dans un instantané.
+"""
+import csv
+import json
+import os
+import numpy as np
+from incremental import SufficientStatistics
+from inference import NUMERIC_FEATURES
+from main import light_percent_to_hours
+from model_store import file_sha256
+
+SNAPSHOT_FORMAT_VERSION = 1
+DEFAULT_SNAPSHOT_DIR = 'training_snapshot'
+MANIFEST_FILE = 'manifest.json'
+SNAPSHOT_COLUMNS = {'seed_type': '<u2', **{name: '<f4' for name in NUMERIC_FEATURES}, 'germination_score': '<f4'}
+
+
+class TrainingSnapshot:
+    """Données d'entraînement en colonnes binaires, extensibles par ajout"""
+
+    def __init__(self, path=DEFAULT_SNAPSHOT_DIR):
+        self.path = path
+        self.manifest = self._read_manifest()
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _empty_manifest(self):
+        return {
+            'format_version': SNAPSHOT_FORMAT_VERSION,
+            'rows': 0,
+            'columns': SNAPSHOT_COLUMNS,
+            'seed_types': [],
+            'csv': None,
+            'labeled_rows': 0,
+            'last_sensor_data_id': 0
+        }
+
+    def _read_manifest(self):
+        path = self._file(MANIFEST_FILE)
+        if not os.path.exists(path):
+            return self._empty_manifest()
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('format_version') != SNAPSHOT_FORMAT_VERSION or manifest['columns'] != SNAPSHOT_COLUMNS:
+            raise ValueError(f"Instantané incompatible: {self.path} (format {manifest.get('format_version')})")
+        return manifest
+
+    def _write_manifest(self, manifest):
+        temp_path = self._file(MANIFEST_FILE + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self._file(MANIFEST_FILE))
+        self.manifest = manifest
+
+    @property
+    def rows(self):
+        return self.manifest['rows']
+
+    @property
+    def seed_types(self):
+        return self.manifest['seed_types']
+
+    @property
+    def last_sensor_data_id(self):
+        return self.manifest['last_sensor_data_id']
+
+    @property
+    def labeled_rows(self):
+        return self.manifest['labeled_rows']
+
+    @property
+    def csv(self):
+        """Empreinte du CSV importé ({'path', 'sha256', 'rows'}) ou None"""
+        return self.manifest['csv']
+
+    # --- Écriture ---
+
+    def append(self, seed_types, features, targets, last_sensor_data_id=None, csv_source=None):
+        """
+        Ajoute des lectures étiquetées à la fin des colonnes; retourne le nombre de lignes ajoutées.
+
+        Args:
+            seed_types: Types de graines (n,)
+            features: Features (n, 4) dans l'ordre NUMERIC_FEATURES, light_level en heures
+            targets: Scores de germination (n,)
+            last_sensor_data_id: Dernier id de sensor_data inclus (lectures étiquetées de la base)
+            csv_source: Empreinte du CSV importé ({'path', 'sha256', 'rows'})
+        """
+        features = np.asarray(features, dtype=np.float32).reshape(-1, len(NUMERIC_FEATURES))
+        count = len(features)
+        manifest = json.loads(json.dumps(self.manifest))
+        codes = {seed: code for code, seed in enumerate(manifest['seed_types'])}
+        for seed in seed_types:
+            if seed not in codes:
+                codes[seed] = len(manifest['seed_types'])
+                manifest['seed_types'].append(seed)
+        if len(manifest['seed_types']) > np.iinfo(np.uint16).max:
+            raise ValueError("Trop de types de graines pour l'instantané")
+        columns = {
+            'seed_type': np.fromiter((codes[seed] for seed in seed_types), dtype='<u2', count=count),
+            'germination_score': np.asarray(targets, dtype='<f4')
+        }
+        for i, name in enumerate(NUMERIC_FEATURES):
+            columns[name] = features[:, i]
+
+        os.makedirs(self.path, exist_ok=True)
+        for name, dtype in SNAPSHOT_COLUMNS.items():
+            with open(self._file(f'{name}.bin'), 'ab') as f:
+                # Octets d'un ajout interrompu (non validé par le manifeste)
+                f.truncate(self.rows * np.dtype(dtype).itemsize)
+                np.ascontiguousarray(columns[name], dtype=dtype).tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+
+        manifest['rows'] += count
+        if last_sensor_data_id is not None:
+            manifest['labeled_rows'] += count
+            manifest['last_sensor_data_id'] = last_sensor_data_id
+        if csv_source is not None:
+            manifest['csv'] = csv_source
+        self._write_manifest(manifest)
+        return count
+
+    def append_csv(self, data_path):
+        """Importe un CSV au format de sensors_data.csv (une seule analyse du texte)"""
+        if self.csv is not None:
+            raise ValueError(f"L'instantané contient déjà {self.csv['path']}: utiliser reset() avant un nouvel import")
+        seed_types, features, targets = [], [], []
+        with open(data_path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                seed_types.append(row['seed_type'])
+                features.append([float(row[name]) for name in NUMERIC_FEATURES])
+                targets.append(float(row['germination_score']))
+        return self.append(seed_types, features, targets, csv_source={
+            'path': data_path, 'sha256': file_sha256(data_path), 'rows': len(seed_types)
+        })
+
+    def append_labeled(self, db):
+        """Ajoute les lectures étiquetées de la base arrivées depuis le dernier ajout"""
+        labeled = db.get_labeled_sensor_data(after_id=self.last_sensor_data_id)
+        if not labeled:
+            return 0
+        # Les lectures de l'API sont en %, le modèle attend des heures
+        return self.append(
+            [row['seed_type'] for row in labeled],
+            [[row['temperature'], row['soil_humidity'], row['air_humidity'],
+              light_percent_to_hours(row['light_level'])] for row in labeled],
+            [row['germination_score'] for row in labeled],
+            last_sensor_data_id=labeled[-1]['id']
+        )
+
+    def reset(self):
+        """Vide l'instantané (les fichiers sont tronqués au prochain ajout)"""
+        os.makedirs(self.path, exist_ok=True)
+        self._write_manifest(self._empty_manifest())
+
+    def sync(self, data_path, db=None):
+        """
+        Met l'instantané à jour: réimporte tout si le CSV a changé, puis ajoute les
+        nouvelles lectures étiquetées de db. Retourne un résumé de l'opération.
+        """
+        rebuilt = self.csv is None or self.csv['sha256'] != file_sha256(data_path)
+        if rebuilt:
+            self.reset()
+            self.append_csv(data_path)
+        new_rows = self.append_labeled(db) if db is not None else 0
+        return {'rebuilt': rebuilt, 'new_labeled_rows': new_rows, 'rows': self.rows,
+                'labeled_rows': self.labeled_rows, 'last_sensor_data_id': self.last_sensor_data_id}
+
+    # --- Lecture ---
+
+    def arrays(self):
+        """Colonnes en lecture seule (np.memmap, aucune copie ni analyse), limitées aux lignes validées"""
+        result = {}
+        for name, dtype in SNAPSHOT_COLUMNS.items():
+            if self.rows == 0:
+                result[name] = np.empty(0, dtype=dtype)
+            else:
+                result[name] = np.memmap(self._file(f'{name}.bin'), dtype=dtype, mode='r', shape=(self.rows,))
+        return result
+
+    def statistics(self, chunk_rows=1_000_000):
+        """Statistiques suffisantes de tout l'instantané, calculées par blocs de chunk_rows lignes"""
+        stats = SufficientStatistics()
+        arrays = self.arrays()
+        seed_types = np.array(self.seed_types)
+        for start in range(0, self.rows, chunk_rows):
+            window = slice(start, start + chunk_rows)
+            features = np.column_stack([arrays[name][window] for name in NUMERIC_FEATURES])
+            stats.add_coded(arrays['seed_type'][window], seed_types, features, arrays['germination_score'][window])
+        return stats
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Rapport de démarrage: temps d'import de api.py et mémoire (RSS) selon le mode de service.
+
+    SERVING_MODE=fast : modèle chargé depuis l'artefact, sans pandas ni scikit-learn
+    SERVING_MODE=full : modèle entraîné depuis le CSV au démarrage
+
+Usage:
+    python startup_report.py [--runs 3]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# Exécuté dans un processus neuf pour chaque mesure
+PROBE = r"""
+import json, resource, sys, time
+start = time.perf_counter()
+import api
+elapsed = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    'import_s': elapsed,
+    'max_rss_mb': rss_kb / 1024,
+    'pandas': 'pandas' in sys.modules,
+    'sklearn': 'sklearn' in sys.modules,
+    'modules': len(sys.modules)
+}))
+"""
+
+
+def mesurer(mode, artifact_path, db_path):
+    env = dict(os.environ, SERVING_MODE=mode, MODEL_ARTIFACT_PATH=artifact_path, GERMINATION_DB_PATH=db_path)
+    output = subprocess.run([sys.executable, '-c', PROBE], env=env, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare le démarrage des modes fast et full")
+    parser.add_argument('--runs', type=int, default=3, help="Nombre de démarrages par mode")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Artefact de référence pour le mode fast
+        subprocess.run([sys.executable, 'train.py', '--output-dir', tmp], check=True, capture_output=True)
+        artifact_path = os.path.join(tmp, 'latest.json')
+        db_path = os.path.join(tmp, 'report.db')
+
+        print("=" * 70)
+        print("  RAPPORT DE DEMARRAGE")
+        print("=" * 70)
+        for mode in ('fast', 'full'):
+            runs = [mesurer(mode, artifact_path, db_path) for _ in range(args.runs)]
+            best = min(runs, key=lambda r: r['import_s'])
+            print(f"\nMode {mode}:")
+            print(f"  Import de api.py : {best['import_s'] * 1000:8.1f} ms (meilleur de {args.runs})")
+            print(f"  RSS max          : {best['max_rss_mb']:8.1f} Mo")
+            print(f"  Modules charges  : {best['modules']}")
+            print(f"  pandas charge    : {'oui' if best['pandas'] else 'non'}")
+            print(f"  sklearn charge   : {'oui' if best['sklearn'] else 'non'}")
+        print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
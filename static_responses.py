@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Réponses statiques pré-sérialisées (catalogue des semences: GET /, /conditions, /conditions/{seed_type}).
+
+Le contenu est sérialisé une fois (au démarrage, puis à chaque changement du catalogue) en octets
+JSON identiques à ceux de JSONResponse, avec un ETag fort (empreinte du contenu) et Cache-Control.
+Le middleware répond directement aux GET/HEAD de ces chemins, sans passer par le routage ni par
+le handler; une requête conditionnelle dont l'If-None-Match correspond reçoit un 304 sans corps.
+"""
+import hashlib
+import json
+
+
+def render_json(content):
+    """Mêmes octets que starlette.responses.JSONResponse"""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def etag_matches(if_none_match, etag):
+    """Comparaison faible de If-None-Match (RFC 9110): liste d'ETags ou *"""
+    if if_none_match.strip() == '*':
+        return True
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class StaticResponses:
+    """Table chemin -> (corps JSON, ETag) remplacée en bloc à chaque reconstruction"""
+
+    def __init__(self, max_age=300):
+        """
+        Args:
+            max_age: Durée (s) pendant laquelle les clients peuvent réutiliser la réponse sans
+                     revalider (Cache-Control: public, max-age); ensuite requête conditionnelle
+        """
+        self.max_age = max_age
+        self._entries = {}
+        self.builds = 0
+        self.hits = 0
+        self.not_modified = 0
+
+    def build(self, contents):
+        """Sérialise les réponses {chemin: contenu} et remplace la table"""
+        entries = {}
+        for path, content in contents.items():
+            body = render_json(content)
+            entries[path] = (body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"')
+        self._entries = entries
+        self.builds += 1
+
+    def get(self, path):
+        return self._entries.get(path)
+
+    def headers(self, etag):
+        return [(b'etag', etag.encode('ascii')),
+                (b'cache-control', f'public, max-age={self.max_age}'.encode('ascii'))]
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'builds': self.builds,
+            'max_age': self.max_age,
+            'hits': self.hits,
+            'not_modified': self.not_modified
+        }
+
+
+class StaticResponseMiddleware:
+    """Middleware ASGI servant les réponses de StaticResponses"""
+
+    def __init__(self, app, responses):
+        self.app = app
+        self.responses = responses
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['method'] not in ('GET', 'HEAD'):
+            return await self.app(scope, receive, send)
+        entry = self.responses.get(scope['path'])
+        if entry is None:
+            return await self.app(scope, receive, send)
+
+        body, etag = entry
+        headers = self.responses.headers(etag)
+        if_none_match = next((value for name, value in scope['headers'] if name == b'if-none-match'), None)
+        if if_none_match is not None and etag_matches(if_none_match.decode('latin-1'), etag):
+            self.responses.not_modified += 1
+            await send({'type': 'http.response.start', 'status': 304, 'headers': headers})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        self.responses.hits += 1
+        headers += [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode('ascii'))]
+        await send({'type': 'http.response.start', 'status': 200, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body if scope['method'] == 'GET' else b''})
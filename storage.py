@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Interface de stockage de l'API et sélection du backend par configuration.
+
+Backends disponibles (STORAGE_BACKEND):
+- sqlite (défaut): GerminationDatabase, fichier SQLite (database.py)
+- memory: tout en mémoire, rien n'est persisté (benchmarks, tests, profilage de l'API seule)
+- columnar: journal en colonnes, en ajout seul, rechargé en mémoire au démarrage (columnar_log.py)
+
+Tous les backends retournent les mêmes structures (dictionnaires de lignes, curseurs de
+pagination, statistiques et agrégats horaires/journaliers).
+"""
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional, Tuple
+
+STORAGE_BACKENDS = ('sqlite', 'memory', 'columnar')
+DEFAULT_STORAGE_PATHS = {
+    'sqlite': 'germination.db',
+    'memory': None,
+    'columnar': 'germination_log'
+}
+
+
+class StorageBackend(ABC):
+    """
+    Opérations de stockage utilisées par l'API, le réentraînement et l'import en masse.
+    Un backend incomplet échoue dès son instanciation (TypeError), pas au premier appel.
+    """
+
+    name = None
+
+    # --- Écritures ---
+
+    @abstractmethod
+    def add_sensor_data(self, seed_type: str, temperature: float, soil_humidity: float,
+                        air_humidity: float, light_level: float, germination_score: Optional[float] = None) -> int:
+        """Ajoute une lecture de capteurs et retourne son id"""
+
+    @abstractmethod
+    def add_sensor_data_batch(self, records: List[tuple]) -> int:
+        """Ajoute des tuples (seed_type, temperature, soil_humidity, air_humidity, light_level,
+        germination_score, timestamp) en une opération; timestamp None = date courante"""
+
+    @abstractmethod
+    def add_prediction(self, seed_type: str, temperature: float, soil_humidity: float,
+                       air_humidity: float, light_level: float, predicted_score: float,
+                       model_version: Optional[str] = None, out_of_range: bool = False) -> int:
+        """Enregistre une prédiction et retourne son id"""
+
+    @abstractmethod
+    def add_predictions_batch(self, records: List[tuple]) -> int:
+        """Enregistre des tuples (seed_type, temperature, soil_humidity, air_humidity, light_level,
+        predicted_score, model_version, out_of_range) en une opération"""
+
+    # --- Lectures ---
+
+    def get_sensor_data(self, limit: int = 100) -> List[Dict]:
+        """Lectures les plus récentes"""
+        return self.get_history_page('sensor_data', limit)[0]
+
+    def get_predictions(self, limit: int = 100) -> List[Dict]:
+        """Prédictions les plus récentes"""
+        return self.get_history_page('predictions', limit)[0]
+
+    @abstractmethod
+    def get_labeled_sensor_data(self, after_id: int = 0) -> List[Dict]:
+        """Lectures ayant un germination_score d'id supérieur à after_id, par id croissant"""
+
+    @abstractmethod
+    def get_history_page(self, table: str, limit: int = 100, cursor: Optional[str] = None,
+                         seed_type: Optional[str] = None, start: Optional[str] = None,
+                         end: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """Page de l'historique, de la plus récente à la plus ancienne: (lignes, curseur suivant ou None)"""
+
+    def iter_history(self, table: str, seed_type: Optional[str] = None, start: Optional[str] = None,
+                     end: Optional[str] = None, cursor: Optional[str] = None,
+                     limit: Optional[int] = None, chunk_size: int = 500) -> Iterator[Dict]:
+        """Parcourt l'historique ligne par ligne, par pages de chunk_size (export en streaming)"""
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            rows, cursor = self.get_history_page(table, size, cursor, seed_type, start, end)
+            yield from rows
+            if remaining is not None:
+                remaining -= len(rows)
+            if cursor is None:
+                return
+
+    @abstractmethod
+    def get_rollups(self, source: str, resolution: str, seed_type: str, start: Optional[str] = None,
+                    end: Optional[str] = None) -> List[Dict]:
+        """Agrégats horaires ou journaliers d'un type de graine, du plus ancien au plus récent"""
+
+    @abstractmethod
+    def get_stats_by_seed_type(self, seed_type: str) -> Dict:
+        """Statistiques des prédictions d'un type de graine"""
+
+    def close(self):
+        """Libère les ressources du backend"""
+
+
+def create_storage(backend: str = 'sqlite', path: Optional[str] = None) -> StorageBackend:
+    """
+    Instancie un backend de stockage.
+
+    Args:
+        backend: 'sqlite', 'memory' ou 'columnar'
+        path: Fichier SQLite ou répertoire du journal en colonnes (défaut selon le backend)
+    """
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Backend de stockage inconnu: {backend} (attendu: {', '.join(STORAGE_BACKENDS)})")
+    path = path or DEFAULT_STORAGE_PATHS[backend]
+    if backend == 'sqlite':
+        from database import GerminationDatabase
+        return GerminationDatabase(path)
+    if backend == 'memory':
+        from memory_storage import MemoryStorage
+        return MemoryStorage()
+    from columnar_log import ColumnarLogStorage
+    return ColumnarLogStorage(path)
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Ingestion continue de lectures par WebSocket (GET /ws/ingest).
+
+Une passerelle garde la connexion ouverte et envoie des trames JSON:
+- une lecture: {"seed_type": "mais", "temperature": 25, ..., "germination_score": null, "id": 17}
+- un lot: {"id": "lot-42", "readings": [{...}, {...}]} (ou directement une liste de lectures)
+Les lectures sont validées comme pour l'import en masse (bulk_ingest.parse_reading), enregistrées
+par lots, et la réponse de chaque trame (score et recommandations) est renvoyée sur la même
+connexion, dans l'ordre des trames.
+
+Contre-pression: les trames reçues passent par une file bornée par connexion. Quand elle est
+pleine (client qui envoie plus vite que le serveur n'enregistre, ou qui ne lit pas ses réponses),
+la lecture de la socket est suspendue: le client est ralenti par TCP et la mémoire utilisée par
+connexion reste bornée (queue_size trames de max_frame_readings lectures).
+"""
+import asyncio
+import json
+from bulk_ingest import REQUIRED_COLUMNS, parse_reading
+from fast_json import dumps
+
+READING_FIELDS = REQUIRED_COLUMNS + ('germination_score', 'timestamp')
+
+
+class StreamIngestor:
+    """Sessions d'ingestion WebSocket et leurs compteurs"""
+
+    def __init__(self, process_readings, queue_size=64, max_frame_readings=500):
+        """
+        Args:
+            process_readings: Coroutine recevant une liste de tuples de parse_reading, qui les
+                              enregistre et retourne un résultat par lecture, dans le même ordre
+            queue_size: Trames en attente maximum par connexion
+            max_frame_readings: Lectures maximum par trame, et par appel à process_readings
+        """
+        self.process_readings = process_readings
+        self.queue_size = queue_size
+        self.max_frame_readings = max_frame_readings
+        self.connections = 0
+        self.active = 0
+        self.frames = 0
+        self.readings = 0
+        self.rejected = 0
+        self.errors = 0
+        self.backpressure_waits = 0
+        self.last_error = None
+
+    def _parse(self, data):
+        """Trame -> {'id', 'batch', 'records': [tuple | None], 'errors': [str | None]} ou {'id', 'error'}"""
+        try:
+            payload = json.loads(data)
+        except ValueError as e:
+            return {'id': None, 'error': f"JSON invalide: {e}"}
+        frame_id = payload.get('id') if isinstance(payload, dict) else None
+        if isinstance(payload, list) or (isinstance(payload, dict) and 'readings' in payload):
+            batch, readings = True, payload if isinstance(payload, list) else payload['readings']
+            if not isinstance(readings, list):
+                return {'id': frame_id, 'error': "readings doit etre une liste"}
+        elif isinstance(payload, dict):
+            batch, readings = False, [{key: value for key, value in payload.items() if key != 'id'}]
+        else:
+            return {'id': frame_id, 'error': "Trame attendue: une lecture, une liste ou {\"readings\": [...]}"}
+        if len(readings) > self.max_frame_readings:
+            return {'id': frame_id, 'error': f"Trop de lectures dans la trame (max {self.max_frame_readings})"}
+
+        records, errors = [], []
+        for reading in readings:
+            try:
+                if not isinstance(reading, dict):
+                    raise ValueError("lecture attendue sous forme d'objet JSON")
+                unknown = sorted(set(reading) - set(READING_FIELDS))
+                if unknown:
+                    raise ValueError(f"champ(s) inconnu(s): {', '.join(unknown)}")
+                records.append(parse_reading(*(reading.get(field) for field in READING_FIELDS)))
+                errors.append(None)
+            except ValueError as e:
+                records.append(None)
+                errors.append(str(e))
+        return {'id': frame_id, 'batch': batch, 'records': records, 'errors': errors}
+
+    async def handle(self, websocket):
+        """Session d'une connexion: lecture des trames (ici) et traitement (tâche dédiée)"""
+        await websocket.accept()
+        self.connections += 1
+        self.active += 1
+        queue = asyncio.Queue(self.queue_size)
+        processor = asyncio.ensure_future(self._process(websocket, queue))
+        try:
+            while True:
+                message = await websocket.receive()
+                if message['type'] == 'websocket.disconnect':
+                    break
+                data = message.get('text')
+                if data is None:
+                    data = message.get('bytes') or b''
+                frame = self._parse(data)
+                if queue.full():
+                    self.backpressure_waits += 1
+                # Attend une place dans la file: la socket n'est plus lue pendant ce temps
+                await queue.put(frame)
+        finally:
+            # Les trames déjà reçues sont enregistrées même si le client est parti
+            await queue.put(None)
+            await processor
+            self.active -= 1
+
+    async def _process(self, websocket, queue):
+        connected = True
+        stop = False
+        # Trame retirée de la file mais qui ne tenait pas dans le lot précédent
+        pending = None
+        while not stop or pending is not None:
+            if pending is not None:
+                frame, pending = pending, None
+            else:
+                frame = await queue.get()
+                if frame is None:
+                    return
+            # Regroupe les trames déjà en file tant que le lot reste d'au plus max_frame_readings lectures
+            frames = [frame]
+            count = len(frame.get('records', ()))
+            while not stop and count < self.max_frame_readings and not queue.empty():
+                frame = queue.get_nowait()
+                if frame is None:
+                    stop = True
+                    break
+                size = len(frame.get('records', ()))
+                if count + size > self.max_frame_readings:
+                    pending = frame
+                    break
+                frames.append(frame)
+                count += size
+
+            valid = [record for frame in frames for record in frame.get('records', ()) if record is not None]
+            results, failure = [], None
+            if valid:
+                try:
+                    results = await self.process_readings(valid)
+                except Exception as e:
+                    failure = str(e)
+                    self.errors += 1
+                    self.last_error = failure
+            self.frames += len(frames)
+            self.readings += 0 if failure else len(valid)
+
+            results = iter(results)
+            for frame in frames:
+                message = self._response(frame, results, failure)
+                if connected:
+                    try:
+                        await websocket.send_text(dumps(message).decode('utf-8'))
+                    except Exception:
+                        # Client déconnecté: les trames restantes sont enregistrées sans réponse
+                        connected = False
+
+    def _response(self, frame, results, failure):
+        if 'error' in frame:
+            self.rejected += 1
+            return {'id': frame['id'], 'error': frame['error']}
+        items = []
+        for record, error in zip(frame['records'], frame['errors']):
+            if error is not None:
+                self.rejected += 1
+                items.append({'error': error})
+            elif failure is not None:
+                items.append({'error': failure})
+            else:
+                items.append(next(results))
+        if not frame['batch']:
+            return dict(items[0], id=frame['id'])
+        accepted = sum(1 for item in items if 'error' not in item)
+        return {'id': frame['id'], 'count': accepted, 'rejected': len(items) - accepted, 'results': items}
+
+    def stats(self):
+        return {
+            'queue_size': self.queue_size,
+            'max_frame_readings': self.max_frame_readings,
+            'connections': self.connections,
+            'active': self.active,
+            'frames': self.frames,
+            'readings': self.readings,
+            'rejected': self.rejected,
+            'errors': self.errors,
+            'backpressure_waits': self.backpressure_waits,
+            'last_error': self.last_error
+        }
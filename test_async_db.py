@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""Tests de l'accès asynchrone et du commit groupé (pytest)"""
+import asyncio
+import sqlite3
+import threading
+import pytest
+from async_db import AsyncGerminationDatabase
+from database import GerminationDatabase
+
+READING = ('mais', 25, 70, 60, 50, None, None)
+
+
+class SlowDatabase(GerminationDatabase):
+    """Première écriture retenue jusqu'à release: les appels suivants s'accumulent en groupe"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.release = threading.Event()
+        self.calls = []
+
+    def add_sensor_data_batch(self, records):
+        if not self.calls:
+            self.release.wait(5)
+        self.calls.append(len(records))
+        return super().add_sensor_data_batch(records)
+
+
+def test_echec_du_groupe_isole_par_appelant(tmp_path):
+    db = SlowDatabase(str(tmp_path / 'test.db'))
+    adb = AsyncGerminationDatabase(db)
+
+    async def scenario():
+        first = asyncio.ensure_future(adb.add_sensor_data_batch([READING]))
+        await asyncio.sleep(0.05)
+        grouped = [asyncio.ensure_future(adb.add_sensor_data_batch(records))
+                   for records in ([READING] * 2, [(None,) + READING[1:]], [READING] * 3)]
+        await asyncio.sleep(0.05)
+        db.release.set()
+        return await asyncio.gather(first, *grouped, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    adb.close()
+    assert results[:2] == [1, 2] and results[3] == 3
+    assert isinstance(results[2], sqlite3.IntegrityError)
+    # Groupe de 6 lectures annulé, puis chaque lot réécrit seul
+    assert db.calls == [1, 6, 2, 1, 3]
+    assert len(db.get_sensor_data()) == 6
+    assert adb.stats()['group_retries'] == 3
+
+
+def test_import_en_masse_sans_fusion(tmp_path):
+    db = SlowDatabase(str(tmp_path / 'test.db'))
+    adb = AsyncGerminationDatabase(db)
+
+    async def scenario():
+        writes = [asyncio.ensure_future(adb.add_sensor_data_batch([READING] * 4, group=False)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        db.release.set()
+        return await asyncio.gather(*writes)
+
+    assert asyncio.run(scenario()) == [4, 4, 4]
+    adb.close()
+    # Une transaction par paquet, de la taille demandée
+    assert db.calls == [4, 4, 4]
+    with pytest.raises(sqlite3.IntegrityError):
+        asyncio.run(adb.add_sensor_data_batch([(None,) + READING[1:]], group=False))
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""Tests du regroupement des requêtes /predict (pytest)"""
+import asyncio
+from batching import MicroBatcher
+
+
+def test_requetes_simultanees_regroupees():
+    calls = []
+
+    async def process(items):
+        calls.append(list(items))
+        return [item * 10 for item in items]
+
+    async def scenario():
+        batcher = MicroBatcher(process, max_batch_size=4, window_ms=50)
+        # 4 éléments: lot plein traité sans attendre la fenêtre, puis 2 éléments à l'expiration
+        results = await asyncio.wait_for(asyncio.gather(*(batcher.submit(i) for i in range(6))), 1)
+        return results, batcher.stats()
+
+    results, stats = asyncio.run(scenario())
+    assert results == [0, 10, 20, 30, 40, 50]
+    assert calls == [[0, 1, 2, 3], [4, 5]]
+    assert (stats['batches'], stats['full_batches'], stats['average_batch']) == (2, 1, 3)
+
+
+def test_erreur_transmise_a_chaque_requete():
+    async def process(items):
+        raise ValueError('modele indisponible')
+
+    async def scenario():
+        batcher = MicroBatcher(process, window_ms=1)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+        return results, batcher.stats()
+
+    results, stats = asyncio.run(scenario())
+    # Un seul lot en échec: la même exception est transmise à chaque requête en attente
+    assert isinstance(results[0], ValueError)
+    assert str(results[0]) == 'modele indisponible'
+    assert all(result is results[0] for result in results)
+    assert (stats['batches'], stats['errors']) == (1, 1)
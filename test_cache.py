@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""Tests du cache des résultats de /predict et /recommendations (pytest)"""
+from cache import PredictionCache
+from recommendation_engine import default_table
+
+
+def test_lru_et_invalidation_au_changement_de_modele():
+    cache = PredictionCache(maxsize=2)
+    a, b, c = (cache.make_key('mais', t, 70, 60, 50) for t in (20, 21, 22))
+    cache.put(a, 'a', 'v1')
+    cache.put(b, 'b', 'v1')
+    assert cache.get(a, 'v1') == 'a'
+    cache.put(c, 'c', 'v1')
+    # b, le moins récemment utilisé, est évincé
+    assert (cache.get(b, 'v1'), cache.get(c, 'v1')) == (None, 'c')
+
+    # Nouvelle version du modèle: aucune entrée de l'ancienne n'est servie
+    assert cache.get(a, 'v2') is None
+    assert cache.get(c, 'v2') is None
+    stats = cache.stats()
+    assert (stats['size'], stats['evictions'], stats['invalidations'], stats['model_version']) == (0, 1, 1, 'v2')
+    assert PredictionCache(maxsize=0).get(a, 'v1') is None
+
+
+def test_quantification_sans_texte_de_la_premiere_lecture():
+    cache = PredictionCache(quantum=5)
+    premiere = ('mais', 25, 70, 60, 21.0)
+    seconde = ('mais', 24, 71, 61, 22.0)
+    key = cache.make_key(*premiere)
+    assert cache.make_key(*seconde) == key
+
+    # Comme /recommendations: l'évaluation est en cache, les messages sont construits après lecture
+    cache.put(key, default_table.assess(*premiere))
+    assessment = cache.get(cache.make_key(*seconde))
+    messages = default_table.render_assessment('mais', assessment, seconde[-1])
+    assert messages == default_table.recommend(*seconde)
+    assert any('(22.0%)' in message for message in messages)
+    assert not any('21.0' in message for message in messages)
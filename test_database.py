@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""Tests des migrations de schéma et des plans de requêtes de GerminationDatabase (pytest)"""
+import sqlite3
+from datetime import datetime, timezone
+from archive import Archiver
+from database import GerminationDatabase, MIGRATIONS, _history_query, _rollup_query, encode_cursor
+
+
+def query_plan(db, sql, params=()):
+    rows = db._connection().execute(f'EXPLAIN QUERY PLAN {sql}', params).fetchall()
+    return ' | '.join(row[3] for row in rows)
+
+
+def test_nouvelle_base_a_la_derniere_version(tmp_path):
+    db = GerminationDatabase(str(tmp_path / 'test.db'))
+    assert db.schema_version() == MIGRATIONS[-1][0]
+    assert db.migrate() == []
+
+
+def test_migration_d_une_base_existante(tmp_path):
+    # Base créée par une version antérieure: tables sans index ni model_version
+    path = str(tmp_path / 'ancienne.db')
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE sensor_data (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, seed_type TEXT NOT NULL, temperature REAL NOT NULL,
+            soil_humidity REAL NOT NULL, air_humidity REAL NOT NULL, light_level REAL NOT NULL,
+            germination_score REAL, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP)
+    ''')
+    conn.execute('''
+        CREATE TABLE predictions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, seed_type TEXT NOT NULL, temperature REAL NOT NULL,
+            soil_humidity REAL NOT NULL, air_humidity REAL NOT NULL, light_level REAL NOT NULL,
+            predicted_score REAL NOT NULL, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP)
+    ''')
+    conn.execute("INSERT INTO predictions (seed_type, temperature, soil_humidity, air_humidity, light_level, "
+                 "predicted_score) VALUES ('mais', 25, 70, 60, 55, 87.1)")
+    conn.commit()
+    conn.close()
+
+    db = GerminationDatabase(path)
+    assert db.schema_version() == MIGRATIONS[-1][0]
+    predictions = db.get_predictions()
+    assert len(predictions) == 1
+    assert predictions[0]['model_version'] is None
+    indexes = {row[0] for row in db._connection().execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert 'idx_predictions_timestamp' in indexes
+    # Créé par la migration 2, supprimé par la migration 5 (remplacé par seed_stats)
+    assert 'idx_predictions_seed_type_score' not in indexes
+    # Agrégats reconstruits depuis l'historique existant
+    assert db.get_stats_by_seed_type('mais')['count'] == 1
+    assert db.get_stats_by_seed_type('mais')['avg_score'] == 87.1
+
+
+def test_historique_utilise_l_index_timestamp(tmp_path):
+    db = GerminationDatabase(str(tmp_path / 'test.db'))
+    for table in ('sensor_data', 'predictions'):
+        plan = query_plan(db, f'SELECT * FROM {table} ORDER BY timestamp DESC, id DESC LIMIT ?', (100,))
+        assert f'idx_{table}_timestamp' in plan
+        assert 'TEMP B-TREE' not in plan
+
+
+def test_statistiques_lues_dans_seed_stats(tmp_path):
+    db = GerminationDatabase(str(tmp_path / 'test.db'))
+    plan = query_plan(db, 'SELECT * FROM seed_stats WHERE seed_type = ?', ('mais',))
+    assert 'sqlite_autoindex_seed_stats_1' in plan
+    # Aucun index (seed_type, predicted_score) à tenir à jour à chaque insertion
+    indexes = {row[0] for row in db._connection().execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert 'idx_predictions_seed_type_score' not in indexes
+
+
+def test_statistiques_maintenues_a_l_insertion(tmp_path):
+    db = GerminationDatabase(str(tmp_path / 'test.db'))
+    scores = [80.0, 90.0, 70.0, 85.5]
+    db.add_prediction('mais', 25, 70, 60, 55, scores[0], out_of_range=True)
+    db.add_predictions_batch([('mais', 25, 70, 60, 55, score, 'v1', False) for score in scores[1:]])
+    db.add_prediction('riz', 25, 80, 70, 50, 60.0)
+
+    stats = db.get_stats_by_seed_type('mais')
+    mean = sum(scores) / len(scores)
+    variance = sum((score - mean) ** 2 for score in scores) / len(scores)
+    assert stats['count'] == 4
+    assert stats['avg_score'] == round(mean, 2)
+    assert (stats['min_score'], stats['max_score']) == (70.0, 90.0)
+    assert stats['variance'] == round(variance, 2)
+    assert stats['out_of_range_ratio'] == 0.25
+    assert db.get_stats_by_seed_type('ble')['count'] == 0
+    assert 'SEARCH seed_stats' in query_plan(db, 'SELECT * FROM seed_stats WHERE seed_type = ?', ('mais',))
+    assert db.check_seed_stats() == []
+
+
+def test_verification_et_reconstruction_des_statistiques(tmp_path):
+    db = GerminationDatabase(str(tmp_path / 'test.db'))
+    db.add_predictions_batch([('mais', 25, 70, 60, 55, float(i), None, i % 3 == 0) for i in range(30)])
+    conn = db._connection()
+    with conn:
+        conn.execute("UPDATE seed_stats SET count = count + 1, max_score = 100 WHERE seed_type = 'mais'")
+    assert {diff['column'] for diff in db.check_seed_stats()} == {'count', 'max_score'}
+    db.rebuild_seed_stats()
+    assert db.check_seed_stats() == []
+    assert db.get_stats_by_seed_type('mais')['out_of_range_ratio'] == 0.3333
+
+
+def test_pagination_par_curseur(tmp_path):
+    db = GerminationDatabase(str(tmp_path / 'test.db'))
+    db.add_predictions_batch([('mais' if i % 2 else 'riz', 20, 70, 60, 55, float(i), None, False) for i in range(25)])
+    ids, cursor = [], None
+    while True:
+        page, cursor = db.get_history_page('predictions', limit=10, cursor=cursor)
+        ids += [row['id'] for row in page]
+        if cursor is None:
+            break
+    assert ids == list(range(25, 0, -1))
+    assert [row['id'] for row in db.iter_history('predictions', seed_type='riz', chunk_size=4)] == list(range(25, 0, -2))
+
+
+def test_pagination_utilise_les_index(tmp_path):
+    db = GerminationDatabase(str(tmp_path / 'test.db'))
+    cursor = encode_cursor({'timestamp': '2026-01-01 00:00:00', 'id': 1})
+    for kwargs, index in (({'cursor': cursor}, 'idx_predictions_timestamp'),
+                          ({'seed_type': 'mais', 'start': '2026-01-01 00:00:00'}, 'idx_predictions_seed_type_timestamp')):
+        sql, params = _history_query('predictions', **kwargs)
+        plan = query_plan(db, f'{sql} LIMIT 100', params)
+        assert index in plan
+        assert 'TEMP B-TREE' not in plan
+
+
+def test_agregats_horaires_et_journaliers(tmp_path):
+    db = GerminationDatabase(str(tmp_path / 'test.db'))
+    conn = db._connection()
+    with conn:
+        # Une lecture toutes les 30 minutes sur une journée, score une fois sur deux
+        conn.executemany('''
+            INSERT INTO sensor_data (seed_type, temperature, soil_humidity, air_humidity, light_level,
+                                     germination_score, timestamp)
+            VALUES ('mais', ?, 70, 60, 50, ?, datetime('2026-01-01', ? || ' minutes'))
+        ''', [(20 + i % 5, None if i % 2 else float(i), f'+{i * 30}') for i in range(48)])
+
+    hours = db.get_rollups('sensor_data', 'hour', 'mais', start='2026-01-01 05:30:00', end='2026-01-01 08:00:00')
+    assert [row['bucket'] for row in hours] == ['2026-01-01 05:00:00', '2026-01-01 06:00:00', '2026-01-01 07:00:00']
+    assert (hours[0]['count'], hours[0]['temperature_mean'], hours[0]['score_count'], hours[0]['score_mean']) == (2, 20.5, 1, 10.0)
+
+    (day,) = db.get_rollups('sensor_data', 'day', 'mais')
+    assert (day['count'], day['temperature_min'], day['temperature_max']) == (48, 20.0, 24.0)
+    assert (day['score_count'], day['score_min'], day['score_max']) == (24, 0.0, 46.0)
+
+    before = [dict(row) for row in conn.execute('SELECT * FROM sensor_data_rollup_hour')]
+    db.rebuild_rollups()
+    assert [dict(row) for row in conn.execute('SELECT * FROM sensor_data_rollup_hour')] == before
+
+    sql, params = _rollup_query('predictions', 'hour', '2026-01-01 00:00:00', '2026-02-01 00:00:00')
+    plan = query_plan(db, sql, ['mais'] + params)
+    assert 'SEARCH predictions_rollup_hour USING PRIMARY KEY' in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+def test_insertion_par_lot_des_lectures(tmp_path):
+    db = GerminationDatabase(str(tmp_path / 'test.db'))
+    assert db.add_sensor_data_batch([
+        ('mais', 25, 70, 60, 55, 98.0, '2026-01-01 10:00:00'),
+        ('mais', 17, 55, 45, 50, None, None),
+    ]) == 2
+    rows = db.get_sensor_data()
+    assert [row['timestamp'] for row in rows][1] == '2026-01-01 10:00:00'
+    assert rows[0]['timestamp'] > '2026-01-01 10:00:00'
+    assert [row['id'] for row in db.get_labeled_sensor_data()] == [1]
+
+
+def test_archivage_par_mois(tmp_path):
+    db = GerminationDatabase(str(tmp_path / 'test.db'))
+    timestamps = [f'2026-{month:02d}-{day:02d} 12:00:00' for month in (1, 2, 3) for day in (1, 15)]
+    db.add_predictions_batch([('mais', 25, 70, 60, 55, float(i), None, False) for i in range(len(timestamps))])
+    conn = db._connection()
+    with conn:
+        conn.executemany('UPDATE predictions SET timestamp = ? WHERE id = ?',
+                         [(timestamp, i + 1) for i, timestamp in enumerate(timestamps)])
+    stats = db.get_stats_by_seed_type('mais')
+
+    archiver = Archiver(db, str(tmp_path / 'archives'), retention_days=30, batch_size=2, pause=0)
+    result = archiver.run_once(now=datetime(2026, 3, 20, tzinfo=timezone.utc))
+    assert result['cutoff'] == '2026-02-18 00:00:00'
+    assert result['moved'] == {'sensor_data': 0, 'predictions': 4}
+    assert [(a['month'], a['compressed']) for a in archiver.months()] == [('2026-01', True), ('2026-02', False)]
+    assert [row['timestamp'] for row in db.get_predictions()] == timestamps[:3:-1]
+
+    # Les agrégats couvrent tout l'historique, archives comprises
+    assert db.get_stats_by_seed_type('mais') == stats
+    with archiver.open_archives() as archive_paths:
+        assert db.check_seed_stats(archive_paths=archive_paths) == []
+        db.rebuild_seed_stats(archive_paths)
+    assert db.get_stats_by_seed_type('mais') == stats
+    with archiver.open_archive('2026-01') as path:
+        conn.execute('ATTACH DATABASE ? AS archive', (path,))
+        assert conn.execute('SELECT COUNT(*) FROM archive.predictions').fetchone()[0] == 2
+        conn.execute('DETACH DATABASE archive')
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""Tests du flux d'événements (pytest)"""
+import asyncio
+import json
+import pytest
+from events import EventBroker
+
+
+def parse(chunk):
+    """Octets SSE -> [(event, id, data)]"""
+    events = []
+    for block in chunk.decode('utf-8').strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((fields['event'], fields.get('id'), json.loads(fields['data'])))
+    return events
+
+
+def test_diffusion_filtree_par_type_de_graine():
+    async def scenario():
+        broker = EventBroker()
+        tous, riz = broker.subscribe(), broker.subscribe(['riz', 'tomate'])
+        broker.publish('predictions', [{'seed_type': 'mais', 'score': 0.9}, {'seed_type': 'riz', 'score': 0.4},
+                                       {'seed_type': 'mais', 'score': 0.8}])
+        recus_tous = parse(await tous.get_many())
+        recus_riz = parse(await riz.get_many())
+        # Un message par type de graine, sérialisé une fois: mêmes octets pour tous les abonnés
+        assert [(event, data['seed_type'], len(data['predictions'])) for event, _, data in recus_tous] == \
+            [('predictions', 'mais', 2), ('predictions', 'riz', 1)]
+        assert recus_riz == recus_tous[1:]
+        riz.close()
+        plein = EventBroker(max_subscribers=1)
+        plein.subscribe()
+        with pytest.raises(ValueError):
+            plein.subscribe()
+        return broker.stats()
+
+    stats = asyncio.run(scenario())
+    assert (stats['subscribers'], stats['published'], stats['delivered'], stats['dropped']) == (1, 2, 3, 0)
+
+
+def test_abonne_lent_perd_des_messages_sans_bloquer():
+    async def scenario():
+        broker = EventBroker(queue_size=2)
+        lent = broker.subscribe()
+        for i in range(5):
+            broker.publish('alerts', [{'seed_type': 'mais', 'n': i}])
+        # Les messages qui ne tiennent pas dans la file sont perdus, l'abonné en est averti
+        assert parse(await lent.get()) == [('lagged', None, {'dropped': 3})]
+        recus = parse(await lent.get_many())
+        assert [data['alerts'][0]['n'] for _, _, data in recus] == [0, 1]
+        return broker.stats()
+
+    stats = asyncio.run(scenario())
+    assert (stats['published'], stats['delivered'], stats['dropped']) == (5, 2, 3)
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""Tests de la sérialisation directe des réponses (pytest)"""
+import json
+from fastapi.encoders import jsonable_encoder
+import fast_json
+
+ROWS = [{'id': 2, 'seed_type': 'maïs', 'temperature': 25.5, 'germination_score': None,
+         'timestamp': '2026-01-01 10:00:00', 'out_of_range': 0},
+        {'id': 1, 'seed_type': 'riz', 'temperature': 1e-7, 'germination_score': 88.25,
+         'timestamp': '2026-01-01 09:00:00', 'out_of_range': 1}]
+
+
+def test_meme_json_que_jsonable_encoder(monkeypatch):
+    content = {'count': 2, 'predictions': ROWS, 'next_cursor': None}
+    expected = jsonable_encoder(content)
+    assert json.loads(fast_json.dumps(content)) == expected
+    assert fast_json.FastJSONResponse(content).headers['content-type'] == 'application/json'
+
+    # Sans orjson: json.dumps compact
+    monkeypatch.setattr(fast_json, 'orjson', None)
+    assert json.loads(fast_json.dumps(content)) == expected
+    assert 'maïs' in fast_json.dumps(content).decode('utf-8')
+
+
+def test_lignes_ndjson(monkeypatch):
+    for orjson in (fast_json.orjson, None):
+        monkeypatch.setattr(fast_json, 'orjson', orjson)
+        lines = fast_json.ndjson_lines(ROWS).decode('utf-8').splitlines()
+        assert [json.loads(line) for line in lines] == ROWS
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""Tests du moteur d'inférence compilé contre le chemin pandas/scikit-learn (pytest)"""
+import random
+import numpy as np
+import pytest
+from main import OPTIMAL_CONDITIONS, predict_score, train_germination_model
+from inference import CompiledModel
+
+
+@pytest.fixture(scope='module')
+def model():
+    return train_germination_model('sensors_data.csv')
+
+
+def lectures(n, seed):
+    rng = random.Random(seed)
+    seed_types = list(OPTIMAL_CONDITIONS) + ['inconnue', 'MAIS']
+    return [{
+        'seed_type': rng.choice(seed_types),
+        'temperature': rng.uniform(-10, 50),
+        'soil_humidity': rng.uniform(0, 100),
+        'air_humidity': rng.uniform(0, 100),
+        'light_level': rng.choice([0, 100, rng.uniform(0, 100)])
+    } for _ in range(n)]
+
+
+def test_prediction_unitaire_identique_au_chemin_pandas(model):
+    engine = CompiledModel.from_model(*model)
+    rows = lectures(300, seed=1)
+    assert {row['seed_type'] for row in rows} >= {'inconnue', 'MAIS'}
+    for row in rows:
+        # Identique bit à bit, graines inconnues comprises (aucune colonne One-Hot active)
+        assert engine.predict_one(**row) == float(predict_score(*model, row)[0]), row
+
+
+def test_prediction_par_lot_egale_au_chemin_pandas(model):
+    engine = CompiledModel.from_model(*model)
+    rows = lectures(500, seed=2)
+    expected = [float(predict_score(*model, row)[0]) for row in rows]
+    np.testing.assert_allclose(engine.predict_batch(rows), expected, rtol=0, atol=1e-9)
+    assert len(engine.predict_batch([])) == 0
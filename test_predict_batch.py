@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""Tests de POST /predict/batch contre POST /predict (pytest)"""
+import importlib
+import pytest
+from fastapi.testclient import TestClient
+
+READINGS = [
+    {'seed_type': 'mais', 'temperature': 25, 'soil_humidity': 70, 'air_humidity': 60, 'light_level': 50},
+    {'seed_type': 'mais', 'temperature': 40, 'soil_humidity': 30, 'air_humidity': 95, 'light_level': 5},
+    {'seed_type': 'riz', 'temperature': 28.5, 'soil_humidity': 85, 'air_humidity': 75, 'light_level': 90},
+    {'seed_type': 'inconnue', 'temperature': 22, 'soil_humidity': 60, 'air_humidity': 55, 'light_level': 40},
+]
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    # La configuration de l'API est lue à l'import: base et artefact dans un répertoire temporaire
+    monkeypatch.setenv('GERMINATION_DB_PATH', str(tmp_path / 'test.db'))
+    monkeypatch.setenv('MODEL_ARTIFACT_PATH', str(tmp_path / 'latest.json'))
+    for name in ('PREDICT_BATCH_WINDOW_MS', 'PREDICTION_WRITE_BEHIND', 'GERMINATION_WRITER_ADDRESS',
+                 'STORAGE_BACKEND', 'STORAGE_PATH'):
+        monkeypatch.delenv(name, raising=False)
+    import api
+    return importlib.reload(api)
+
+
+def test_lot_identique_aux_predictions_unitaires(api):
+    with TestClient(api.app) as client:
+        response = client.post('/predict/batch', json={'readings': READINGS})
+        assert response.status_code == 200
+        batch = response.json()
+        assert batch['count'] == len(READINGS) == len(batch['results'])
+
+        # Une ligne par lecture du lot, avec la version du modèle
+        predictions = api.db.get_predictions()
+        assert len(predictions) == len(READINGS)
+        assert {prediction['model_version'] for prediction in predictions} == {api.registry.current.version}
+        assert all(prediction['model_version'] for prediction in predictions)
+
+        for reading, result in zip(READINGS, batch['results']):
+            single = client.post('/predict', json=reading).json()
+            assert result['predicted_score'] == single['predicted_score'], reading
+            assert result['recommendations'] == single['recommendations'], reading
+            assert (result['seed_type'], result['model_version']) == (single['seed_type'], single['model_version'])
+        assert batch['results'][3]['recommendations'] == ["[ERREUR] Type de graine 'inconnue' non reconnu."]
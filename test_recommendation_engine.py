@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""Tests de la table de recommandations compilée contre la chaîne de règles d'origine (pytest)"""
+import itertools
+import recommendation_engine
+from main import OPTIMAL_CONDITIONS, get_recommendations, light_percent_to_hours
+from recommendation_engine import default_table
+
+
+def regles_d_origine(seed_type, temperature, soil_humidity, air_humidity, light_level):
+    """main.get_recommendations avant la compilation en table (référence)"""
+    if seed_type not in OPTIMAL_CONDITIONS:
+        return [f"[ERREUR] Type de graine '{seed_type}' non reconnu."]
+    light_hours = light_percent_to_hours(light_level)
+    conditions = OPTIMAL_CONDITIONS[seed_type]
+    recommendations = []
+
+    min_temp, max_temp = conditions['temperature']
+    if temperature < min_temp:
+        recommendations.append(f"[TEMPERATURE] Trop basse. Ideal: {min_temp}-{max_temp}C.")
+    elif temperature > max_temp:
+        recommendations.append(f"[TEMPERATURE] Trop elevee. Ideal: {min_temp}-{max_temp}C.")
+
+    min_hum, max_hum = conditions['soil_humidity']
+    if soil_humidity < min_hum:
+        recommendations.append(f"[HUMIDITE] Sol trop sec. Ideal: {min_hum}-{max_hum}%")
+    elif soil_humidity > max_hum:
+        recommendations.append(f"[HUMIDITE] Sol trop humide. Ideal: {min_hum}-{max_hum}%")
+
+    min_light, max_light = conditions['light_level']
+    if light_hours < min_light:
+        min_percent = int((min_light / 14) * 100)
+        max_percent = int((max_light / 14) * 100)
+        recommendations.append(f"[LUMIERE] Insuffisante ({light_level}%). Ideal: {min_percent}-{max_percent}%")
+    elif light_hours > max_light:
+        min_percent = int((min_light / 14) * 100)
+        max_percent = int((max_light / 14) * 100)
+        recommendations.append(f"[LUMIERE] Excessive ({light_level}%). Ideal: {min_percent}-{max_percent}%")
+
+    min_air, max_air = conditions['air_humidity']
+    if air_humidity < min_air:
+        recommendations.append(f"[HUMIDITE AIR] Trop basse. Ideal: {min_air}-{max_air}%")
+    elif air_humidity > max_air:
+        recommendations.append(f"[HUMIDITE AIR] Trop elevee. Ideal: {min_air}-{max_air}%")
+
+    if not recommendations:
+        recommendations.append(f"[OK] Conditions optimales pour le {seed_type}.")
+    return recommendations
+
+
+def valeurs(low, high, epsilon=1e-6):
+    """Bornes exactes, juste en dehors, juste en dedans et milieu de la plage"""
+    return [low - epsilon, low, low + epsilon, (low + high) / 2, high - epsilon, high, high + epsilon]
+
+
+def grille():
+    for seed_type, conditions in OPTIMAL_CONDITIONS.items():
+        # Lumière en % (entrée de l'API), bornes en heures: bornes converties, et valeurs entières
+        min_light, max_light = conditions['light_level']
+        lights = valeurs(min_light / 14 * 100, max_light / 14 * 100) + [0, 100, 50.0, int(min_light / 14 * 100)]
+        for values in itertools.product(valeurs(*conditions['temperature']), valeurs(*conditions['soil_humidity']),
+                                        valeurs(*conditions['air_humidity']), lights):
+            yield (seed_type,) + values
+    for seed_type in ('inconnue', 'MAIS', ''):
+        yield (seed_type, 25, 70, 60, 50)
+
+
+def test_table_compilee_identique_aux_regles_d_origine():
+    lectures = list(grille())
+    assert len(lectures) > 10000
+    for lecture in lectures:
+        attendu = regles_d_origine(*lecture)
+        assert default_table.recommend(*lecture) == attendu, lecture
+        assert default_table.out_of_range(*lecture) == (lecture[0] in OPTIMAL_CONDITIONS
+                                                         and not attendu[0].startswith('[OK]')), lecture
+
+
+def test_evaluation_par_lot_identique_aux_regles_d_origine():
+    lectures = list(grille())
+    rows = [dict(zip(('seed_type', 'temperature', 'soil_humidity', 'air_humidity', 'light_level'), lecture))
+            for lecture in lectures]
+    batch = default_table.evaluate(rows)
+    assert [list(messages) for messages in batch] == [regles_d_origine(*lecture) for lecture in lectures]
+    assert batch[7] == regles_d_origine(*lectures[7])
+
+
+def test_table_recompilee_apres_modification_des_conditions(monkeypatch):
+    lecture = ('mais', 32, 70, 60, 60)
+    assert get_recommendations(*lecture)[0].startswith('[TEMPERATURE] Trop elevee')
+
+    monkeypatch.setitem(OPTIMAL_CONDITIONS, 'mais', dict(OPTIMAL_CONDITIONS['mais'], temperature=(18, 35)))
+    try:
+        recommendation_engine.rebuild_default_table()
+        assert get_recommendations(*lecture) == regles_d_origine(*lecture) == ["[OK] Conditions optimales pour le mais."]
+    finally:
+        monkeypatch.undo()
+        recommendation_engine.rebuild_default_table()
+    assert get_recommendations(*lecture)[0].startswith('[TEMPERATURE] Trop elevee')
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""Tests du réentraînement et du rechargement du modèle entre workers (pytest)"""
+import random
+import numpy as np
+import pytest
+from database import GerminationDatabase
+from main import OPTIMAL_CONDITIONS, light_percent_to_hours, train_germination_model
+from model_store import build_artifact, compile_artifact, load_serving_model, write_artifact
+from incremental import LinearModel
+from retraining import ArtifactWatcher, ModelRegistry, Retrainer
+
+COLUMNS = ['temperature', 'soil_humidity', 'air_humidity', 'light_level', 'seed_type_mais']
+
+
+@pytest.fixture
+def retrainer(tmp_path):
+    db = GerminationDatabase(str(tmp_path / 'test.db'))
+    registry = ModelRegistry(*load_serving_model(str(tmp_path / 'absent.json'), 'sensors_data.csv'))
+    return Retrainer(registry, db, 'sensors_data.csv')
+
+
+def add_labeled(db, n, rng):
+    """Lectures étiquetées de l'API (light_level en %); retourne les lignes au format du CSV (heures)"""
+    rows = []
+    for _ in range(n):
+        row = {'seed_type': rng.choice(list(OPTIMAL_CONDITIONS)), 'temperature': rng.uniform(10, 35),
+               'soil_humidity': rng.uniform(40, 90), 'air_humidity': rng.uniform(40, 90),
+               'light_level': rng.uniform(20, 90), 'germination_score': rng.uniform(0, 100)}
+        db.add_sensor_data(**row)
+        rows.append(dict(row, light_level=light_percent_to_hours(row['light_level'])))
+    return rows
+
+
+def test_mise_a_jour_incrementale_egale_au_refit_complet(retrainer):
+    rng = random.Random(3)
+    labeled = add_labeled(retrainer.db, 30, rng)
+    assert retrainer.retrain_now()['status'] == 'updated'
+    labeled += add_labeled(retrainer.db, 30, rng)
+    result = retrainer.retrain_now()
+    assert (result['status'], result['new_labeled_rows'], result['labeled_rows']) == ('updated', 30, 60)
+
+    # Deux passages incrémentaux = un entraînement complet sur le CSV et les 60 lectures
+    model, columns = train_germination_model('sensors_data.csv', extra_rows=labeled)
+    info = retrainer.registry.current.info
+    assert info['columns'] == list(columns)
+    np.testing.assert_allclose(info['coef'], model.coef_, rtol=0, atol=1e-8)
+    assert info['intercept'] == pytest.approx(model.intercept_, abs=1e-8)
+
+
+def test_filigrane_et_aucun_remplacement_sans_changement(retrainer):
+    initial = retrainer.registry.current
+    # Même données que l'entraînement initial: mêmes coefficients, pas de remplacement
+    assert retrainer.retrain_now()['status'] == 'unchanged'
+    assert retrainer.registry.current is initial
+
+    rng = random.Random(4)
+    add_labeled(retrainer.db, 5, rng)
+    retrainer.db.add_sensor_data('mais', 25, 70, 60, 50)
+    assert retrainer.retrain_now()['new_labeled_rows'] == 5
+    last_id = max(row['id'] for row in retrainer.db.get_labeled_sensor_data())
+    assert retrainer.last_sensor_data_id == last_id
+    assert retrainer.registry.current.info['training_data']['last_sensor_data_id'] == last_id
+
+    # Seules les lectures au-delà du filigrane sont relues
+    updated = retrainer.registry.current
+    result = retrainer.retrain_now()
+    assert (result['status'], result['new_labeled_rows'], result['labeled_rows']) == ('unchanged', 0, 5)
+    assert retrainer.registry.current is updated
+    add_labeled(retrainer.db, 2, rng)
+    assert retrainer.retrain_now()['new_labeled_rows'] == 2
+
+
+def artifact(intercept, last_sensor_data_id=0):
+    return build_artifact(LinearModel([0.5, 0.1, 0.2, 1.0, 3.0], intercept), COLUMNS,
+                          training_data={'last_sensor_data_id': last_sensor_data_id})
+
+
+def test_rechargement_de_l_artefact_publie(tmp_path):
+    path = str(tmp_path / 'latest.json')
+    initial = artifact(10.0)
+    worker = ModelRegistry(compile_artifact(initial), initial)
+    watcher = ArtifactWatcher(worker, path)
+    assert not watcher.check()
+
+    # Un autre worker publie un modèle entraîné sur plus de lectures
+    write_artifact(artifact(12.0, last_sensor_data_id=50), path)
+    assert watcher.check()
+    assert worker.current.info['intercept'] == 12.0
+    assert not watcher.check()
+
+    # Publication concurrente d'un modèle plus ancien: ignorée
+    write_artifact(artifact(11.0, last_sensor_data_id=20), path)
+    assert not watcher.check()
+    assert worker.current.info['intercept'] == 12.0
+    assert watcher.stats()['reloads'] == 1
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""Tests de l'instantané binaire des données d'entraînement (pytest)"""
+import numpy as np
+from database import GerminationDatabase
+from incremental import SufficientStatistics
+from snapshot import TrainingSnapshot
+
+
+def test_instantane_equivalent_au_csv(tmp_path):
+    snapshot = TrainingSnapshot(str(tmp_path / 'snapshot'))
+    assert snapshot.sync('sensors_data.csv')['rebuilt']
+    assert not snapshot.sync('sensors_data.csv')['rebuilt']
+
+    reference = SufficientStatistics()
+    reference.add_csv('sensors_data.csv')
+    expected, expected_columns = reference.solve()
+    model, columns = TrainingSnapshot(snapshot.path).statistics(chunk_rows=10).solve()
+    assert columns == expected_columns
+    assert np.allclose(model.coef_, expected.coef_, atol=1e-4)
+    assert isinstance(snapshot.arrays()['temperature'], np.memmap)
+
+
+def test_ajout_des_lectures_etiquetees(tmp_path):
+    db = GerminationDatabase(str(tmp_path / 'test.db'))
+    snapshot = TrainingSnapshot(str(tmp_path / 'snapshot'))
+    snapshot.sync('sensors_data.csv', db)
+    rows = snapshot.rows
+
+    db.add_sensor_data_batch([('mais', 25, 70, 60, 50, 88, None), ('riz', 20, 60, 50, 40, None, None),
+                              ('nouvelle', 20, 60, 50, 100, 40, None)])
+    result = snapshot.sync('sensors_data.csv', db)
+    assert (result['new_labeled_rows'], result['last_sensor_data_id']) == (2, 3)
+    assert snapshot.sync('sensors_data.csv', db)['new_labeled_rows'] == 0
+
+    # Ajout interrompu: octets non validés par le manifeste, tronqués à l'ajout suivant
+    with open(tmp_path / 'snapshot' / 'temperature.bin', 'ab') as f:
+        f.write(b'\0' * 6)
+    reopened = TrainingSnapshot(snapshot.path)
+    reopened.append(['ble'], [[21, 65, 55, 7]], [70])
+    arrays = reopened.arrays()
+    assert reopened.rows == rows + 3
+    assert reopened.seed_types[arrays['seed_type'][-2]] == 'nouvelle'
+    assert arrays['light_level'][-2] == 14  # 100 % de luminosité -> 14 h
+    assert arrays['temperature'][-1] == 21
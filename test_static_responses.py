@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""Tests des réponses pré-sérialisées du catalogue (pytest)"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from static_responses import StaticResponseMiddleware, StaticResponses
+
+
+def make_client():
+    calls = []
+    app = FastAPI()
+    responses = StaticResponses(max_age=60)
+    app.add_middleware(StaticResponseMiddleware, responses=responses)
+
+    @app.get("/conditions")
+    def conditions():
+        calls.append(1)
+        return {"conditions": {"mais": {"temperature": (18, 30)}}, "nom": "maïs"}
+
+    responses.build({"/conditions": conditions()})
+    calls.clear()
+    return TestClient(app), responses, calls
+
+
+def test_reponse_identique_au_handler_sans_l_appeler():
+    client, responses, calls = make_client()
+    response = client.get("/conditions")
+    assert response.status_code == 200
+    assert response.json() == {"conditions": {"mais": {"temperature": [18, 30]}}, "nom": "maïs"}
+    assert response.headers["cache-control"] == "public, max-age=60"
+    assert response.headers["etag"] == responses.get("/conditions")[1]
+    assert calls == []
+
+
+def test_requete_conditionnelle():
+    client, responses, calls = make_client()
+    etag = client.get("/conditions").headers["etag"]
+    for if_none_match in (etag, f'"autre", W/{etag}', "*"):
+        response = client.get("/conditions", headers={"If-None-Match": if_none_match})
+        assert (response.status_code, response.content, response.headers["etag"]) == (304, b"", etag)
+    assert client.get("/conditions", headers={"If-None-Match": '"autre"'}).status_code == 200
+
+    # Catalogue modifié: nouvel ETag, l'ancien ne correspond plus
+    responses.build({"/conditions": {"conditions": {}}})
+    response = client.get("/conditions", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.headers["etag"] != etag
+    assert calls == []
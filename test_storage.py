@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Tests de conformité des backends de stockage: mêmes résultats que le backend SQLite (pytest)"""
+import random
+import pytest
+from columnar_log import ColumnarLogStorage
+from storage import STORAGE_BACKENDS, StorageBackend, create_storage
+
+SEED_TYPES = ['mais', 'riz', 'ble']
+
+
+def sample_readings(n=600):
+    rng = random.Random(7)
+    readings = []
+    for _ in range(n):
+        timestamp = (f'2026-{rng.randint(1, 3):02d}-{rng.randint(1, 28):02d} '
+                     f'{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}')
+        score = rng.choice([None, round(rng.uniform(0, 100), 1)])
+        readings.append((rng.choice(SEED_TYPES), round(rng.uniform(10, 35), 1), round(rng.uniform(40, 90), 1),
+                         round(rng.uniform(40, 90), 1), round(rng.uniform(20, 90), 1), score, timestamp))
+    return readings
+
+
+def sample_predictions(n=200):
+    rng = random.Random(11)
+    return [(rng.choice(SEED_TYPES), 25.0, 70.0, 60.0, 55.0, round(rng.uniform(0, 100), 2),
+             rng.choice([None, 'v1']), rng.random() < 0.25) for _ in range(n)]
+
+
+def filled(backend, tmp_path):
+    storage = create_storage(backend, str(tmp_path / f'{backend}-store'))
+    readings = sample_readings()
+    # Lots arrivés dans le désordre chronologique
+    for i in range(0, len(readings), 150):
+        storage.add_sensor_data_batch(readings[i:i + 150])
+    storage.add_predictions_batch(sample_predictions())
+    return storage
+
+
+def all_pages(storage, table, **filters):
+    rows, cursor = storage.get_history_page(table, 70, **filters)
+    while cursor is not None:
+        page, cursor = storage.get_history_page(table, 70, cursor, **filters)
+        rows += page
+    return rows
+
+
+def without_timestamps(rows):
+    # Les prédictions sont horodatées à l'insertion: seul l'ordre des ids est comparable
+    return [{k: v for k, v in row.items() if k != 'timestamp'} for row in rows]
+
+
+@pytest.mark.parametrize('backend', ['memory', 'columnar'])
+def test_memes_resultats_que_sqlite(backend, tmp_path):
+    reference, storage = filled('sqlite', tmp_path), filled(backend, tmp_path)
+
+    for filters in ({}, {'seed_type': 'riz'}, {'start': '2026-02-01 00:00:00', 'end': '2026-03-01 00:00:00'}):
+        assert all_pages(storage, 'sensor_data', **filters) == all_pages(reference, 'sensor_data', **filters)
+    assert without_timestamps(storage.get_predictions(50)) == without_timestamps(reference.get_predictions(50))
+    assert list(storage.iter_history('sensor_data', seed_type='ble', limit=120)) == \
+        list(reference.iter_history('sensor_data', seed_type='ble', limit=120))
+    assert storage.get_labeled_sensor_data(after_id=100) == reference.get_labeled_sensor_data(after_id=100)
+
+    for seed_type in SEED_TYPES + ['inconnue']:
+        assert storage.get_stats_by_seed_type(seed_type) == reference.get_stats_by_seed_type(seed_type)
+
+    for resolution in ('hour', 'day'):
+        expected = reference.get_rollups('sensor_data', resolution, 'mais', '2026-01-10 12:30:00', '2026-03-01 00:00:00')
+        actual = storage.get_rollups('sensor_data', resolution, 'mais', '2026-01-10 12:30:00', '2026-03-01 00:00:00')
+        assert [row['bucket'] for row in actual] == [row['bucket'] for row in expected]
+        for got, wanted in zip(actual, expected):
+            for key, value in wanted.items():
+                # ROUND(x, 2) de SQLite et l'arrondi Python peuvent différer d'un centième sur un cas limite
+                assert got[key] == pytest.approx(value, abs=0.011) if isinstance(value, float) else got[key] == value
+
+
+def test_journal_en_colonnes_relu_a_l_ouverture(tmp_path):
+    storage = filled('columnar', tmp_path)
+    expected = all_pages(storage, 'sensor_data')
+    stats = storage.get_stats_by_seed_type('mais')
+    storage.close()
+
+    # Écriture interrompue: une colonne a reçu une ligne de plus que les autres
+    with open(tmp_path / 'columnar-store' / 'sensor_data.temperature.bin', 'ab') as f:
+        f.write(b'\0' * 8)
+    reopened = ColumnarLogStorage(str(tmp_path / 'columnar-store'))
+    assert all_pages(reopened, 'sensor_data') == expected
+    assert reopened.get_stats_by_seed_type('mais') == stats
+    assert reopened.add_sensor_data('mais', 25, 70, 60, 55) == len(expected) + 1
+
+
+def test_backend_inconnu():
+    assert set(STORAGE_BACKENDS) == {'sqlite', 'memory', 'columnar'}
+    with pytest.raises(ValueError):
+        create_storage('postgres')
+
+
+def test_backend_incomplet_refuse_a_l_instanciation():
+    class SansLectures(StorageBackend):
+        def add_sensor_data(self, *args): return 1
+        def add_sensor_data_batch(self, records): return len(records)
+        def add_prediction(self, *args): return 1
+        def add_predictions_batch(self, records): return len(records)
+
+    with pytest.raises(TypeError, match='get_history_page'):
+        SansLectures()
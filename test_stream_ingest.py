@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Tests de l'ingestion WebSocket (pytest)"""
+import asyncio
+from fastapi import FastAPI, WebSocket
+from fastapi.testclient import TestClient
+from stream_ingest import StreamIngestor
+
+READING = {'seed_type': 'mais', 'temperature': 25, 'soil_humidity': 70, 'air_humidity': 60, 'light_level': 50}
+
+
+def make_client(delay=0.0, **kwargs):
+    calls = []
+
+    async def process(records):
+        calls.append(len(records))
+        await asyncio.sleep(delay)
+        return [{'seed_type': record[0], 'temperature': record[1]} for record in records]
+
+    ingestor = StreamIngestor(process, **kwargs)
+    app = FastAPI()
+
+    @app.websocket("/ws/ingest")
+    async def ws_ingest(websocket: WebSocket):
+        await ingestor.handle(websocket)
+
+    return TestClient(app), ingestor, calls
+
+
+def test_trames_unitaires_et_lots():
+    client, ingestor, calls = make_client()
+    with client.websocket_connect('/ws/ingest') as ws:
+        ws.send_json(dict(READING, id=7))
+        assert ws.receive_json() == {'seed_type': 'mais', 'temperature': 25.0, 'id': 7}
+        ws.send_json({'id': 'lot', 'readings': [READING, dict(READING, temperature=80), {'seed_type': 'riz'}]})
+        response = ws.receive_json()
+        assert (response['id'], response['count'], response['rejected']) == ('lot', 1, 2)
+        assert response['results'][1]['error'] == "temperature=80.0 hors de l'intervalle [-10, 50]"
+        assert response['results'][2]['error'] == 'temperature manquant'
+        ws.send_text('{')
+        assert ws.receive_json()['error'].startswith('JSON invalide')
+    assert (ingestor.frames, ingestor.readings, ingestor.rejected, ingestor.active) == (3, 2, 3, 0)
+
+
+def test_contre_pression_file_bornee():
+    client, ingestor, calls = make_client(delay=0.01, queue_size=2, max_frame_readings=4)
+    with client.websocket_connect('/ws/ingest') as ws:
+        for i in range(30):
+            ws.send_json(dict(READING, id=i))
+        assert [ws.receive_json()['id'] for _ in range(30)] == list(range(30))
+    # Lecteur de la socket suspendu quand la file est pleine; lots regroupés d'au plus 4 lectures
+    assert ingestor.backpressure_waits > 0
+    assert sum(calls) == 30 and max(calls) <= 4 and len(calls) < 30
+
+
+def test_lots_bornes_par_max_frame_readings():
+    client, ingestor, calls = make_client(delay=0.01, queue_size=8, max_frame_readings=5)
+    sizes = [3, 2, 4, 1, 5, 3, 3, 2, 1, 4] * 3
+    with client.websocket_connect('/ws/ingest') as ws:
+        for i, size in enumerate(sizes):
+            ws.send_json({'id': i, 'readings': [READING] * size})
+        responses = [ws.receive_json() for _ in sizes]
+    assert [(response['id'], response['count']) for response in responses] == list(enumerate(sizes))
+    # Une trame qui ne tient pas dans le lot en cours commence le suivant
+    assert sum(calls) == sum(sizes) and max(calls) <= 5 and len(calls) < len(sizes)
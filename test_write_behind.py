@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""Tests de la file d'écriture différée (pytest)"""
+from write_behind import WriteBehindQueue
+
+
+def test_lot_en_echec_retente_puis_compte_comme_perdu():
+    calls = []
+
+    def write_batch(batch):
+        calls.append(list(batch))
+        raise RuntimeError('base verrouillee')
+
+    wbq = WriteBehindQueue(write_batch, retries=2, retry_delay=0.001)
+    assert wbq.submit_many([]) == 0
+    wbq.offer_many([1, 2, 3])
+    wbq.stop()
+    # Une tentative puis deux nouvelles, avec le même lot
+    assert calls == [[1, 2, 3]] * 3
+    stats = wbq.stats()
+    assert (stats['errors'], stats['retried'], stats['lost'], stats['written']) == (3, 2, 3, 0)
+    assert stats['last_error'] == 'base verrouillee'
+
+
+def test_debordement_rendu_a_l_appelant_et_file_videe_a_l_arret():
+    written = []
+    wbq = WriteBehindQueue(written.append, max_size=4, batch_size=3)
+    # File pleine: le surplus est rendu, rien n'est perdu ni écrit par offer_many
+    assert wbq.offer_many([1, 2, 3, 4, 5, 6]) == [5, 6]
+    assert written == []
+    # submit_many écrit lui-même le surplus, en un seul lot
+    assert wbq.submit_many([7, 8]) == 0
+    assert written == [[7, 8]]
+    assert wbq.stats()['sync_writes'] == 4
+
+    # Thread jamais démarré: stop() écrit tout ce qui est en file avant de rendre la main
+    wbq.stop()
+    assert written == [[7, 8], [1, 2, 3], [4]]
+    stats = wbq.stats()
+    assert (stats['queue_depth'], stats['written'], stats['lost'], stats['max_depth']) == (0, 6, 0, 4)
+
+    # Avec le thread d'écriture démarré
+    written.clear()
+    wbq.start()
+    wbq.offer_many([9, 10])
+    wbq.stop()
+    assert sorted(record for batch in written for record in batch) == [9, 10]
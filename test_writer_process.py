@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""Tests du processus d'écriture du mode multi-workers (pytest)"""
+import threading
+import pytest
+from database import GerminationDatabase
+from writer_process import SharedWriterStorage, WriterClient, _apply, serve
+
+
+@pytest.fixture
+def writer(tmp_path):
+    address, authkey = str(tmp_path / 'writer.sock'), b'cle-de-test'
+    db_path = str(tmp_path / 'test.db')
+    GerminationDatabase(db_path).close()
+    stop_event = threading.Event()
+    thread = threading.Thread(target=serve, args=(address, authkey, db_path),
+                              kwargs={'stop_event': stop_event, 'archive': False})
+    thread.start()
+    yield address, authkey, db_path
+    stop_event.set()
+    thread.join(5)
+
+
+def test_ecritures_via_le_processus_d_ecriture(writer):
+    address, authkey, db_path = writer
+    storage = SharedWriterStorage(GerminationDatabase(db_path), WriterClient(address, authkey))
+    sensor_id = storage.add_sensor_data('mais', 25, 70, 60, 50, 88)
+    assert storage.add_sensor_data_batch([('riz', 20, 60, 50, 40, None, None)]) == 1
+    prediction_id = storage.add_prediction('mais', 25, 70, 60, 50, 88.0, 'v1')
+    assert [row['id'] for row in storage.get_sensor_data()] == [sensor_id + 1, sensor_id]
+    assert storage.get_predictions()[0]['id'] == prediction_id
+
+    # Les erreurs de la base remontent dans le worker
+    with pytest.raises(TypeError):
+        storage.add_sensor_data('mais')
+    storage.close()
+
+
+def test_lots_fusionnes_en_une_transaction(tmp_path):
+    db = GerminationDatabase(str(tmp_path / 'test.db'))
+    replies = []
+
+    class Connection:
+        def send(self, message):
+            replies.append(message)
+
+    calls = []
+    original = db.add_sensor_data_batch
+    db.add_sensor_data_batch = lambda records: calls.append(len(records)) or original(records)
+    _apply(db, [(Connection(), ('add_sensor_data_batch', ([('mais', 25, 70, 60, 50, None, None)] * n,), {}))
+                for n in (2, 3)])
+    assert calls == [5]
+    assert replies == [('ok', 2), ('ok', 3)]
+    assert len(db.get_sensor_data()) == 5
+
+    # Une lecture invalide n'annule que le lot de son worker
+    replies.clear()
+    _apply(db, [(Connection(), ('add_sensor_data_batch', (records,), {})) for records in (
+        [('mais', 25, 70, 60, 50, None, None)], [(None, 25, 70, 60, 50, None, None)])])
+    assert replies[0] == ('ok', 1) and replies[1][0] == 'error'
+    assert len(db.get_sensor_data()) == 6
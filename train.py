@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Entraîne le modèle de germination et écrit un artefact versionné.
+
+Usage:
+    python train.py [--data sensors_data.csv] [--output-dir models]
+    python train.py --snapshot training_snapshot    # instantané binaire (snapshot.py), sans analyse du CSV
+"""
+import argparse
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from main import train_germination_model
+from inference import NUMERIC_FEATURES, SEED_PREFIX
+from model_store import DEFAULT_MODEL_DIR, build_artifact, file_sha256, save_artifact
+from snapshot import TrainingSnapshot
+
+
+def evaluate_model(model, model_columns, data_path):
+    """Calcule les métriques du modèle sur ses données d'entraînement"""
+    df = pd.read_csv(data_path)
+    features = pd.get_dummies(
+        df[['seed_type', 'temperature', 'soil_humidity', 'air_humidity', 'light_level']],
+        columns=['seed_type']
+    ).reindex(columns=model_columns, fill_value=0)
+    target = df['germination_score']
+    predicted = model.predict(features)
+    return {
+        'n_samples': int(len(df)),
+        'r2': float(r2_score(target, predicted)),
+        'mae': float(mean_absolute_error(target, predicted)),
+        'rmse': float(mean_squared_error(target, predicted) ** 0.5)
+    }
+
+
+def evaluate_snapshot(model, model_columns, snapshot):
+    """Calcule les métriques du modèle sur les colonnes de l'instantané (memory mapping)"""
+    arrays = snapshot.arrays()
+    coef = dict(zip(model_columns, model.coef_))
+    # Contribution One-Hot de chaque code de type de graine (0 pour un type absent du modèle)
+    seed_coef = np.array([coef.get(SEED_PREFIX + seed, 0.0) for seed in snapshot.seed_types] or [0.0])
+    predicted = model.intercept_ + seed_coef[arrays['seed_type']]
+    for name in NUMERIC_FEATURES:
+        predicted = predicted + coef[name] * arrays[name].astype(np.float64)
+    target = np.asarray(arrays['germination_score'], dtype=np.float64)
+    return {
+        'n_samples': int(snapshot.rows),
+        'r2': float(r2_score(target, predicted)),
+        'mae': float(mean_absolute_error(target, predicted)),
+        'rmse': float(mean_squared_error(target, predicted) ** 0.5)
+    }
+
+
+def train_from_snapshot(args):
+    """Entraîne depuis l'instantané (réimporté si le CSV a changé) et retourne l'artefact"""
+    snapshot = TrainingSnapshot(args.snapshot)
+    result = snapshot.sync(args.data)
+    if result['rebuilt']:
+        print(f"[OK] Instantane {args.snapshot} reconstruit depuis {args.data}")
+    model, model_columns = snapshot.statistics().solve()
+    metrics = evaluate_snapshot(model, model_columns, snapshot)
+    return build_artifact(model, model_columns, training_data={
+        'path': args.data,
+        'sha256': snapshot.csv['sha256'],
+        'rows': metrics['n_samples'],
+        'snapshot': args.snapshot,
+        'labeled_rows': snapshot.labeled_rows,
+        'last_sensor_data_id': snapshot.last_sensor_data_id
+    }, metrics=metrics), metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entraîne le modèle et écrit un artefact versionné")
+    parser.add_argument('--data', default='sensors_data.csv', help="Fichier CSV d'entraînement")
+    parser.add_argument('--output-dir', default=DEFAULT_MODEL_DIR, help="Dossier des artefacts")
+    parser.add_argument('--snapshot', help="Répertoire d'un instantané binaire des données (snapshot.py)")
+    args = parser.parse_args()
+
+    if args.snapshot:
+        artifact, metrics = train_from_snapshot(args)
+    else:
+        model, model_columns = train_germination_model(args.data)
+        metrics = evaluate_model(model, model_columns, args.data)
+        artifact = build_artifact(model, model_columns, training_data={
+            'path': args.data,
+            'sha256': file_sha256(args.data),
+            'rows': metrics['n_samples']
+        }, metrics=metrics)
+    path = save_artifact(artifact, args.output_dir)
+
+    print(f"[OK] Artefact ecrit: {path}")
+    print(f"     Version: {artifact['model_version']}")
+    print(f"     R2: {metrics['r2']:.4f}  MAE: {metrics['mae']:.2f}  RMSE: {metrics['rmse']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+File d'écriture différée (write-behind) pour l'enregistrement des prédictions.
+
+Les requêtes déposent leurs enregistrements dans une file bornée en mémoire et
+répondent sans attendre SQLite. Un thread d'écriture vide la file par lots et
+écrit chaque lot avec executemany dans une seule transaction.
+
+Un lot dont l'écriture échoue est retenté (retries fois, délai croissant). S'il échoue
+encore, il est abandonné: ses enregistrements sont comptés dans `lost` (exposé par
+stats(), /metrics et /health). La file ne garantit donc pas l'absence de perte.
+"""
+import queue
+import threading
+import time
+
+
+class WriteBehindQueue:
+    """File bornée vidée par un thread d'écriture en arrière-plan"""
+
+    def __init__(self, write_batch, max_size=10000, batch_size=500, flush_interval=0.05,
+                 retries=3, retry_delay=0.1):
+        """
+        Args:
+            write_batch: Fonction écrivant une liste d'enregistrements en une transaction
+                         (par exemple GerminationDatabase.add_predictions_batch)
+            max_size: Taille maximale de la file; au-delà, les enregistrements sont écrits
+                      par l'appelant (submit_many) ou lui sont rendus (offer_many)
+            batch_size: Nombre maximal d'enregistrements par transaction
+            flush_interval: Délai maximal (s) entre l'arrivée d'un enregistrement et son écriture
+            retries: Nouvelles tentatives d'écriture d'un lot en échec avant de l'abandonner
+            retry_delay: Délai (s) avant la première nouvelle tentative, doublé à chaque essai
+        """
+        self.write_batch = write_batch
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self._queue = queue.Queue(maxsize=max_size)
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.sync_writes = 0
+        self.errors = 0
+        self.retried = 0
+        self.lost = 0
+        self.max_depth = 0
+        self.last_error = None
+
+    def offer_many(self, records):
+        """
+        Dépose les enregistrements sans jamais bloquer ni écrire. Retourne ceux qui n'ont pas
+        tenu dans la file, à écrire par l'appelant (en une transaction).
+        """
+        accepted = 0
+        for record in records:
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                break
+            accepted += 1
+        overflow = list(records[accepted:])
+        with self._lock:
+            self.enqueued += accepted
+            self.sync_writes += len(overflow)
+            depth = self._queue.qsize()
+            if depth > self.max_depth:
+                self.max_depth = depth
+        return overflow
+
+    def submit_many(self, records):
+        """Dépose les enregistrements; ceux qui ne tiennent pas dans la file sont écrits ici, en un lot"""
+        overflow = self.offer_many(records)
+        if overflow:
+            self._write(overflow)
+        return len(records) - len(overflow)
+
+    def submit(self, record):
+        """Dépose un enregistrement; écrit directement si la file est pleine"""
+        return self.submit_many([record]) == 1
+
+    def _write(self, batch):
+        """Écrit un lot, avec nouvelles tentatives; compte le lot comme perdu s'il échoue encore"""
+        for attempt in range(self.retries + 1):
+            try:
+                self.write_batch(batch)
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                    self.last_error = str(e)
+                if attempt < self.retries:
+                    with self._lock:
+                        self.retried += 1
+                    time.sleep(self.retry_delay * 2 ** attempt)
+                    continue
+                with self._lock:
+                    self.lost += len(batch)
+                print(f"[ERREUR] Ecriture differee de {len(batch)} enregistrements abandonnee "
+                      f"apres {self.retries + 1} tentatives: {e}")
+                return False
+            with self._lock:
+                self.written += len(batch)
+                self.batches += 1
+            return True
+
+    def _next_batch(self, timeout):
+        """Attend un premier enregistrement puis complète le lot jusqu'à batch_size ou flush_interval"""
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            batch = self._next_batch(self.flush_interval)
+            if batch:
+                self._write(batch)
+
+    def flush(self):
+        """Écrit immédiatement tout le contenu de la file (appelé à l'arrêt)"""
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            self._write(batch)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10):
+        """Arrête le thread d'écriture puis vide la file"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'max_depth': self.max_depth,
+                'max_size': self.max_size,
+                'batch_size': self.batch_size,
+                'flush_interval': self.flush_interval,
+                'enqueued': self.enqueued,
+                'written': self.written,
+                'batches': self.batches,
+                'sync_writes': self.sync_writes,
+                'errors': self.errors,
+                'retried': self.retried,
+                'lost': self.lost,
+                'last_error': self.last_error
+            }
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+Processus d'écriture unique du mode multi-workers (gunicorn.conf.py).
+
+Les workers gunicorn lisent la base SQLite directement (en WAL, les lecteurs ne sont
+jamais bloqués) mais envoient toutes leurs écritures à un seul processus par une
+socket Unix authentifiée (multiprocessing.connection):
+- plus de workers qui se disputent le verrou d'écriture de SQLite (busy_timeout);
+- les écritures par lot reçues de plusieurs workers au même moment sont écrites en
+  une seule transaction (commit groupé entre processus);
+- l'archivage (archive.py) tourne dans ce processus, une seule fois pour tous les workers.
+"""
+import os
+import threading
+import time
+from multiprocessing import AuthenticationError, Pipe
+from multiprocessing.connection import Client, Listener, wait
+from storage import StorageBackend
+
+WRITE_METHODS = ('add_sensor_data', 'add_sensor_data_batch', 'add_prediction', 'add_predictions_batch')
+# Méthodes dont les appels simultanés sont fusionnés en une transaction
+BATCH_METHODS = ('add_sensor_data_batch', 'add_predictions_batch')
+
+
+def serve(address, authkey, db_path, stop_event=None, archive=True):
+    """
+    Boucle du processus d'écriture: reçoit les écritures des workers et les applique.
+
+    Args:
+        address: Chemin de la socket Unix
+        authkey: Clé partagée avec les workers (bytes)
+        db_path: Base SQLite
+        stop_event: multiprocessing.Event demandant l'arrêt
+        archive: Démarre l'archivage périodique configuré par l'environnement
+    """
+    from archive import archiver_from_env
+    from database import GerminationDatabase
+
+    db = GerminationDatabase(db_path)
+    archiver = archiver_from_env(db) if archive else None
+    if archiver is not None:
+        archiver.start()
+    if os.path.exists(address):
+        os.remove(address)
+    listener = Listener(address, family='AF_UNIX', authkey=authkey)
+    connections = []
+    lock = threading.Lock()
+    # Réveille la boucle principale quand un worker se connecte
+    wake_reader, wake_writer = Pipe(duplex=False)
+
+    def accept():
+        while True:
+            try:
+                conn = listener.accept()
+            except AuthenticationError:
+                continue
+            except OSError:
+                return
+            with lock:
+                connections.append(conn)
+            wake_writer.send(None)
+
+    threading.Thread(target=accept, name='writer-accept', daemon=True).start()
+    print(f"[OK] Processus d'ecriture pret ({address}, pid {os.getpid()})")
+    try:
+        while stop_event is None or not stop_event.is_set():
+            with lock:
+                current = list(connections)
+            requests = []
+            for conn in wait(current + [wake_reader], timeout=0.5):
+                if conn is wake_reader:
+                    wake_reader.recv()
+                    continue
+                try:
+                    requests.append((conn, conn.recv()))
+                except (EOFError, OSError):
+                    # Worker arrêté
+                    with lock:
+                        connections.remove(conn)
+                    conn.close()
+            if requests:
+                _apply(db, requests)
+    finally:
+        listener.close()
+        if archiver is not None:
+            archiver.stop()
+        db.close()
+        if os.path.exists(address):
+            os.remove(address)
+
+
+def _apply(db, requests):
+    """Exécute un tour de requêtes: écritures unitaires une à une, lots fusionnés par méthode"""
+    groups = {}
+    for conn, (method, args, kwargs) in requests:
+        if method in BATCH_METHODS:
+            groups.setdefault(method, []).append((conn, args[0]))
+            continue
+        try:
+            if method not in WRITE_METHODS:
+                raise ValueError(f"Operation d'ecriture inconnue: {method}")
+            _reply(conn, 'ok', getattr(db, method)(*args, **kwargs))
+        except Exception as e:
+            _reply(conn, 'error', e)
+    for method, pending in groups.items():
+        write = getattr(db, method)
+        try:
+            write([record for _, records in pending for record in records])
+        except Exception as e:
+            if len(pending) == 1:
+                _reply(pending[0][0], 'error', e)
+                continue
+            # Transaction commune annulée: chaque lot est réécrit seul, l'erreur ne touche que son worker
+            for conn, records in pending:
+                try:
+                    write(records)
+                except Exception as e:
+                    _reply(conn, 'error', e)
+                else:
+                    _reply(conn, 'ok', len(records))
+            continue
+        for conn, records in pending:
+            _reply(conn, 'ok', len(records))
+
+
+def _reply(conn, status, result):
+    try:
+        conn.send((status, result))
+    except (OSError, ValueError):
+        # Worker arrêté pendant l'écriture
+        pass
+    except Exception:
+        # Exception non sérialisable
+        conn.send((status, RuntimeError(str(result))))
+
+
+class WriterClient:
+    """Connexion d'un worker au processus d'écriture (ouverte au premier appel, après le fork)"""
+
+    def __init__(self, address, authkey, connect_timeout=10.0):
+        self.address = address
+        self.authkey = authkey
+        self.connect_timeout = connect_timeout
+        self._conn = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            try:
+                return Client(self.address, family='AF_UNIX', authkey=self.authkey)
+            except (FileNotFoundError, ConnectionRefusedError):
+                # Processus d'écriture en cours de démarrage
+                if time.monotonic() > deadline:
+                    raise ConnectionError(f"Processus d'ecriture injoignable: {self.address}")
+                time.sleep(0.05)
+
+    def call(self, method, *args, **kwargs):
+        with self._lock:
+            if self._conn is None or self._pid != os.getpid():
+                self._conn, self._pid = self._connect(), os.getpid()
+            try:
+                self._conn.send((method, args, kwargs))
+                status, result = self._conn.recv()
+            except (EOFError, OSError):
+                self._conn = None
+                raise ConnectionError("Connexion au processus d'ecriture perdue")
+        if status == 'error':
+            raise result
+        return result
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+class SharedWriterStorage(StorageBackend):
+    """Backend d'un worker: lectures sur la base locale, écritures via le processus d'écriture"""
+
+    def __init__(self, local, client):
+        """
+        Args:
+            local: GerminationDatabase ouverte sur la même base que le processus d'écriture
+            client: WriterClient
+        """
+        self.local = local
+        self.client = client
+        self.name = local.name
+
+    # --- Écritures ---
+
+    def add_sensor_data(self, *args, **kwargs):
+        return self.client.call('add_sensor_data', *args, **kwargs)
+
+    def add_sensor_data_batch(self, records):
+        return self.client.call('add_sensor_data_batch', list(records)) if records else 0
+
+    def add_prediction(self, *args, **kwargs):
+        return self.client.call('add_prediction', *args, **kwargs)
+
+    def add_predictions_batch(self, records):
+        return self.client.call('add_predictions_batch', list(records)) if records else 0
+
+    # --- Lectures ---
+
+    def get_sensor_data(self, limit=100):
+        return self.local.get_sensor_data(limit)
+
+    def get_predictions(self, limit=100):
+        return self.local.get_predictions(limit)
+
+    def get_labeled_sensor_data(self, after_id=0):
+        return self.local.get_labeled_sensor_data(after_id)
+
+    def get_history_page(self, *args, **kwargs):
+        return self.local.get_history_page(*args, **kwargs)
+
+    def iter_history(self, *args, **kwargs):
+        return self.local.iter_history(*args, **kwargs)
+
+    def get_rollups(self, *args, **kwargs):
+        return self.local.get_rollups(*args, **kwargs)
+
+    def get_stats_by_seed_type(self, seed_type):
+        return self.local.get_stats_by_seed_type(seed_type)
+
+    def close(self):
+        self.client.close()
+        self.local.close()
+
+    def __getattr__(self, name):
+        # Attributs propres au backend local (db_path, schema_version...)
+        return getattr(self.local, name)